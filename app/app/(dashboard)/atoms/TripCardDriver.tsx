@@ -148,7 +148,7 @@ const TripCardDriver: React.FC<TripCardDriverProps> = ({ trip, onDelete }) => {
                 {formatDate(trip.time)}
               </Text>
               <QRCode
-                value={`http://192.168.56.1:8000/realize/confirm/${trip.reservations?.[0]?.id}`}
+                value={`http://192.168.56.1:8000/api/realize/confirm/token/${encodeURIComponent(trip.reservations?.[0]?.qr_token ?? "")}/`}
                 size={300}
               />
 
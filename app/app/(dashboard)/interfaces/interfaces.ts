@@ -56,6 +56,7 @@ interface Travel {
       institutional_mail: string;
     };
     status: string;
+    qr_token: string;
   }[];
 }
 
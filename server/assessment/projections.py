@@ -0,0 +1,21 @@
+"""
+Proyección (ver `config.projection`) de los listados de calificaciones,
+equivalente a `AssessmentReadSerializer`.
+
+Las relaciones se muestran con su `__str__`; aquí se arma la misma cadena a
+partir de las columnas: el nombre del usuario y del usuario del conductor, y
+para el viaje la representación por defecto de Django (`Travel object (id)`).
+"""
+from config.projection import Projection
+from travel.models import Travel
+from .serializers import AssessmentReadSerializer
+
+ASSESSMENT_PROJECTION = Projection(
+    AssessmentReadSerializer,
+    computed={
+        'travel': lambda row, extra, context: f"{Travel.__name__} object ({row['travel']})",
+        'driver': lambda row, extra, context: row['driver__user__full_name'],
+        'user': lambda row, extra, context: row['user__full_name'],
+    },
+    extra_columns=('travel', 'driver__user__full_name', 'user__full_name'),
+)
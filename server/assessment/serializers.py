@@ -6,13 +6,15 @@ y viceversa, facilitando su transmisión a través de la API y validando los dat
 """
 from rest_framework import serializers
 from .models import Assessment
+from config.sparse_fields import SparseFieldsSerializerMixin
 
-class AssessmentReadSerializer(serializers.ModelSerializer):
+class AssessmentReadSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para la LECTURA de calificaciones.
     
     Muestra las relaciones (usuario, conductor, viaje) de forma legible
-    utilizando su representación en cadena (__str__).
+    utilizando su representación en cadena (__str__). Con `?expand=` las
+    relaciones no listadas se devuelven como su ID (ver `config.sparse_fields`).
     """
     # Muestra el __str__ del modelo relacionado en lugar de solo su ID.
     user = serializers.StringRelatedField()
@@ -24,6 +26,13 @@ class AssessmentReadSerializer(serializers.ModelSerializer):
         # Incluye todos los campos del modelo para una visualización completa.
         fields = ['id', 'travel', 'driver', 'user', 'score', 'comment']
 
+    expandable_fields = ('travel', 'driver', 'user')
+    field_requirements = {
+        'travel': {'select_related': ['travel']},
+        'driver': {'select_related': ['driver__user']},
+        'user': {'select_related': ['user']},
+    }
+
 class AssessmentCreateSerializer(serializers.ModelSerializer):
     """
     Serializador para la CREACIÓN de nuevas calificaciones.
@@ -13,7 +13,12 @@ from django.shortcuts import get_object_or_404
 from .models import Assessment
 from .permissions import IsOwner
 from users.permissions import IsAuthenticatedCustom
+from config.etag import ConditionalGetMixin
+from config.idempotency import IdempotentCreateMixin
+from config.response_cache import driver_institution_id
+from config.sparse_fields import is_sparse_request
 
+from .projections import ASSESSMENT_PROJECTION
 from .serializers import (
     AssessmentReadSerializer, 
     AssessmentCreateSerializer,
@@ -21,7 +26,7 @@ from .serializers import (
 )
 
 
-class AssessmentCreateView(generics.CreateAPIView):
+class AssessmentCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     Endpoint para crear una nueva calificación de un viaje.
     
@@ -94,7 +99,7 @@ class AssessmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         return AssessmentReadSerializer
 
-class AssessmentListView(APIView):
+class AssessmentListView(ConditionalGetMixin, APIView):
     """
     Endpoint para listar todas las calificaciones del sistema.
     
@@ -102,15 +107,21 @@ class AssessmentListView(APIView):
     de la más reciente a la más antigua. Generalmente para uso de administradores.
     """
     permission_classes = [IsAuthenticatedCustom]
+    # El listado incluye todas las instituciones.
+    etag_scope = 'global'
     
     def get(self, request, *args, **kwargs):
         """Maneja la solicitud GET para devolver todas las calificaciones."""
         assessments = Assessment.objects.all().order_by('-id')
-        serializer = AssessmentReadSerializer(assessments, many=True)
+        if not is_sparse_request(request):
+            # Ruta rápida: filas de values() en lugar de instancias (ver config.projection).
+            return Response(ASSESSMENT_PROJECTION.render(assessments))
+        assessments = AssessmentReadSerializer.prune_queryset(assessments, request)
+        serializer = AssessmentReadSerializer(assessments, many=True, context={'request': request})
         return Response(serializer.data)
 
 
-class DriverAssessmentsListView(APIView):
+class DriverAssessmentsListView(ConditionalGetMixin, APIView):
     """
     Endpoint para listar todas las calificaciones de un conductor específico.
     
@@ -119,6 +130,9 @@ class DriverAssessmentsListView(APIView):
     """
     permission_classes = [IsAuthenticatedCustom]
 
+    def get_etag_institution_id(self):
+        return driver_institution_id(self.kwargs.get('driver_id'))
+
     def get(self, request, driver_id, *args, **kwargs):
         """
         Maneja la solicitud GET para devolver las calificaciones de un conductor.
@@ -128,6 +142,8 @@ class DriverAssessmentsListView(APIView):
         """
         # Filtra las calificaciones buscando a través de la relación:
         # Assessment -> Driver -> User -> uid
-        assessments = Assessment.objects.filter(driver__user__uid=driver_id).order_by('-id')
-        serializer = AssessmentReadSerializer(assessments, many=True)
+        assessments = AssessmentReadSerializer.prune_queryset(
+            Assessment.objects.filter(driver__user__uid=driver_id).order_by('-id'), request
+        )
+        serializer = AssessmentReadSerializer(assessments, many=True, context={'request': request})
         return Response(serializer.data)
\ No newline at end of file
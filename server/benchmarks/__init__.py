@@ -0,0 +1,6 @@
+"""
+Scripts de medición de rendimiento del backend.
+
+Cada módulo se ejecuta desde la carpeta `server` con:
+    python -m benchmarks.<nombre_del_modulo>
+"""
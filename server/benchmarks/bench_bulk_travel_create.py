@@ -0,0 +1,95 @@
+"""
+Compara la creación masiva de viajes (`travel.bulk`) con N creaciones
+individuales a través de `TravelSerializer`, como hace `TravelCreateView`.
+
+Usa una base de datos SQLite en memoria creada a partir de los modelos, así
+que los tiempos sirven para comparar ambos caminos, no como cifras absolutas
+de producción (donde cada consulta además paga la latencia de red).
+
+Uso:
+    python -m benchmarks.bench_bulk_travel_create [viajes]
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT'):
+    os.environ.setdefault(name, 'benchmark')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from driver.models import Driver  # noqa: E402
+from institutions.models import Institution  # noqa: E402
+from route.test_canonical import insert_route_row  # noqa: E402
+from travel.bulk import create_travels, validate_travel_rows  # noqa: E402
+from travel.models import Travel  # noqa: E402
+from travel.serializers import TravelSerializer  # noqa: E402
+from users.models import Users  # noqa: E402
+from vehicle.models import Vehicle  # noqa: E402
+
+DEPARTURE = datetime(2026, 10, 19, 6, 0, tzinfo=timezone.utc)
+
+
+def fixtures():
+    institution = Institution.objects.create(official_name="Universidad Benchmark", email="bench@univalle.edu.co")
+    user = Users.objects.create(
+        full_name="Conductor", user_type=Users.TYPE_DRIVER, institutional_mail="driver@bench.edu",
+        student_code="1", udocument="1", direction="x", uphone="+1", upassword="x",
+        institution=institution, user_state=Users.STATE_APPROVED, driver_state=Users.DRIVER_STATE_APPROVED,
+    )
+    driver = Driver.objects.create(user=user, validate_state='approved')
+    vehicle = Vehicle.objects.create(
+        driver=driver, plate="BUS001", brand="Bus", model="Bus", vehicle_type="Bus",
+        category="metropolitano", soat=date(2030, 1, 1), tecnomechanical=date(2030, 1, 1), capacity=40,
+    )
+    route_id = insert_route_row(driver, start=(3.3755, -76.5333), end=(3.4684, -76.5193))
+    return user, driver, vehicle, route_id
+
+
+def rows_for(vehicle, route_id, count):
+    return [
+        {'vehicle': vehicle.id, 'route': route_id,
+         'time': (DEPARTURE + timedelta(minutes=5 * i)).isoformat(), 'price': 2000}
+        for i in range(count)
+    ]
+
+
+def measure(label, count, func):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+    print(f"{label:>12}: {count} viajes en {elapsed * 1000:.1f} ms, {len(queries)} consultas")
+
+
+def main(travels=500):
+    connection.creation.create_test_db(verbosity=0)
+    user, driver, vehicle, route_id = fixtures()
+    rows = rows_for(vehicle, route_id, travels)
+
+    def singles():
+        for row in rows:
+            serializer = TravelSerializer(data={**row, 'driver': driver.pk, 'travel_state': 'scheduled'})
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+    def bulk():
+        valid, errors = validate_travel_rows(rows, user)
+        assert not errors, errors
+        create_travels(valid)
+
+    measure('individual', travels, singles)
+    Travel.objects.all().delete()
+    measure('masivo', travels, bulk)
+    assert Travel.objects.count() == travels
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
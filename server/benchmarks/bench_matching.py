@@ -0,0 +1,89 @@
+"""
+Mide el puntaje del motor de emparejamiento sobre viajes abiertos sintéticos.
+
+Compara el puntaje vectorizado (`travel.matching.rank_candidates`) con el
+mismo cálculo hecho viaje por viaje en Python puro.
+
+Uso:
+    python -m benchmarks.bench_matching [viajes] [consultas]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import django
+
+# El motor lee sus pesos desde la configuración de Django.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT'):
+    os.environ.setdefault(name, 'benchmark')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from route.geo import haversine_m  # noqa: E402
+from travel.matching import CandidateArrays, rank_candidates  # noqa: E402
+
+LAT_RANGE = (3.33, 3.50)
+LNG_RANGE = (-76.58, -76.46)
+DEPARTURE = datetime(2026, 10, 19, 7, 0, tzinfo=timezone.utc)
+WINDOW_S = 3600
+
+
+def random_point(rng):
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)
+
+
+def python_rank(rows, origin, destination, k=10):
+    """Referencia en Python puro con la misma fórmula que `score_candidates`."""
+    weights, max_detour = settings.MATCHING_WEIGHTS, settings.MATCHING_MAX_DETOUR_M
+    ride = haversine_m(*origin, *destination)
+    scored = []
+    for travel_id, s_lat, s_lng, e_lat, e_lng, when, seats in rows:
+        detour = max(haversine_m(s_lat, s_lng, *origin) + ride + haversine_m(*destination, e_lat, e_lng)
+                     - haversine_m(s_lat, s_lng, e_lat, e_lng), 0.0)
+        offset = abs((when - DEPARTURE).total_seconds())
+        if detour > max_detour or offset > WINDOW_S or seats < 1:
+            continue
+        score = (weights['detour'] * detour / max_detour + weights['time'] * offset / WINDOW_S
+                 + weights['seats'] / max(seats, 1))
+        scored.append((score, travel_id))
+    return [travel_id for _, travel_id in sorted(scored)[:k]]
+
+
+def main(travels=10_000, queries=200):
+    rng = random.Random(42)
+    rows = [
+        (i, *random_point(rng), *random_point(rng),
+         DEPARTURE + timedelta(minutes=rng.uniform(-90, 90)), rng.randint(0, 4))
+        for i in range(travels)
+    ]
+    requests = [(random_point(rng), random_point(rng)) for _ in range(queries)]
+
+    started = time.perf_counter()
+    candidates = CandidateArrays.from_rows(rows)
+    print(f"Candidatos: {len(candidates)} viajes (arreglos construidos en {time.perf_counter() - started:.3f} s)")
+
+    sample = requests[:20]
+    started = time.perf_counter()
+    expected = [python_rank(rows, origin, destination) for origin, destination in sample]
+    elapsed = time.perf_counter() - started
+    print(f"  python: {len(sample)} consultas en {elapsed:.2f} s ({elapsed / len(sample) * 1000:.2f} ms/consulta)")
+
+    started = time.perf_counter()
+    for origin, destination in requests:
+        rank_candidates(candidates, origin, destination, DEPARTURE, WINDOW_S)
+    elapsed = time.perf_counter() - started
+    print(f"   numpy: {queries} consultas en {elapsed:.2f} s ({elapsed / queries * 1000:.2f} ms/consulta)")
+
+    for (origin, destination), reference in zip(sample, expected):
+        results = rank_candidates(candidates, origin, destination, DEPARTURE, WINDOW_S)
+        assert [result.travel_id for result in results] == reference
+    print("Resultados verificados contra la referencia en Python puro.")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,39 @@
+"""
+Mide el motor de enrutamiento offline sobre la rejilla sintética.
+
+Uso:
+    python -m benchmarks.bench_offline_routing [filas] [columnas] [consultas]
+"""
+
+import random
+import sys
+import time
+
+from driver.offline_routing import build_grid_graph
+
+
+def main(rows=200, cols=200, queries=200):
+    started = time.perf_counter()
+    graph = build_grid_graph(rows, cols)
+    build_seconds = time.perf_counter() - started
+    print(f"Grafo: {graph.node_count} nodos, {graph.edge_count} aristas (construido en {build_seconds:.2f} s)")
+
+    rng = random.Random(42)
+    pairs = [(rng.randrange(graph.node_count), rng.randrange(graph.node_count)) for _ in range(queries)]
+
+    for algorithm in ('astar', 'bidirectional'):
+        started = time.perf_counter()
+        for source, target in pairs:
+            graph.shortest_path(source, target, algorithm=algorithm)
+        elapsed = time.perf_counter() - started
+        print(f"{algorithm:>14}: {queries} consultas en {elapsed:.2f} s ({elapsed / queries * 1000:.1f} ms/consulta)")
+
+    started = time.perf_counter()
+    for source, _ in pairs:
+        graph.nearest_node(graph.lats[source] + 0.0003, graph.lngs[source] - 0.0003)
+    elapsed = time.perf_counter() - started
+    print(f"{'nearest_node':>14}: {queries} consultas en {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:4]))
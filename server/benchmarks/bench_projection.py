@@ -0,0 +1,154 @@
+"""
+Compara los serializadores de los listados con sus proyecciones
+(`config.projection`): mismo JSON, armado desde filas de `values()`.
+
+Para cada listado mide el serializador (con el queryset de la vista) y la
+proyección, y comprueba que ambas respuestas sean idénticas. Usa una base de
+datos SQLite en memoria, así que el número de consultas importa tanto como el
+tiempo: en producción cada consulta además paga la latencia de red.
+
+Uso:
+    python -m benchmarks.bench_projection [viajes]
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT'):
+    os.environ.setdefault(name, 'benchmark')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from assessment.models import Assessment  # noqa: E402
+from assessment.projections import ASSESSMENT_PROJECTION  # noqa: E402
+from assessment.serializers import AssessmentReadSerializer  # noqa: E402
+from driver.models import Driver  # noqa: E402
+from institutions.models import Institution  # noqa: E402
+from realize.models import Realize  # noqa: E402
+from realize.projections import REALIZE_PROJECTION  # noqa: E402
+from realize.serializers import RealizeSerializer  # noqa: E402
+from route.test_canonical import insert_route_row  # noqa: E402
+from travel.models import Travel  # noqa: E402
+from travel.projections import DRIVER_TRAVEL_PROJECTION, TRAVEL_DETAIL_PROJECTION  # noqa: E402
+from travel.serializers import DriverTravelWithReservationsSerializer, TravelDetailSerializer  # noqa: E402
+from users.models import Users  # noqa: E402
+from vehicle.models import Vehicle  # noqa: E402
+
+DEPARTURE = datetime(2026, 10, 19, 6, 0, tzinfo=timezone.utc)
+DRIVERS = 20
+PASSENGERS = 50
+
+
+def fixtures(travels):
+    institution = Institution.objects.create(official_name="Universidad Benchmark", email="bench@univalle.edu.co")
+    drivers = []
+    for i in range(DRIVERS):
+        user = Users.objects.create(
+            full_name=f"Conductor {i}", user_type=Users.TYPE_DRIVER, institutional_mail=f"driver{i}@bench.edu",
+            student_code=f"d{i}", udocument=f"d{i}", direction="x", uphone="+1", upassword="x",
+            institution=institution, user_state=Users.STATE_APPROVED, driver_state=Users.DRIVER_STATE_APPROVED,
+        )
+        driver = Driver.objects.create(user=user, validate_state='approved')
+        vehicle = Vehicle.objects.create(
+            driver=driver, plate=f"BUS{i:03}", brand="Bus", model="Bus", vehicle_type="Bus",
+            category="metropolitano", soat=date(2030, 1, 1), tecnomechanical=date(2030, 1, 1), capacity=40,
+        )
+        drivers.append((driver, vehicle, insert_route_row(driver, start=(3.3755, -76.5333), end=(3.4684, -76.5193))))
+    passengers = [
+        Users.objects.create(
+            full_name=f"Pasajero {i}", user_type=Users.TYPE_STUDENT, institutional_mail=f"p{i}@bench.edu",
+            student_code=f"p{i}", udocument=f"p{i}", direction="x", uphone="+1", upassword="x",
+            institution=institution, user_state=Users.STATE_APPROVED,
+        )
+        for i in range(PASSENGERS)
+    ]
+    created = Travel.objects.bulk_create([
+        Travel(
+            driver=drivers[i % DRIVERS][0], vehicle=drivers[i % DRIVERS][1], route_id=drivers[i % DRIVERS][2],
+            time=DEPARTURE + timedelta(minutes=10 * i), travel_state='scheduled', price=2000,
+        )
+        for i in range(travels)
+    ])
+    Realize.objects.bulk_create([
+        Realize(user=passengers[(i + j) % PASSENGERS], travel=travel,
+                status=Realize.STATUS_CONFIRMED if j % 2 else Realize.STATUS_PENDING)
+        for i, travel in enumerate(created) for j in range(3)
+    ])
+    Assessment.objects.bulk_create([
+        Assessment(travel=travel, driver_id=travel.driver_id, user=passengers[i % PASSENGERS], score=1 + i % 5)
+        for i, travel in enumerate(created)
+    ])
+    return drivers[0][0].user, passengers[0]
+
+
+def measure(label, func):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        data = func()
+        elapsed = time.perf_counter() - started
+    print(f"{label:>32}: {len(data)} filas en {elapsed * 1000:.1f} ms, {len(queries)} consultas")
+    return JSONRenderer().render(data)
+
+
+def compare(name, serialize, project):
+    before = measure(f"{name} (serializador)", serialize)
+    after = measure(f"{name} (proyección)", project)
+    assert before == after, f"{name}: la proyección no coincide con el serializador"
+
+
+def main(travels=1000):
+    connection.creation.create_test_db(verbosity=0)
+    driver_user, passenger = fixtures(travels)
+    request = Request(APIRequestFactory().get('/'))
+    request.user = driver_user
+    context = {'request': request}
+
+    institution_travels = Travel.objects.filter(
+        driver__user__institution_id=driver_user.institution_id
+    ).order_by('-time')
+    compare(
+        'institution',
+        lambda: TravelDetailSerializer(
+            institution_travels.select_related('driver__user', 'vehicle', 'route')
+            .prefetch_related('realize__user', 'driver__assessments'),
+            many=True, context=context,
+        ).data,
+        lambda: TRAVEL_DETAIL_PROJECTION.render(institution_travels, context),
+    )
+
+    driver_travels = Travel.objects.filter(driver_id=driver_user.uid)
+    compare(
+        'driver',
+        lambda: DriverTravelWithReservationsSerializer(
+            driver_travels.select_related('vehicle', 'route').prefetch_related('realize__user'), many=True
+        ).data,
+        lambda: DRIVER_TRAVEL_PROJECTION.render(driver_travels),
+    )
+
+    reservations = Realize.objects.filter(user=passenger)
+    compare(
+        'realize',
+        lambda: RealizeSerializer(reservations.select_related('user', 'travel'), many=True).data,
+        lambda: REALIZE_PROJECTION.render(reservations),
+    )
+
+    assessments = Assessment.objects.all().order_by('-id')
+    compare(
+        'assessment',
+        lambda: AssessmentReadSerializer(assessments, many=True).data,
+        lambda: ASSESSMENT_PROJECTION.render(assessments),
+    )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,75 @@
+"""
+Mide la búsqueda de rutas por proximidad con rutas sintéticas alrededor de Cali.
+
+Compara tres estrategias para "rutas que salen a menos de R m del origen y
+llegan a menos de R m del destino":
+- recorrido exhaustivo en Python puro,
+- haversine vectorizado sobre todas las rutas (NumPy, sin índice),
+- `GeohashGridIndex` (celdas geohash + haversine vectorizado).
+
+Uso:
+    python -m benchmarks.bench_proximity [rutas] [consultas] [radio_m]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from route.geo import GeohashGridIndex, haversine_m, haversine_many_m
+
+# Caja aproximada del área metropolitana de Cali.
+LAT_RANGE = (3.33, 3.50)
+LNG_RANGE = (-76.58, -76.46)
+
+
+def random_point(rng):
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)
+
+
+def main(routes=100_000, queries=200, radius=1000):
+    rng = random.Random(42)
+    rows = [(i, *random_point(rng), *random_point(rng)) for i in range(routes)]
+    pairs = [(random_point(rng), random_point(rng)) for _ in range(queries)]
+
+    started = time.perf_counter()
+    index = GeohashGridIndex.from_rows(rows)
+    print(f"Índice: {len(index)} rutas (construido en {time.perf_counter() - started:.2f} s)")
+
+    def python_scan(start, end):
+        return [
+            row[0] for row in rows
+            if haversine_m(*start, row[1], row[2]) <= radius and haversine_m(*end, row[3], row[4]) <= radius
+        ]
+
+    def numpy_scan(start, end):
+        mask = haversine_many_m(*start, index.start_lats, index.start_lngs) <= radius
+        mask &= haversine_many_m(*end, index.end_lats, index.end_lngs) <= radius
+        return index.ids[mask]
+
+    def grid_index(start, end):
+        return index.query(start, radius, end=end)
+
+    # El recorrido en Python puro es muy lento; se mide con pocas consultas.
+    for name, search, sample in (
+        ('python', python_scan, pairs[:5]),
+        ('numpy', numpy_scan, pairs),
+        ('geohash', grid_index, pairs),
+    ):
+        started = time.perf_counter()
+        found = sum(len(search(start, end)) for start, end in sample)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>8}: {len(sample)} consultas en {elapsed:.2f} s "
+              f"({elapsed / len(sample) * 1000:.2f} ms/consulta, {found} resultados)")
+
+    # Verificación: el índice devuelve lo mismo que el recorrido vectorizado.
+    for start, end in pairs[:20]:
+        expected = set(numpy_scan(start, end).tolist())
+        assert {match.route_id for match in grid_index(start, end)} == expected
+    print("Resultados del índice verificados contra el recorrido exhaustivo.")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:4]
+    main(*(int(arg) for arg in args[:2]), *(float(arg) for arg in args[2:3]))
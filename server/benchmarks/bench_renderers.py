@@ -0,0 +1,92 @@
+"""
+Compara los codificadores de `config.renderers` con los que se usaban antes:
+`json.dumps` en los consumers de WebSocket y el `JSONRenderer` de DRF en la
+API.
+
+Mide tres cargas:
+- frames de ubicación (`location_update`), pequeños y muy frecuentes;
+- deltas del feed de viajes (`travel_delta`) con lotes de varios viajes;
+- el listado de viajes de la institución, con la forma de
+  `TravelDetailSerializer`.
+
+Uso:
+    python -m benchmarks.bench_renderers [repeticiones]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT'):
+    os.environ.setdefault(name, 'benchmark')
+django.setup()
+
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer  # noqa: E402
+
+from config.renderers import dumps_json, dumps_msgpack, msgpack, orjson  # noqa: E402
+
+DEPARTURE = datetime(2026, 10, 19, 6, 0, tzinfo=timezone.utc)
+
+
+def location_frame(i):
+    return {'lat': 3.3755 + i * 1e-5, 'lon': -76.5333 - i * 1e-5, 'travel_id': 42, 'driver_name': 'Conductor Benchmark'}
+
+
+def feed_delta(i):
+    return {'event': 'travel_delta', 'travels': [
+        {'travel_id': i * 10 + j, 'version': 3 + j, 'travel_state': 'scheduled',
+         'time': (DEPARTURE + timedelta(minutes=j)).isoformat(), 'available_seats': j % 5}
+        for j in range(10)
+    ]}
+
+
+def travel_list(count):
+    return [
+        {
+            'id': i, 'time': '2026-10-19T06:00:00Z', 'travel_state': 'scheduled', 'price': 2000, 'version': 1,
+            'driver': {'user': {'uid': 1, 'full_name': 'Conductor', 'uphone': '+57300', 'institutional_mail': 'c@u.edu'},
+                       'validate_state': 'approved'},
+            'vehicle': {'id': 1, 'plate': 'ABC123', 'brand': 'Chevrolet', 'model': 'NPR', 'vehicle_type': 'Bus',
+                        'category': 'metropolitano', 'soat': '2030-01-01', 'tecnomechanical': '2030-01-01',
+                        'capacity': 40, 'driver': 1},
+            'route': {'id': 1, 'startLocation': 'Campus Meléndez', 'destination': 'Terminal', 'startPointCoords': [3.37, -76.53],
+                      'endPointCoords': [3.46, -76.51], 'start_lat': 3.37, 'start_lng': -76.53, 'end_lat': 3.46,
+                      'end_lng': -76.51, 'driver': 1, 'canonical': 1},
+            'driver_score': 4.5, 'available_seats': 12,
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label, payloads, encode):
+    started = time.perf_counter()
+    size = 0
+    for payload in payloads:
+        size += len(encode(payload))
+    elapsed = time.perf_counter() - started
+    print(f"{label:>28}: {elapsed * 1000:8.1f} ms, {size / len(payloads):9.0f} bytes por mensaje")
+
+
+def compare(name, payloads):
+    print(f"-- {name} ({len(payloads)} mensajes)")
+    measure('json.dumps', payloads, lambda data: json.dumps(data).encode())
+    measure('DRF JSONRenderer', payloads, DRFJSONRenderer().render)
+    if orjson is not None:
+        measure('orjson (config.renderers)', payloads, dumps_json)
+    if msgpack is not None:
+        measure('msgpack (config.renderers)', payloads, dumps_msgpack)
+
+
+def main(repetitions=20000):
+    compare('frames de ubicación', [location_frame(i) for i in range(repetitions)])
+    compare('deltas del feed', [feed_delta(i) for i in range(repetitions // 10)])
+    compare('listado de la institución', [travel_list(500) for _ in range(20)])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -20,8 +20,9 @@ django.setup()
 from config.middleware import JWTAuthMiddleware 
 
 # --- PASO 4: IMPORTAR RUTAS DE CHANNELS ---
-# Importamos las rutas de WebSocket definidas en nuestra app 'travel'.
+# Importamos las rutas de WebSocket definidas en las apps 'travel' y 'realize'.
 import travel.routing
+import realize.routing
 
 # --- PASO 5: CONSTRUIR LA APLICACIÓN ASGI FINAL ---
 # ProtocolTypeRouter permite a Channels desviar el tráfico según el protocolo.
@@ -33,7 +34,7 @@ application = ProtocolTypeRouter({
     # Para tráfico WebSocket, definimos una pila de procesamiento:
     "websocket": JWTAuthMiddleware(  # 1. Primero, el middleware intercepta la conexión para autenticar.
         URLRouter(                   # 2. Luego, el URLRouter dirige la conexión al consumer correcto.
-            travel.routing.websocket_urlpatterns
+            travel.routing.websocket_urlpatterns + realize.routing.websocket_urlpatterns
         )
     ),
 })
\ No newline at end of file
@@ -0,0 +1,166 @@
+# server/config/batch.py
+
+"""
+Lotes de peticiones GET (`POST /api/batch/`).
+
+Los paneles de las instituciones y de los administradores lanzan a la vez
+muchas consultas pequeñas, como las calificaciones de cada conductor o la
+ruta de cada viaje, y cada una paga TLS, middleware y autenticación. Un lote
+las ejecuta en el mismo proceso, una tras otra, con la misma conexión a la
+base de datos, y devuelve todas las respuestas juntas:
+
+    {"requests": [
+        {"id": "d5", "path": "/api/assessment/assessments/driver/5/"},
+        {"id": "r9", "path": "/api/travel/route/9/", "headers": {"If-None-Match": "\"...\""}}
+    ]}
+
+Solo se admiten las rutas con nombre en BATCH_ALLOWED_ROUTES. Cada
+subpetición pasa por los permisos de su vista como si llegara sola. El
+principal (usuario o institución) se busca en la base de datos una sola vez
+por lote (ver `shared_principal`).
+"""
+
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status, views
+from rest_framework.response import Response
+
+from .renderers import PayloadDecodeError, loads_json
+
+# Atributo de la petición con los principales ya cargados en el lote.
+BATCH_PRINCIPALS_ATTR = 'batch_principals'
+
+# Encabezados que cada subpetición puede enviar.
+BATCH_FORWARDED_HEADERS = {'if-none-match': 'HTTP_IF_NONE_MATCH'}
+
+# Metadatos de la petición del lote que no aplican a las subpeticiones.
+_DROPPED_META = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH')
+
+
+class BatchError(ValueError):
+    """Cuerpo del lote inválido."""
+
+
+def shared_principal(request, model, pk):
+    """
+    `model.objects.get(pk=pk)`, pero dentro de un lote la instancia se carga
+    una vez y se reutiliza en todas las subpeticiones.
+    """
+    principals = getattr(request, BATCH_PRINCIPALS_ATTR, None)
+    if principals is None:
+        return model.objects.get(pk=pk)
+    key = (model._meta.label, pk)
+    if key not in principals:
+        principals[key] = model.objects.get(pk=pk)
+    return principals[key]
+
+
+def parse_batch(data):
+    """Valida el cuerpo y devuelve una lista de (id, ruta, consulta, encabezados)."""
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise BatchError("El cuerpo debe tener una lista 'requests' con al menos una subpetición.")
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f"Un lote admite como máximo {settings.BATCH_MAX_REQUESTS} subpeticiones.")
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise BatchError(f"La subpetición {index} debe ser un objeto con 'path'.")
+        url = urlsplit(item['path'])
+        if url.scheme or url.netloc:
+            raise BatchError(f"La subpetición {index} debe usar una ruta relativa al servidor.")
+        headers = item.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise BatchError(f"Los encabezados de la subpetición {index} deben ser un objeto.")
+        forwarded = {}
+        for name, value in headers.items():
+            meta_key = BATCH_FORWARDED_HEADERS.get(str(name).lower())
+            if meta_key is None:
+                raise BatchError(f"Encabezado no permitido en la subpetición {index}: {name}.")
+            forwarded[meta_key] = str(value)
+        parsed.append((item.get('id', index), url.path, url.query, forwarded))
+    return parsed
+
+
+def build_subrequest(request, path, query, headers, principals):
+    """Petición GET con la autenticación y el host de la petición del lote."""
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {key: value for key, value in request.META.items() if key not in _DROPPED_META}
+    sub.META.update(headers, REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query, HTTP_ACCEPT='application/json')
+    sub.GET = QueryDict(query)
+    sub.COOKIES = request.COOKIES
+    setattr(sub, BATCH_PRINCIPALS_ATTR, principals)
+    return sub
+
+
+def _response_body(response):
+    if response.status_code == status.HTTP_304_NOT_MODIFIED:
+        return None
+    if hasattr(response, 'data'):
+        return response.data
+    try:
+        return loads_json(response.content)
+    except PayloadDecodeError:
+        return response.content.decode(response.charset or 'utf-8', errors='replace')
+
+
+def run_subrequest(request, path, query, headers, principals):
+    """Ejecuta una subpetición y devuelve (estado, cuerpo, encabezados)."""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {"error": "Ruta no encontrada."}, {}
+    if match.url_name not in settings.BATCH_ALLOWED_ROUTES:
+        return status.HTTP_403_FORBIDDEN, {"error": "Esta ruta no se puede usar en un lote."}, {}
+
+    sub = build_subrequest(request, path, query, headers, principals)
+    sub.resolver_match = match
+    response = match.func(sub, *match.args, **match.kwargs)
+    response_headers = {'ETag': response['ETag']} if response.has_header('ETag') else {}
+    return response.status_code, _response_body(response), response_headers
+
+
+class BatchView(views.APIView):
+    """
+    Ejecuta en un solo viaje de red varias peticiones GET a rutas internas.
+
+    POST /api/batch/
+
+    Responde `{"responses": [...], "duration_ms": ...}` en el mismo orden del
+    lote. Cada respuesta trae `id`, `path`, `status`, `body`, `headers` (la
+    ETag, si hay) y `duration_ms`, el tiempo de esa subpetición en el servidor.
+    """
+
+    @swagger_auto_schema(operation_summary="Endpoint para ejecutar un lote de peticiones GET")
+    def post(self, request):
+        try:
+            items = parse_batch(request.data)
+        except BatchError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        started = time.perf_counter()
+        principals = {}
+        responses = []
+        for item_id, path, query, headers in items:
+            item_started = time.perf_counter()
+            item_status, body, response_headers = run_subrequest(request._request, path, query, headers, principals)
+            responses.append({
+                'id': item_id,
+                'path': path + (f'?{query}' if query else ''),
+                'status': item_status,
+                'body': body,
+                'headers': response_headers,
+                'duration_ms': round((time.perf_counter() - item_started) * 1000, 3),
+            })
+        return Response({
+            'responses': responses,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,54 @@
+# server/config/consumers.py
+
+"""
+Formato de los mensajes de los WebSockets, negociado por subprotocolo.
+
+El cliente ofrece los subprotocolos que entiende al conectarse
+(`new WebSocket(url, ['msgpack', 'json'])`) y el servidor acepta el primero
+que soporte. Con `msgpack` los mensajes viajan como frames binarios; con
+`json` (o sin subprotocolo, como los clientes actuales) como texto JSON. Los
+codificadores son los de `config.renderers`.
+"""
+
+from .renderers import dumps_json, dumps_msgpack, loads_json, loads_msgpack, msgpack
+
+SUBPROTOCOL_JSON = 'json'
+SUBPROTOCOL_MSGPACK = 'msgpack'
+
+
+def supported_subprotocols():
+    return (SUBPROTOCOL_MSGPACK, SUBPROTOCOL_JSON) if msgpack is not None else (SUBPROTOCOL_JSON,)
+
+
+class NegotiatedFormatMixin:
+    """
+    Mixin para `AsyncWebsocketConsumer`: `accept()` negocia el subprotocolo,
+    `send_payload()` codifica en el formato acordado y `decode_payload()`
+    decodifica un mensaje recibido (texto o binario).
+    """
+    subprotocol = None
+
+    def negotiate_subprotocol(self):
+        supported = supported_subprotocols()
+        for offered in self.scope.get('subprotocols') or ():
+            if offered in supported:
+                return offered
+        return None
+
+    async def accept(self, subprotocol=None, headers=None):
+        self.subprotocol = subprotocol or self.negotiate_subprotocol()
+        await super().accept(subprotocol=self.subprotocol, headers=headers)
+
+    async def send_payload(self, data):
+        if self.subprotocol == SUBPROTOCOL_MSGPACK:
+            await self.send(bytes_data=dumps_msgpack(data))
+        else:
+            await self.send(text_data=dumps_json(data).decode('utf-8'))
+
+    def decode_payload(self, text_data=None, bytes_data=None):
+        """Lanza `PayloadDecodeError` si el mensaje no se puede decodificar."""
+        if text_data is not None:
+            return loads_json(text_data)
+        if self.subprotocol == SUBPROTOCOL_MSGPACK:
+            return loads_msgpack(bytes_data)
+        return loads_json(bytes_data)
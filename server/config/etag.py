@@ -0,0 +1,104 @@
+# server/config/etag.py
+
+"""
+ETags y GET condicional para los listados que la app móvil consulta cada vez
+que una pantalla recibe el foco.
+
+La ETag no se calcula a partir del cuerpo (habría que serializarlo para
+saber que no cambió): se deriva de la generación de la institución que
+mantiene `config.response_cache`, que se incrementa con cualquier cambio en
+viajes, reservas, rutas, vehículos, calificaciones o usuarios. Junto con la
+ruta, los parámetros, el usuario que consulta y el formato negociado (JSON o
+MessagePack, que se anuncia con `Vary: Accept`), leer ese contador cuesta un
+acceso a la caché.
+
+Si la petición trae `If-None-Match` con la ETag vigente, la vista responde
+304 justo después de autenticar y comprobar permisos, antes de consultar la
+base de datos o serializar. En otro caso la respuesta 200 lleva la ETag.
+"""
+
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .response_cache import GLOBAL_GENERATION, canonical_query, institution_generation
+
+SAFE_CONDITIONAL_METHODS = ('GET', 'HEAD')
+
+
+class NotModified(Exception):
+    """Se lanza desde `initial` para cortar la vista con un 304."""
+
+
+def compute_etag(*parts):
+    """ETag fuerte a partir de datos de versión, no del contenido."""
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(etag, if_none_match):
+    """Comparación débil de If-None-Match (RFC 9110), que acepta `*` y listas."""
+    if not if_none_match:
+        return False
+    candidates = parse_etags(if_none_match)
+    if '*' in candidates:
+        return True
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para vistas de listado (`ListAPIView` o `APIView` con `get`).
+
+    `etag_scope = 'global'` se usa en los listados que no están acotados a una
+    institución; las vistas cuyo listado pertenece a otro usuario (por ejemplo,
+    los viajes de un conductor dado en la URL) sobrescriben
+    `get_etag_institution_id`.
+    """
+    etag_scope = 'institution'
+
+    def get_etag_institution_id(self):
+        return self.request.user.institution_id
+
+    def get_etag_version(self):
+        if self.etag_scope == 'global':
+            return institution_generation(GLOBAL_GENERATION)
+        institution_id = self.get_etag_institution_id()
+        if not institution_id:
+            return None
+        return institution_generation(institution_id)
+
+    def get_etag(self, request):
+        version = self.get_etag_version()
+        if version is None:
+            return None
+        # La misma URL puede responder JSON o MessagePack según `Accept`: cada
+        # representación tiene su propia ETag.
+        return compute_etag(
+            version, request.path, canonical_query(request.query_params), request.user.pk,
+            request.accepted_renderer.media_type
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = None
+        if request.method in SAFE_CONDITIONAL_METHODS:
+            self._etag = self.get_etag(request)
+            if self._etag and etag_matches(self._etag, request.headers.get('If-None-Match')):
+                raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': self._etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+        if etag and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        patch_vary_headers(response, ('Accept',))
+        return response
@@ -0,0 +1,116 @@
+# server/config/idempotency.py
+
+"""
+Claves de idempotencia para los endpoints POST usados por la app móvil.
+
+La app reintenta los POST cuando la red del campus falla, y sin esta capa un
+reintento crea un segundo viaje, choca con la restricción única de la reserva
+o repite validaciones costosas. Si la petición trae el encabezado
+`Idempotency-Key`, la primera respuesta (junto con una huella de la petición)
+se guarda en la caché durante IDEMPOTENCY_TTL_SECONDS y los reintentos con la
+misma clave reciben esa respuesta sin volver a ejecutar la vista.
+
+- Misma clave y misma petición: se repite la respuesta guardada, con sus
+  encabezados y `Idempotent-Replayed: true`.
+- Misma clave y otra petición: 422, la clave no puede reutilizarse.
+- Misma clave mientras la primera petición sigue en curso: 409.
+
+Las claves se separan por usuario y por vista. Las respuestas 5xx y las
+excepciones no se guardan, para que el cliente pueda reintentar.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+STATE_IN_PROGRESS = 'in_progress'
+STATE_DONE = 'done'
+
+
+def request_fingerprint(request):
+    """Huella SHA-256 del método, la ruta y el cuerpo de la petición."""
+    data = request.data
+    if hasattr(data, 'lists'):
+        # QueryDict (formularios): se conservan todos los valores de cada campo.
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method}\n{request.path}\n{body}".encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Mixin para vistas de DRF que atiende el encabezado `Idempotency-Key` en
+    POST. Debe ir antes de la vista genérica en la lista de herencia.
+    """
+
+    def idempotency_cache_key(self, request, key):
+        return f"idempotency:{type(self).__name__}:{request.user.pk}:{key}"
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().post(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"El encabezado {IDEMPOTENCY_HEADER} admite como máximo {MAX_KEY_LENGTH} caracteres."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache_key = self.idempotency_cache_key(request, key)
+        fingerprint = request_fingerprint(request)
+        in_progress = {'state': STATE_IN_PROGRESS, 'fingerprint': fingerprint}
+        if not cache.add(cache_key, in_progress, settings.IDEMPOTENCY_LOCK_SECONDS):
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return self.stored_response(stored, fingerprint)
+            # La entrada expiró entre add y get: se vuelve a reservar. Si otra
+            # petición la reservó primero, esta se trata como en curso.
+            if not cache.add(cache_key, in_progress, settings.IDEMPOTENCY_LOCK_SECONDS):
+                return self.in_progress_response()
+
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+        else:
+            cache.set(cache_key, {
+                'state': STATE_DONE,
+                'fingerprint': fingerprint,
+                'status_code': response.status_code,
+                'data': response.data,
+                # Encabezados puestos por la vista (p. ej. Location). Content-Type
+                # lo fija el renderizado al repetir la respuesta.
+                'headers': {
+                    name: value for name, value in response.items() if name.lower() != 'content-type'
+                },
+            }, settings.IDEMPOTENCY_TTL_SECONDS)
+        return response
+
+    def stored_response(self, stored, fingerprint):
+        """Respuesta para un reintento con una clave ya registrada."""
+        if stored['fingerprint'] != fingerprint:
+            return Response(
+                {"error": "La clave de idempotencia ya se usó con una petición diferente."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        if stored['state'] == STATE_IN_PROGRESS:
+            return self.in_progress_response()
+        headers = {**stored.get('headers', {}), REPLAYED_HEADER: 'true'}
+        return Response(stored['data'], status=stored['status_code'], headers=headers)
+
+    def in_progress_response(self):
+        return Response(
+            {"error": "Una petición con esta clave de idempotencia todavía está en proceso."},
+            status=status.HTTP_409_CONFLICT
+        )
@@ -0,0 +1,27 @@
+# server/config/management/commands/build_api_schema.py
+
+from django.core.management.base import BaseCommand
+
+from config.schema import build_schema_documents, code_version, schema_path
+
+
+class Command(BaseCommand):
+    """
+    Define el comando `manage.py build_api_schema`.
+    Genera el esquema OpenAPI de la versión actual del código y lo guarda en
+    API_SCHEMA_DIR y en la caché. Pensado para ejecutarse en cada despliegue,
+    antes de levantar los procesos, para que ninguna petición lo genere.
+    """
+    help = 'Genera y guarda el esquema OpenAPI de la versión actual.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Carpeta donde se guarda el esquema (por defecto, API_SCHEMA_DIR).',
+        )
+
+    def handle(self, *args, **options):
+        documents = build_schema_documents(options['output'])
+        for fmt, document in documents.items():
+            self.stdout.write(f'{schema_path(fmt, options["output"])}: {len(document.content)} bytes, ETag {document.etag}')
+        self.stdout.write(self.style.SUCCESS(f'Esquema generado para la versión {code_version()}.'))
@@ -0,0 +1,152 @@
+# server/config/projection.py
+
+"""
+Ruta de lectura rápida para los listados más pesados.
+
+Serializar una lista grande con `ModelSerializer` instancia modelos y recorre
+cada campo de cada fila por separado. Una `Projection` compila una sola vez
+el serializador de la vista en un plan de columnas: para cada campo guarda la
+ruta de `values()` (`driver__user__full_name`) y la función que lo convierte
+(el `to_representation` del propio campo de DRF). Con eso las filas se leen
+como diccionarios con `values()` y la respuesta se arma sin crear modelos, con
+la misma forma y los mismos valores que produce el serializador.
+
+Los campos que no salen de una columna (`SerializerMethodField`, listas
+anidadas, `StringRelatedField`) se declaran en `computed` como funciones
+`(fila, extra, context)`, donde `extra` es lo que devuelve `prefetch` para el
+lote completo de filas (por ejemplo, conteos agrupados en una sola consulta).
+Una función puede devolver `OMIT` para que el campo no aparezca.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .sparse_fields import is_sparse_request
+
+# Valor que devuelve un campo calculado para no aparecer en la respuesta.
+OMIT = object()
+
+
+def _source_path(field):
+    return field.source.replace('.', '__')
+
+
+def _identity(value):
+    return value
+
+
+class Projection:
+    """
+    Plan de columnas compilado a partir de un serializador de lectura.
+
+    `computed` asocia nombres de campo (con puntos para los anidados, como
+    `driver.user`) a funciones; `extra_columns` son columnas adicionales que
+    esas funciones leen de la fila; `prefetch(rows, context)` carga de una vez
+    los datos que comparten todas las filas.
+    """
+
+    def __init__(self, serializer_class, computed=None, extra_columns=(), prefetch=None):
+        self.serializer_class = serializer_class
+        self.computed = computed or {}
+        self.extra_columns = tuple(extra_columns)
+        self.prefetch = prefetch
+        self._plan = None
+        self._columns = None
+
+    def _compile(self, serializer, prefix, name_prefix):
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            qualified = name_prefix + name
+            if qualified in self.computed:
+                plan.append((name, 'computed', self.computed[qualified]))
+                continue
+            path = prefix + _source_path(field)
+            if isinstance(field, (serializers.ListSerializer, serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(f"El campo '{qualified}' necesita una función en `computed`.")
+            if isinstance(field, serializers.BaseSerializer):
+                pk_path = path + '__' + field.Meta.model._meta.pk.name
+                plan.append((name, 'nested', (pk_path, self._compile(field, path + '__', qualified + '.'))))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                plan.append((name, 'column', (path, _identity)))
+            elif isinstance(field, serializers.RelatedField):
+                raise ImproperlyConfigured(f"El campo '{qualified}' necesita una función en `computed`.")
+            else:
+                plan.append((name, 'column', (path, field.to_representation)))
+        return plan
+
+    def _collect_columns(self, plan, columns):
+        for _, kind, payload in plan:
+            if kind == 'column':
+                columns.append(payload[0])
+            elif kind == 'nested':
+                columns.append(payload[0])
+                self._collect_columns(payload[1], columns)
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._compile(self.serializer_class(), '', '')
+            columns = []
+            self._collect_columns(self._plan, columns)
+            columns.extend(self.extra_columns)
+            self._columns = list(dict.fromkeys(columns))
+        return self._plan
+
+    @property
+    def columns(self):
+        self.plan
+        return self._columns
+
+    def _build(self, plan, row, extra, context):
+        data = {}
+        for name, kind, payload in plan:
+            if kind == 'column':
+                value = row[payload[0]]
+                data[name] = None if value is None else payload[1](value)
+            elif kind == 'nested':
+                data[name] = None if row[payload[0]] is None else self._build(payload[1], row, extra, context)
+            else:
+                value = payload(row, extra, context)
+                if value is not OMIT:
+                    data[name] = value
+        return data
+
+    def rows(self, queryset):
+        """Filas de `values()` con todas las columnas que necesita el plan."""
+        # select_related no aplica a values() y prefetch_related no se admite.
+        return list(queryset.prefetch_related(None).values(*self.columns))
+
+    def render_rows(self, rows, context=None):
+        context = context or {}
+        plan = self.plan
+        extra = self.prefetch(rows, context) if self.prefetch else None
+        return [self._build(plan, row, extra, context) for row in rows]
+
+    def render(self, queryset, context=None):
+        """Lista de diccionarios idéntica a `serializer_class(queryset, many=True).data`."""
+        return self.render_rows(self.rows(queryset), context)
+
+
+class ProjectionListMixin:
+    """
+    Mixin para `ListAPIView` que arma la lista con `projection` en lugar del
+    serializador. Si la petición usa `?fields=` o `?expand=`, o la vista está
+    paginada, se usa el serializador normal.
+    """
+    projection = None
+
+    def use_projection(self):
+        return (
+            self.projection is not None
+            and self.paginator is None
+            and not is_sparse_request(self.request)
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_projection():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(self.projection.render(queryset, self.get_serializer_context()))
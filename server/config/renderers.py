@@ -0,0 +1,135 @@
+# server/config/renderers.py
+
+"""
+Renderizadores y parsers de la API, y los codificadores que comparten con
+los WebSockets.
+
+- JSON: por defecto se codifica con orjson (si está instalado y
+  `API_JSON_ENGINE = 'orjson'`), que es varias veces más rápido que el módulo
+  `json`. La salida es la misma que la del `JSONRenderer` de DRF: JSON
+  compacto, UTF-8, con U+2028/U+2029 escapados.
+- MessagePack (`Accept: application/msgpack`): binario, más pequeño y más
+  rápido de decodificar en el móvil. Requiere el paquete `msgpack`.
+
+Los tipos que ninguno de los dos formatos conoce (fechas, `Decimal`, cadenas
+perezosas de traducción, UUID, ...) pasan por el `JSONEncoder` de DRF, así que
+se representan igual en JSON, en MessagePack y con el renderizador original:
+fechas ISO 8601 con `Z` para UTC y `Decimal` como número.
+"""
+
+import json
+
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+encode_default = encoders.JSONEncoder().default
+
+# Las fechas se delegan a `encode_default` para conservar el formato de DRF.
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class PayloadDecodeError(ValueError):
+    """El cuerpo o el mensaje recibido no es JSON/MessagePack válido."""
+
+
+def use_orjson():
+    return orjson is not None and getattr(settings, 'API_JSON_ENGINE', 'orjson') == 'orjson'
+
+
+def dumps_json(data):
+    """JSON compacto en bytes UTF-8, igual al que produce DRF."""
+    if use_orjson():
+        output = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+    else:
+        output = json.dumps(
+            data, cls=encoders.JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        ).encode('utf-8')
+    # U+2028 y U+2029 son válidos en JSON pero no en JavaScript.
+    if b'\xe2\x80\xa8' in output or b'\xe2\x80\xa9' in output:
+        output = output.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return output
+
+
+def loads_json(data):
+    try:
+        if use_orjson():
+            return orjson.loads(data)
+        return json.loads(data)
+    except ValueError as exc:
+        raise PayloadDecodeError(str(exc)) from exc
+
+
+def dumps_msgpack(data):
+    return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+def loads_msgpack(data):
+    try:
+        return msgpack.unpackb(data, raw=False)
+    except (ValueError, TypeError) as exc:
+        raise PayloadDecodeError(str(exc)) from exc
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    `JSONRenderer` de DRF con orjson. Si se pide sangría (`; indent=4` en el
+    Accept) o orjson no está disponible, se usa el renderizador original.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if not use_orjson() or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps_json(data)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = MSGPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps_msgpack(data)
+
+
+class JSONParser(parsers.JSONParser):
+    """`JSONParser` de DRF con orjson para los cuerpos en UTF-8."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not use_orjson() or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads_json(stream.read())
+        except PayloadDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % exc)
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads_msgpack(stream.read())
+        except PayloadDecodeError as exc:
+            raise ParseError('MessagePack parse error - %s' % exc)
@@ -0,0 +1,133 @@
+# server/config/response_cache.py
+
+"""
+Caché de respuestas compartidas por institución.
+
+Listados como `/api/travel/institution/` o `/api/route/list/` devuelven lo
+mismo a todos los miembros de una institución, así que la respuesta se guarda
+una vez por (institución, endpoint, parámetros) y se reutiliza.
+
+Para invalidar no se buscan ni se borran claves: cada institución tiene un
+contador de generación que forma parte de la clave. Cualquier cambio en sus
+viajes, reservas, rutas, vehículos o calificaciones incrementa el contador
+(O(1)) y las entradas anteriores simplemente dejan de leerse hasta que
+expiran. Los campos que dependen de quién consulta (por ejemplo, las reservas
+que solo ve el conductor del viaje) no se guardan en la caché: cada vista los
+agrega por usuario en `personalize_response`.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from users.models import Users
+
+CACHE_STATUS_HEADER = 'X-Response-Cache'
+
+# Generación que se incrementa con cualquier cambio, de cualquier institución.
+# La usan los listados que no están acotados a una institución.
+GLOBAL_GENERATION = 'all'
+
+
+def generation_key(institution_id):
+    return f"response_cache:generation:{institution_id}"
+
+
+def institution_generation(institution_id):
+    """
+    Generación actual de la institución. Si el contador no existe (o la caché
+    lo descartó) se inicializa con la hora en milisegundos, que siempre es
+    mayor que cualquier generación anterior, para no revivir entradas viejas.
+    """
+    key = generation_key(institution_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(time.time() * 1000), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _incr_generation(scope):
+    key = generation_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
+
+
+def bump_institution_generation(institution_id):
+    """Invalida todas las respuestas en caché de la institución."""
+    _incr_generation(GLOBAL_GENERATION)
+    if institution_id:
+        _incr_generation(institution_id)
+
+
+def bump_institution_generation_on_commit(institution_id):
+    """Incrementa la generación cuando la transacción actual se confirme."""
+    transaction.on_commit(lambda: bump_institution_generation(institution_id))
+
+
+def driver_institution_id(driver_id):
+    """Institución del conductor (su pk es el uid del usuario), en una consulta."""
+    return Users.objects.filter(uid=driver_id).values_list('institution_id', flat=True).first()
+
+
+def bump_driver_institution_on_commit(driver_id):
+    """Atajo para los modelos que solo conocen al conductor (rutas, vehículos, ...)."""
+    bump_institution_generation_on_commit(driver_institution_id(driver_id))
+
+
+def canonical_query(query_params):
+    """Parámetros de la petición en un orden estable, para usarlos en claves."""
+    return '&'.join(
+        f"{name}={value}" for name in sorted(query_params) for value in query_params.getlist(name)
+    )
+
+
+def response_cache_key(institution_id, endpoint, query_params):
+    digest = hashlib.sha1(canonical_query(query_params).encode()).hexdigest()
+    return f"response_cache:{institution_id}:{institution_generation(institution_id)}:{endpoint}:{digest}"
+
+
+class InstitutionResponseCacheMixin:
+    """
+    Mixin para `ListAPIView` cuyo listado depende solo de la institución del
+    usuario y de los parámetros de la petición. El serializador recibe
+    `shared_response=True` en su contexto para omitir los campos por usuario,
+    que la vista agrega después en `personalize_response`.
+    """
+    response_cache_endpoint = None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['shared_response'] = getattr(self, '_building_shared_response', False)
+        return context
+
+    def list(self, request, *args, **kwargs):
+        institution_id = request.user.institution_id
+        if not institution_id:
+            return super().list(request, *args, **kwargs)
+
+        key = response_cache_key(
+            institution_id, self.response_cache_endpoint or type(self).__name__, request.query_params
+        )
+        data = cache.get(key)
+        status_header = 'hit'
+        if data is None:
+            status_header = 'miss'
+            self._building_shared_response = True
+            try:
+                # La lista la arma la vista base (serializador o proyección).
+                data = list(super().list(request, *args, **kwargs).data)
+            finally:
+                self._building_shared_response = False
+            cache.set(key, data, settings.RESPONSE_CACHE_TTL_SECONDS)
+        return Response(self.personalize_response(data), headers={CACHE_STATUS_HEADER: status_header})
+
+    def personalize_response(self, data):
+        """Agrega a la respuesta compartida los campos propios del usuario."""
+        return data
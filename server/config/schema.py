@@ -0,0 +1,151 @@
+# server/config/schema.py
+
+"""
+Esquema OpenAPI generado una vez por versión del código.
+
+drf-yasg recorre todas las vistas y serializadores cada vez que se pide el
+esquema, y las herramientas internas lo consultan constantemente. Aquí el
+esquema se genera una vez, en el despliegue (`manage.py build_api_schema`) o
+en la primera petición, y se guarda en JSON y YAML bajo la versión del código:
+
+- `API_SCHEMA_VERSION` (por ejemplo, el commit desplegado) o, si no está
+  definida, un hash del código fuente de las apps;
+- en la caché de Django y en `API_SCHEMA_DIR`, para que todos los procesos
+  usen la copia del despliegue aunque la caché sea local a cada uno.
+
+`/swagger.json`, `/swagger.yaml` y el documento que cargan `/swagger/` y
+`/redoc/` se sirven desde esa copia con una ETag (hash del contenido), así
+que una revalidación sin cambios responde 304 sin cuerpo.
+"""
+
+import hashlib
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer
+
+from .etag import compute_etag, etag_matches
+
+API_INFO = openapi.Info(
+    title="Uway API", # Título de tu API en la documentación.
+    default_version='v3',
+    description="Documentación de la API para el proyecto Uway.",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@uway.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+SCHEMA_FORMATS = {
+    'json': OpenAPICodecJson,
+    'yaml': OpenAPICodecYaml,
+}
+
+SPEC_RENDERERS = (OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer)
+
+SchemaDocument = namedtuple('SchemaDocument', 'etag content')
+
+# Copia en memoria del proceso, para no leer la caché en cada petición.
+_documents = {}
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Versión del código con la que se identifica el esquema guardado."""
+    if settings.API_SCHEMA_VERSION:
+        return settings.API_SCHEMA_VERSION
+    base_dir = Path(settings.BASE_DIR).resolve()
+    digest = hashlib.sha1()
+    roots = sorted({Path(config.path).resolve() for config in apps.get_app_configs()} | {base_dir / 'config'})
+    for root in roots:
+        if base_dir not in root.parents and root != base_dir:
+            continue  # Apps de terceros: cambian con requirements.txt, no con el código.
+        for source in sorted(root.rglob('*.py')):
+            if source.name.startswith('test_') or 'migrations' in source.parts:
+                continue
+            digest.update(str(source.relative_to(base_dir)).encode())
+            digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(fmt, directory=None):
+    return Path(directory or settings.API_SCHEMA_DIR) / f'schema-{code_version()}.{fmt}'
+
+
+def schema_cache_key(fmt):
+    return f"api_schema:{code_version()}:{fmt}"
+
+
+def generate_schema():
+    """Genera el esquema completo (la operación costosa)."""
+    generator = OpenAPISchemaGenerator(API_INFO)
+    return generator.get_schema(request=None, public=True)
+
+
+def build_schema_documents(directory=None):
+    """
+    Genera el esquema y lo guarda en todos los formatos, en la caché y en
+    `directory` (por defecto, API_SCHEMA_DIR). Devuelve `{formato: SchemaDocument}`.
+    """
+    schema = generate_schema()
+    documents = {}
+    for fmt, codec_class in SCHEMA_FORMATS.items():
+        content = codec_class(validators=[]).encode(schema)
+        document = SchemaDocument(compute_etag(content.decode('utf-8')), content)
+        documents[fmt] = document
+        cache.set(schema_cache_key(fmt), document, None)
+        _documents[schema_cache_key(fmt)] = document
+        path = schema_path(fmt, directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Se escribe aparte y se renombra para no servir un archivo a medias.
+        partial = path.with_suffix(path.suffix + '.tmp')
+        partial.write_bytes(content)
+        partial.replace(path)
+    return documents
+
+
+def schema_document(fmt):
+    """Documento guardado para la versión actual; lo genera si no existe."""
+    key = schema_cache_key(fmt)
+    document = _documents.get(key) or cache.get(key)
+    if document is None:
+        path = schema_path(fmt)
+        if path.exists():
+            content = path.read_bytes()
+            document = SchemaDocument(compute_etag(content.decode('utf-8')), content)
+            cache.set(key, document, None)
+        else:
+            document = build_schema_documents()[fmt]
+    _documents[key] = document
+    return document
+
+
+class StoredSchemaMixin:
+    """
+    Para la vista de drf-yasg: las peticiones del documento (JSON, YAML u
+    `?format=openapi` desde la interfaz) se responden con la copia guardada.
+    La página HTML de Swagger UI y ReDoc sigue a cargo de drf-yasg, que la
+    arma sin recorrer las vistas.
+    """
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, SPEC_RENDERERS):
+            return super().get(request, version, format)
+        fmt = 'yaml' if isinstance(renderer, SwaggerYAMLRenderer) else 'json'
+        document = schema_document(fmt)
+        if etag_matches(document.etag, request.headers.get('If-None-Match')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(document.content, content_type=f'{renderer.media_type}; charset=utf-8')
+        response['ETag'] = document.etag
+        # El cliente puede guardar el documento pero debe revalidarlo.
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -14,6 +14,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 import environ
+from importlib.util import find_spec
 from pathlib import Path
 import sys
 
@@ -40,6 +41,135 @@ SECRET_KEY = 'django-insecure-16*s0a%bh==&1h8iw#6^aa+6w__(%5vs#)94hcic*&b78bm@+5
 # Lee la clave de la API de Google Maps desde el archivo .env. Si no existe, es None.
 API_KEY_GOOGLE_MAPS = env('API_KEY_GOOGLE_MAPS', default=None)
 
+# --- Motor de enrutamiento offline (respaldo de la Directions API) ---
+# Ruta a un archivo JSON con el grafo vial de la región. Si no se define,
+# el motor queda deshabilitado y solo se usa la API de Google.
+OFFLINE_ROUTING_GRAPH_PATH = env('OFFLINE_ROUTING_GRAPH_PATH', default=None)
+# Algoritmo de búsqueda: 'astar' o 'bidirectional'.
+OFFLINE_ROUTING_ALGORITHM = env('OFFLINE_ROUTING_ALGORITHM', default='astar')
+# Velocidad promedio (km/h) usada para estimar la duración de las rutas offline.
+OFFLINE_ROUTING_SPEED_KMH = env.float('OFFLINE_ROUTING_SPEED_KMH', default=30.0)
+# Distancia máxima (m) entre un punto pedido y el nodo del grafo más cercano.
+OFFLINE_ROUTING_MAX_SNAP_M = env.float('OFFLINE_ROUTING_MAX_SNAP_M', default=2000.0)
+
+# --- Geocodificación inversa por lotes ---
+# Número máximo de coordenadas aceptadas por petición.
+REVERSE_GEOCODE_BATCH_MAX = 50
+# Decimales usados para cuantizar las coordenadas (4 decimales ≈ 11 m).
+REVERSE_GEOCODE_QUANTIZE_DECIMALS = 4
+# Peticiones simultáneas máximas hacia la API de Google.
+REVERSE_GEOCODE_BATCH_CONCURRENCY = 4
+# Tiempo (segundos) que se conserva en caché cada dirección resuelta.
+REVERSE_GEOCODE_CACHE_TTL = 60 * 60 * 24
+
+# --- Rutas canónicas compartidas ---
+# Distancia máxima (m) entre los extremos de dos rutas para considerarlas la misma.
+ROUTE_INTERNING_TOLERANCE_M = 150
+
+# --- Búsqueda de viajes por proximidad ---
+# Radio máximo (km) aceptado en las búsquedas por proximidad.
+PROXIMITY_MAX_RADIUS_KM = 25.0
+# Número máximo de rutas candidatas consideradas en cada búsqueda.
+PROXIMITY_MAX_CANDIDATES = 1000
+# Ventana de tiempo (horas) usada cuando la búsqueda no indica 'time_to'.
+PROXIMITY_DEFAULT_WINDOW_HOURS = 24
+
+# --- Emparejamiento de pasajeros con viajes ---
+# Desvío máximo (m) que se le puede pedir a un conductor para recoger y dejar a un pasajero.
+MATCHING_MAX_DETOUR_M = 5000
+# Peso de cada término del puntaje (desvío, diferencia de hora y cupos).
+MATCHING_WEIGHTS = {'detour': 0.6, 'time': 0.3, 'seats': 0.1}
+# Ventana (minutos) alrededor de la hora pedida cuando no se indica 'window_minutes'.
+MATCHING_DEFAULT_WINDOW_MINUTES = 60
+# Número máximo de viajes devueltos por el emparejamiento.
+MATCHING_MAX_RESULTS = 50
+
+# --- Abordaje masivo ---
+# Número máximo de reservas que un conductor puede confirmar en un solo lote.
+REALIZE_BULK_CONFIRM_MAX = 100
+
+# --- Lista de espera ---
+# Número máximo de usuarios en espera a los que se les notifica su nueva posición.
+WAITLIST_NOTIFY_LIMIT = 50
+
+# --- Barrido de viajes abandonados ---
+# Minutos de tolerancia tras la hora de salida antes de cancelar un viaje que nunca se inició.
+TRAVEL_SWEEP_SCHEDULED_GRACE_MINUTES = 60
+# Horas tras la hora de salida después de las cuales un viaje en curso se da por completado.
+TRAVEL_SWEEP_IN_PROGRESS_MAX_HOURS = 6
+# Viajes actualizados por cada UPDATE del barrido.
+TRAVEL_SWEEP_BATCH_SIZE = 500
+# Segundos entre barridos cuando el comando se ejecuta en modo continuo (--loop).
+TRAVEL_SWEEP_INTERVAL_SECONDS = 300
+
+# --- Programaciones recurrentes de viajes ---
+# Días hacia adelante para los que se generan los viajes de cada programación.
+TRAVEL_SCHEDULE_HORIZON_DAYS = 14
+# Zona horaria en la que se interpreta la hora de salida de las programaciones.
+TRAVEL_SCHEDULE_TIME_ZONE = 'America/Bogota'
+# Minutos mínimos entre un viaje generado y otro viaje activo del mismo conductor.
+TRAVEL_SCHEDULE_CONFLICT_MINUTES = 30
+
+# --- Creación masiva de viajes ---
+# Número máximo de viajes por petición al endpoint de creación masiva.
+TRAVEL_BULK_CREATE_MAX = 500
+
+# --- Claves de idempotencia ---
+# Segundos durante los que se guarda la respuesta asociada a un Idempotency-Key.
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+# Segundos que una clave queda reservada mientras su primera petición se procesa.
+IDEMPOTENCY_LOCK_SECONDS = 60
+
+# --- Caché de respuestas por institución ---
+# Segundos que se conserva una respuesta compartida (las invalidaciones son inmediatas).
+RESPONSE_CACHE_TTL_SECONDS = 300
+
+# --- Exportación del historial de las instituciones ---
+# Filas leídas de la base de datos (y escritas a la salida) por bloque.
+EXPORT_CHUNK_SIZE = 2000
+
+# --- Formatos de respuesta (ver config.renderers) ---
+# Motor del JSON de la API y de los WebSockets: 'orjson' (si está instalado) o 'json'.
+API_JSON_ENGINE = env('API_JSON_ENGINE', default='orjson')
+
+# --- Sincronización incremental (ver sync.changes) ---
+# Filas por conjunto en cada página de /api/sync/ (y máximo con ?limit=).
+SYNC_PAGE_SIZE = 200
+SYNC_MAX_PAGE_SIZE = 1000
+# Segundos que se repiten al continuar una sincronización completa, para no
+# perder filas de transacciones que confirmaron tarde.
+SYNC_OVERLAP_SECONDS = 5
+# Días que se conservan las lápidas; los tokens más antiguos reciben 410.
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# --- Lotes de peticiones (ver config.batch) ---
+BATCH_MAX_REQUESTS = 20
+# Nombres de las rutas GET que se pueden pedir dentro de un lote.
+BATCH_ALLOWED_ROUTES = {
+    'assessment-list-all',
+    'assessment-list-by-driver',
+    'info',
+    'institution-driver-applications',
+    'institution-list-own-users',
+    'institution-travel-list',
+    'profile',
+    'realize-list-my',
+    'realize-waitlist',
+    'route-list',
+    'route-my-routes',
+    'route-popular',
+    'travel-route',
+    'travel-schedule-list',
+    'vehicle-list',
+}
+
+# --- Esquema OpenAPI (ver config.schema) ---
+# Versión con la que se guarda el esquema (por ejemplo, el commit desplegado).
+# Vacía: se usa un hash del código fuente de las apps.
+API_SCHEMA_VERSION = env('API_SCHEMA_VERSION', default='')
+# Carpeta donde `manage.py build_api_schema` deja el esquema para todos los procesos.
+API_SCHEMA_DIR = env('API_SCHEMA_DIR', default=str(BASE_DIR / 'var' / 'api_schema'))
+
 # ADVERTENCIA DE SEGURIDAD: ¡no ejecutes con debug activado en producción!
 DEBUG = True
 
@@ -53,6 +183,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # JSON con orjson y MessagePack (`Accept: application/msgpack`) si está instalado.
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.JSONRenderer',
+        *(['config.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.renderers.JSONParser',
+        *(['config.renderers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # --- Configuración de Simple JWT ---
@@ -101,6 +243,8 @@ INSTALLED_APPS = [
     'travel',
     'assessment',
     'realize',
+    'sync',
+    'config',  # Solo para sus comandos de gestión (build_api_schema, test_setup).
 ]
 
 # Permite que cualquier origen (dominio) haga peticiones a tu API.
@@ -0,0 +1,129 @@
+# server/config/sparse_fields.py
+
+"""
+Selección de campos (`?fields=`) y control de expansión (`?expand=`) para los
+serializadores de lectura.
+
+- `?fields=id,time,price,available_seats` devuelve solo esos campos.
+- `?expand=route` mantiene anidadas únicamente las relaciones listadas; las
+  demás relaciones expandibles se devuelven como su ID. `?expand=` vacío
+  deja todas como ID. Sin el parámetro, la respuesta conserva su forma
+  completa de siempre.
+
+Además del serializador, el queryset se ajusta a la selección: cada campo
+declara en `field_requirements` las columnas (`only`) y relaciones
+(`select_related` / `prefetch_related`) que necesita, y `prune_queryset`
+reconstruye el queryset solo con las de los campos pedidos, de modo que las
+relaciones que no se muestran nunca se cargan de la base de datos.
+"""
+
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_field_list(query_params, name):
+    """Lista separada por comas como conjunto; None si el parámetro no viene."""
+    if name not in query_params:
+        return None
+    return {part.strip() for part in query_params.get(name, '').split(',') if part.strip()}
+
+
+def is_sparse_request(request):
+    """Indica si la petición usa `?fields=` o `?expand=`."""
+    params = request.query_params
+    return FIELDS_PARAM in params or EXPAND_PARAM in params
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Mixin para serializadores de lectura usados en el nivel superior de una
+    respuesta. Lee los parámetros de `context['request']`.
+
+    `expandable_fields` son las relaciones anidadas que `?expand=` puede
+    reducir a su ID. `field_requirements` asocia cada campo con un dict de
+    listas `only`, `select_related` y `prefetch_related`; los campos del
+    modelo se añaden a `only` automáticamente y, en las relaciones
+    expandibles, los requisitos solo se aplican cuando se expanden.
+    """
+    expandable_fields = ()
+    field_requirements = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields, expand = self.field_selection(request)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+        if expand is not None:
+            for name in self.expandable_fields:
+                if name in self.fields and name not in expand:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    @classmethod
+    def field_selection(cls, request):
+        """Tupla (campos, expandidos); cada elemento es None si no se pidió."""
+        if request is None or not hasattr(request, 'query_params'):
+            return None, None
+        return (
+            parse_field_list(request.query_params, FIELDS_PARAM),
+            parse_field_list(request.query_params, EXPAND_PARAM),
+        )
+
+    @classmethod
+    def requested_fields(cls, request):
+        """Nombres de los campos que tendrá la respuesta."""
+        fields, _ = cls.field_selection(request)
+        declared = cls.Meta.fields
+        return [name for name in declared if fields is None or name in fields]
+
+    @classmethod
+    def prune_queryset(cls, queryset, request):
+        """
+        Ajusta `select_related`, `prefetch_related` y `only()` a los campos
+        pedidos. Sin `?fields=` ni `?expand=` el queryset no se modifica.
+        """
+        fields, expand = cls.field_selection(request)
+        if fields is None and expand is None:
+            return queryset
+
+        opts = queryset.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        only = {opts.pk.name}
+        select_related = set()
+        prefetch_related = set()
+        for name in cls.requested_fields(request):
+            if name in concrete:
+                only.add(name)
+            if name in cls.expandable_fields and expand is not None and name not in expand:
+                continue
+            requirements = cls.field_requirements.get(name, {})
+            only.update(requirements.get('only', ()))
+            select_related.update(requirements.get('select_related', ()))
+            prefetch_related.update(requirements.get('prefetch_related', ()))
+
+        # Cada relación que se recorre con select_related debe cargar su llave.
+        only.update(path.split('__')[0] for path in select_related)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select_related:
+            queryset = queryset.select_related(*sorted(select_related))
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(prefetch_related))
+        return queryset.only(*sorted(only))
+
+
+class SparseFieldsViewMixin:
+    """
+    Mixin para `GenericAPIView`: aplica `prune_queryset` del serializador de
+    la vista al queryset filtrado.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'prune_queryset'):
+            queryset = serializer_class.prune_queryset(queryset, self.request)
+        return queryset
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from travel.test_views import TravelSearchTestMixin
+
+BATCH_URL = '/api/batch/'
+
+
+class BatchViewTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para los lotes de peticiones GET.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self._travel(self.near_route, 2)
+
+    def _batch(self, *requests):
+        return self.client.post(BATCH_URL, {'requests': list(requests)}, format='json')
+
+    def test_responses_match_individual_requests(self):
+        paths = [
+            f'/api/assessment/assessments/driver/{self.driver.pk}/',
+            '/api/vehicle/my-vehicles/',
+            '/api/route/my-routes/',
+            '/api/travel/institution/?fields=id,travel_state',
+        ]
+        response = self._batch(*({'id': index, 'path': path} for index, path in enumerate(paths)))
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([result['id'] for result in results], [0, 1, 2, 3])
+        for path, result in zip(paths, results):
+            direct = self.client.get(path)
+            self.assertEqual(result['status'], direct.status_code, path)
+            self.assertEqual(result['body'], direct.json(), path)
+            self.assertEqual(result['path'], path)
+            self.assertGreaterEqual(result['duration_ms'], 0)
+        self.assertGreaterEqual(response.json()['duration_ms'], 0)
+
+    def test_principal_is_loaded_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._batch(
+                {'path': '/api/vehicle/my-vehicles/'},
+                {'path': '/api/route/my-routes/'},
+                {'path': '/api/realize/my-reservations/'},
+            )
+        user_lookups = [query for query in queries.captured_queries if query['sql'].startswith('SELECT "users"."uid"')]
+        self.assertEqual(len(user_lookups), 1)
+
+    def test_sub_request_etags(self):
+        first = self._batch({'path': '/api/route/my-routes/'}).json()['responses'][0]
+        etag = first['headers']['ETag']
+        second = self._batch({'path': '/api/route/my-routes/', 'headers': {'If-None-Match': etag}}).json()['responses'][0]
+        self.assertEqual(second['status'], 304)
+        self.assertIsNone(second['body'])
+
+    def test_routes_outside_the_whitelist(self):
+        results = self._batch(
+            {'path': '/api/users/bootstrap/'},
+            {'path': BATCH_URL},
+            {'path': '/api/nothing-here/'},
+            {'path': '/api/vehicle/my-vehicles/'},
+        ).json()['responses']
+        self.assertEqual([result['status'] for result in results], [403, 403, 404, 200])
+
+    def test_sub_requests_keep_their_permissions(self):
+        self.client.credentials()
+        result = self._batch({'path': '/api/vehicle/my-vehicles/'}).json()['responses'][0]
+        self.assertEqual(result['status'], 403)
+
+    def test_institution_principal(self):
+        token = jwt.encode(
+            {'institution_id': self.institution.id_institution, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        result = self._batch({'path': '/api/institutions/users/'}).json()['responses'][0]
+        self.assertEqual(result['status'], 200)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_invalid_batches(self):
+        for body in (
+            {},
+            {'requests': []},
+            {'requests': [{'path': '/api/route/my-routes/'}] * 3},
+            {'requests': [{'path': 'https://example.com/api/route/my-routes/'}]},
+            {'requests': [{'path': '/api/route/my-routes/', 'headers': {'Authorization': 'Bearer x'}}]},
+            {'requests': ['/api/route/my-routes/']},
+        ):
+            response = self.client.post(BATCH_URL, body, format='json')
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn('error', response.json())
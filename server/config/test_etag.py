@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from config.etag import etag_matches
+from travel.test_views import TravelSearchTestMixin
+from users.models import Users
+
+
+class ConditionalGetTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para las ETags y el GET condicional de los listados.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self._travel(self.near_route, 1)
+
+    def authenticate(self, user):
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_matching_etag_returns_304_before_querying(self):
+        first = self.client.get('/api/travel/institution/')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first['ETag']
+        # Solo la autenticación toca la base de datos.
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/travel/institution/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second['ETag'], etag)
+        self.assertEqual(second.content, b'')
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self.client.get('/api/travel/institution/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self._travel(self.near_route, 2)
+        response = self.client.get('/api/travel/institution/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 2)
+
+    def test_each_representation_has_its_own_etag(self):
+        as_json = self.client.get('/api/travel/institution/', HTTP_ACCEPT='application/json')
+        as_msgpack = self.client.get('/api/travel/institution/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(as_msgpack['Content-Type'], 'application/msgpack')
+        self.assertNotEqual(as_json['ETag'], as_msgpack['ETag'])
+        self.assertIn('Accept', as_json['Vary'])
+        self.assertIn('Accept', as_msgpack['Vary'])
+
+        # El cuerpo JSON guardado no sirve para una petición MessagePack.
+        response = self.client.get(
+            '/api/travel/institution/', HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=as_json['ETag']
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(
+            '/api/travel/institution/', HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=as_msgpack['ETag']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Accept', response['Vary'])
+
+    def test_etag_depends_on_path_and_query(self):
+        etags = {
+            self.client.get('/api/route/list/')['ETag'],
+            self.client.get('/api/route/list/', {'page': '2'})['ETag'],
+            self.client.get('/api/route/my-routes/')['ETag'],
+        }
+        self.assertEqual(len(etags), 3)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get('/api/travel/institution/')['ETag']
+        other = Users.objects.create(
+            full_name="Other", user_type=Users.TYPE_STUDENT, institutional_mail="o@university.edu",
+            student_code="2", udocument="2", direction="x", uphone="+2", upassword="x",
+            institution=self.institution, user_state=Users.STATE_APPROVED
+        )
+        self.authenticate(other)
+        response = self.client.get('/api/travel/institution/', HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_driver_lists_use_the_driver_institution(self):
+        url = f'/api/travel/info/{self.driver.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_vehicle_list_supports_conditional_get(self):
+        etag = self.client.get('/api/vehicle/my-vehicles/')['ETag']
+        response = self.client.get('/api/vehicle/my-vehicles/', HTTP_IF_NONE_MATCH=f'"other", {etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_none_match_parsing(self):
+        self.assertTrue(etag_matches('"a"', '*'))
+        self.assertTrue(etag_matches('"a"', 'W/"a"'))
+        self.assertTrue(etag_matches('"a"', '"b", "a"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches('"a"', None))
@@ -0,0 +1,114 @@
+import datetime
+from decimal import Decimal
+from io import BytesIO
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+
+from config.renderers import JSONRenderer, MessagePackParser, MessagePackRenderer, dumps_json
+from travel.consumers import InstitutionTravelFeedConsumer
+from travel.feed import feed_group_name
+from travel.test_views import TravelSearchTestMixin
+
+PAYLOAD = {
+    'time': datetime.datetime(2026, 10, 19, 6, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    'date': datetime.date(2026, 10, 19),
+    'price': Decimal('2500.50'),
+    'label': gettext_lazy('Viaje'),
+    'text': 'línea nueva',
+    'seats': [1, 2, None, True],
+}
+
+
+class RendererTest(SimpleTestCase):
+    """
+    Casos de prueba para los codificadores de `config.renderers`.
+    """
+
+    def test_orjson_output_matches_drf(self):
+        expected = renderers.JSONRenderer().render(PAYLOAD)
+        self.assertEqual(JSONRenderer().render(PAYLOAD), expected)
+
+    @override_settings(API_JSON_ENGINE='json')
+    def test_stdlib_engine_matches_drf(self):
+        self.assertEqual(dumps_json(PAYLOAD), renderers.JSONRenderer().render(PAYLOAD))
+
+    def test_indent_falls_back_to_drf(self):
+        rendered = JSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_msgpack_uses_the_same_representations(self):
+        decoded = msgpack.unpackb(MessagePackRenderer().render(PAYLOAD), raw=False)
+        self.assertEqual(decoded['time'], '2026-10-19T06:30:15.123456Z')
+        self.assertEqual(decoded['price'], 2500.5)
+        self.assertEqual(decoded['label'], 'Viaje')
+
+    def test_msgpack_parser_rejects_garbage(self):
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(BytesIO(b'\xc1'))
+
+
+class ContentNegotiationTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para la selección del formato con el encabezado Accept.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self._travel(self.near_route, 1)
+
+    def test_msgpack_response(self):
+        response = self.client.get('/api/travel/institution/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content, raw=False), self.client.get('/api/travel/institution/').json())
+
+    def test_msgpack_request_body(self):
+        body = msgpack.packb({'travels': [
+            {'vehicle': self.vehicle.id, 'route': self.near_route, 'time': '2030-01-01T06:00:00Z', 'price': 2000},
+        ]})
+        response = self.client.post(
+            '/api/travel/bulk-create/', body, content_type='application/msgpack', HTTP_ACCEPT='application/msgpack'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(msgpack.unpackb(response.content, raw=False)['travels']), 1)
+
+
+class WebSocketSubprotocolTest(SimpleTestCase):
+    """
+    Casos de prueba para la negociación del formato de los WebSockets.
+    """
+
+    def scenario(self, subprotocols):
+        async def run():
+            communicator = WebsocketCommunicator(
+                InstitutionTravelFeedConsumer.as_asgi(), '/ws/institution/travel_feed/', subprotocols=subprotocols
+            )
+            communicator.scope.update(user_is_authenticated=True, user_institution_id=7)
+            connected, subprotocol = await communicator.connect()
+            self.assertTrue(connected)
+            await get_channel_layer().group_send(feed_group_name(7), {'type': 'travel_removed', 'travel_id': 3})
+            message = await communicator.receive_output()
+            await communicator.disconnect()
+            return subprotocol, message
+
+        return async_to_sync(run)()
+
+    def test_msgpack_subprotocol_sends_binary_frames(self):
+        subprotocol, message = self.scenario(['msgpack', 'json'])
+        self.assertEqual(subprotocol, 'msgpack')
+        self.assertEqual(msgpack.unpackb(message['bytes'], raw=False), {'event': 'travel_removed', 'travel_id': 3})
+
+    def test_default_is_json_text(self):
+        subprotocol, message = self.scenario(None)
+        self.assertIsNone(subprotocol)
+        self.assertEqual(message['text'], '{"event":"travel_removed","travel_id":3}')
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from realize.models import Realize
+from travel.test_views import TravelSearchTestMixin
+from users.models import Users
+
+
+class InstitutionResponseCacheTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para la caché de respuestas compartida por institución.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.travel = self._travel(self.near_route, 1)
+        self.passenger = Users.objects.create(
+            full_name="Passenger", user_type=Users.TYPE_STUDENT, institutional_mail="p@university.edu",
+            student_code="1", udocument="1", direction="x", uphone="+1", upassword="x",
+            institution=self.institution, user_state=Users.STATE_APPROVED
+        )
+        Realize.objects.create(user=self.passenger, travel=self.travel, status=Realize.STATUS_PENDING)
+
+    def authenticate(self, user):
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_second_request_is_served_from_cache(self):
+        self.authenticate(self.passenger)
+        first = self.client.get('/api/travel/institution/')
+        self.assertEqual(first['X-Response-Cache'], 'miss')
+        # Solo la autenticación toca la base de datos.
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/travel/institution/')
+        self.assertEqual(second['X-Response-Cache'], 'hit')
+        self.assertEqual(second.data, first.data)
+
+    def test_reservations_are_merged_only_for_the_driver(self):
+        self.authenticate(self.passenger)
+        response = self.client.get('/api/travel/institution/')
+        self.assertNotIn('reservations', response.data[0])
+
+        self.authenticate(self.user)
+        response = self.client.get('/api/travel/institution/')
+        self.assertEqual(response['X-Response-Cache'], 'hit')
+        self.assertEqual([r['user']['uid'] for r in response.data[0]['reservations']], [self.passenger.uid])
+
+    def test_changes_bump_the_generation(self):
+        self.authenticate(self.passenger)
+        self.client.get('/api/travel/institution/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._travel(self.near_route, 2)
+        response = self.client.get('/api/travel/institution/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(len(response.data), 2)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.authenticate(self.passenger)
+        self.client.get('/api/route/list/')
+        response = self.client.get('/api/route/list/', {'page': '2'})
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        response = self.client.get('/api/route/list/')
+        self.assertEqual(response['X-Response-Cache'], 'hit')
@@ -0,0 +1,81 @@
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from config import schema
+
+
+class StoredSchemaTest(APITestCase):
+    """
+    Casos de prueba para el esquema OpenAPI guardado por versión del código.
+    """
+
+    def setUp(self):
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        self.schema_dir = schema_dir.name
+        settings_override = override_settings(API_SCHEMA_DIR=self.schema_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self._forget_documents()
+        self.addCleanup(self._forget_documents)
+
+    def _forget_documents(self):
+        cache.clear()
+        schema._documents.clear()
+
+    def test_schema_is_generated_once(self):
+        with mock.patch.object(schema, 'generate_schema', wraps=schema.generate_schema) as generate:
+            first = self.client.get('/swagger.json')
+            second = self.client.get('/swagger.yaml')
+            third = self.client.get('/swagger.json')
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, third.content)
+        document = json.loads(first.content)
+        self.assertEqual(document['info']['title'], 'Uway API')
+        self.assertTrue(any(path.endswith('/batch/') for path in document['paths']))
+        self.assertIn('application/json', first['Content-Type'])
+        self.assertIn('yaml', second['Content-Type'])
+
+    def test_if_none_match(self):
+        etag = self.client.get('/swagger.json')['ETag']
+        response = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_ui_document_uses_stored_schema(self):
+        stored = self.client.get('/swagger.json')
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            response = self.client.get('/swagger/', {'format': 'openapi'})
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, stored.content)
+        self.assertEqual(response['ETag'], stored['ETag'])
+
+    def test_other_processes_read_the_stored_files(self):
+        stored = self.client.get('/swagger.json')
+        self._forget_documents()
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            response = self.client.get('/swagger.json')
+        generate.assert_not_called()
+        self.assertEqual(response['ETag'], stored['ETag'])
+
+    def test_build_api_schema_command(self):
+        output = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('build_api_schema', output=directory, stdout=output)
+            self.assertTrue(schema.schema_path('json', directory).exists())
+            self.assertTrue(schema.schema_path('yaml', directory).exists())
+        self.assertIn(schema.code_version(), output.getvalue())
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            self.assertEqual(self.client.get('/swagger.yaml').status_code, 200)
+        generate.assert_not_called()
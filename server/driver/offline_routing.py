@@ -0,0 +1,381 @@
+# server/driver/offline_routing.py
+
+"""
+Motor de enrutamiento offline para la app 'driver'.
+
+Carga un grafo vial compacto de la región de servicio desde un archivo local
+y lo guarda en estructuras de adyacencia basadas en arreglos (formato CSR,
+"Compressed Sparse Row"). Sobre ese grafo responde consultas de camino más
+corto con A* o con Dijkstra bidireccional, sin depender de la API de Google.
+
+Formato del archivo (JSON):
+    {
+        "directed": false,
+        "nodes": [[lat, lng], ...],
+        "edges": [[origen, destino, metros], ...]
+    }
+
+El peso de una arista es opcional; si se omite se usa la distancia geodésica
+entre sus extremos.
+"""
+
+import heapq
+import json
+import math
+from array import array
+from functools import lru_cache
+
+from django.conf import settings
+
+from route.geo import EARTH_RADIUS_M, haversine_m
+
+# Tamaño (en grados) de las celdas usadas para encontrar el nodo más cercano.
+_SNAP_CELL_DEG = 0.01
+
+
+class NoRouteError(Exception):
+    """Se lanza cuando no existe un camino entre los puntos solicitados."""
+
+
+def _build_csr(node_count, sources, targets, weights):
+    """
+    Construye los arreglos CSR (offsets, targets, weights) a partir de una
+    lista de aristas. `offsets[u]:offsets[u + 1]` delimita los vecinos de `u`.
+    """
+    offsets = array('l', [0]) * (node_count + 1)
+    for u in sources:
+        offsets[u + 1] += 1
+    for u in range(node_count):
+        offsets[u + 1] += offsets[u]
+
+    cursor = array('l', offsets[:-1])
+    csr_targets = array('l', [0]) * len(sources)
+    csr_weights = array('d', [0.0]) * len(sources)
+    for u, v, w in zip(sources, targets, weights):
+        position = cursor[u]
+        csr_targets[position] = v
+        csr_weights[position] = w
+        cursor[u] = position + 1
+    return offsets, csr_targets, csr_weights
+
+
+class RoadGraph:
+    """
+    Grafo vial en memoria, almacenado en arreglos CSR.
+
+    Guarda tanto la adyacencia directa como la inversa, de modo que la búsqueda
+    bidireccional funcione también con calles de un solo sentido.
+    """
+
+    def __init__(self, lats, lngs, edges, directed=False):
+        self.lats = array('d', lats)
+        self.lngs = array('d', lngs)
+        node_count = len(self.lats)
+
+        sources, targets, weights = array('l'), array('l'), array('d')
+        for edge in edges:
+            u, v = int(edge[0]), int(edge[1])
+            if not (0 <= u < node_count and 0 <= v < node_count):
+                raise ValueError(f"Arista ({u}, {v}) fuera de rango para {node_count} nodos.")
+            w = edge[2] if len(edge) > 2 and edge[2] is not None else haversine_m(
+                self.lats[u], self.lngs[u], self.lats[v], self.lngs[v]
+            )
+            sources.append(u)
+            targets.append(v)
+            weights.append(float(w))
+            if not directed:
+                sources.append(v)
+                targets.append(u)
+                weights.append(float(w))
+
+        self.offsets, self.targets, self.weights = _build_csr(node_count, sources, targets, weights)
+        self.reverse_offsets, self.reverse_targets, self.reverse_weights = _build_csr(
+            node_count, targets, sources, weights
+        )
+        self._snap_index = None
+
+    @classmethod
+    def from_file(cls, path):
+        """Carga un grafo desde un archivo JSON con el formato descrito en el módulo."""
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        nodes = data['nodes']
+        return cls(
+            [node[0] for node in nodes],
+            [node[1] for node in nodes],
+            data['edges'],
+            directed=data.get('directed', False),
+        )
+
+    def to_file(self, path):
+        """Guarda el grafo en disco (como grafo dirigido) para poder recargarlo después."""
+        edges = []
+        for u in range(self.node_count):
+            for i in range(self.offsets[u], self.offsets[u + 1]):
+                edges.append([u, self.targets[i], round(self.weights[i], 2)])
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'directed': True,
+                'nodes': [[lat, lng] for lat, lng in zip(self.lats, self.lngs)],
+                'edges': edges,
+            }, handle, separators=(',', ':'))
+
+    @property
+    def node_count(self):
+        return len(self.lats)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    # --- Localización de nodos ---
+
+    def _cell(self, lat, lng):
+        return (math.floor(lat / _SNAP_CELL_DEG), math.floor(lng / _SNAP_CELL_DEG))
+
+    def nearest_node(self, lat, lng, max_rings=8):
+        """
+        Devuelve `(nodo, distancia_m)` del nodo más cercano a un punto.
+        Usa una rejilla de celdas construida perezosamente y busca en anillos
+        crecientes alrededor de la celda del punto; si el punto está lejos de
+        todo el grafo, recurre a un recorrido lineal de los nodos.
+        """
+        if self.node_count == 0:
+            raise NoRouteError("El grafo vial está vacío.")
+        if self._snap_index is None:
+            index = {}
+            for node in range(self.node_count):
+                index.setdefault(self._cell(self.lats[node], self.lngs[node]), []).append(node)
+            self._snap_index = index
+
+        row, col = self._cell(lat, lng)
+        best, best_distance = None, math.inf
+        found_at = None
+        radius = 0
+        while radius <= max_rings:
+            for r in range(row - radius, row + radius + 1):
+                for c in range(col - radius, col + radius + 1):
+                    if radius and abs(r - row) != radius and abs(c - col) != radius:
+                        continue
+                    for node in self._snap_index.get((r, c), ()):
+                        distance = haversine_m(lat, lng, self.lats[node], self.lngs[node])
+                        if distance < best_distance:
+                            best, best_distance = node, distance
+            if best is not None and found_at is None:
+                found_at = radius
+            # Se revisa un anillo extra: un nodo de la celda vecina puede estar más cerca.
+            if found_at is not None and radius > found_at:
+                return best, best_distance
+            radius += 1
+
+        for node in range(self.node_count):
+            distance = haversine_m(lat, lng, self.lats[node], self.lngs[node])
+            if distance < best_distance:
+                best, best_distance = node, distance
+        return best, best_distance
+
+    # --- Algoritmos de camino más corto ---
+
+    def _heuristic(self, node, target):
+        return haversine_m(self.lats[node], self.lngs[node], self.lats[target], self.lngs[target])
+
+    def astar(self, source, target):
+        """
+        Camino más corto con A*, usando la distancia geodésica como heurística.
+        La heurística es admisible mientras los pesos no sean menores que la
+        distancia en línea recta entre los extremos de cada arista.
+        """
+        distances = {source: 0.0}
+        parents = {source: -1}
+        heap = [(self._heuristic(source, target), 0.0, source)]
+        closed = set()
+        while heap:
+            _, distance, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == target:
+                return self._rebuild_path(parents, target), distance
+            closed.add(u)
+            for i in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[i]
+                candidate = distance + self.weights[i]
+                if candidate < distances.get(v, math.inf):
+                    distances[v] = candidate
+                    parents[v] = u
+                    heapq.heappush(heap, (candidate + self._heuristic(v, target), candidate, v))
+        raise NoRouteError(f"No existe un camino entre los nodos {source} y {target}.")
+
+    def bidirectional_dijkstra(self, source, target):
+        """
+        Camino más corto con Dijkstra bidireccional: avanza desde el origen sobre
+        la adyacencia directa y desde el destino sobre la inversa hasta que los
+        frentes se cruzan.
+        """
+        if source == target:
+            return [source], 0.0
+
+        frontiers = (
+            (self.offsets, self.targets, self.weights),
+            (self.reverse_offsets, self.reverse_targets, self.reverse_weights),
+        )
+        distances = ({source: 0.0}, {target: 0.0})
+        parents = ({source: -1}, {target: -1})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        settled = (set(), set())
+        best, meeting = math.inf, None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            distance, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            offsets, targets, weights = frontiers[side]
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                candidate = distance + weights[i]
+                if candidate < distances[side].get(v, math.inf):
+                    distances[side][v] = candidate
+                    parents[side][v] = u
+                    heapq.heappush(heaps[side], (candidate, v))
+                other = distances[1 - side].get(v)
+                if other is not None and candidate + other < best:
+                    best, meeting = candidate + other, v
+
+        if meeting is None:
+            raise NoRouteError(f"No existe un camino entre los nodos {source} y {target}.")
+
+        forward = self._rebuild_path(parents[0], meeting)
+        backward = []
+        node = parents[1][meeting]
+        while node != -1:
+            backward.append(node)
+            node = parents[1][node]
+        return forward + backward, best
+
+    def shortest_path(self, source, target, algorithm='astar'):
+        """Devuelve `(lista_de_nodos, distancia_m)` usando el algoritmo indicado."""
+        if algorithm == 'bidirectional':
+            return self.bidirectional_dijkstra(source, target)
+        return self.astar(source, target)
+
+    @staticmethod
+    def _rebuild_path(parents, node):
+        path = []
+        while node != -1:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        return path
+
+
+def build_grid_graph(rows, cols, origin=(3.3750, -76.5350), spacing_m=100.0):
+    """
+    Genera un grafo sintético en forma de rejilla (rows x cols) alrededor de
+    `origin`. Sirve como fixture para probar y medir el motor sin datos reales.
+    """
+    lat0, lng0 = origin
+    dlat = math.degrees(spacing_m / EARTH_RADIUS_M)
+    dlng = math.degrees(spacing_m / (EARTH_RADIUS_M * math.cos(math.radians(lat0))))
+
+    lats, lngs, edges = [], [], []
+    for r in range(rows):
+        for c in range(cols):
+            lats.append(lat0 + r * dlat)
+            lngs.append(lng0 + c * dlng)
+            node = r * cols + c
+            if c + 1 < cols:
+                edges.append((node, node + 1))
+            if r + 1 < rows:
+                edges.append((node, node + cols))
+    return RoadGraph(lats, lngs, edges, directed=False)
+
+
+def encode_polyline(points):
+    """Codifica una lista de puntos [lat, lng] con el algoritmo de polilíneas de Google."""
+    encoded = []
+    previous_lat = previous_lng = 0
+    for lat, lng in points:
+        lat_e5, lng_e5 = int(round(lat * 1e5)), int(round(lng * 1e5))
+        for delta in (lat_e5 - previous_lat, lng_e5 - previous_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                encoded.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            encoded.append(chr(value + 63))
+        previous_lat, previous_lng = lat_e5, lng_e5
+    return ''.join(encoded)
+
+
+def validate_latlng(lat, lng):
+    """
+    Devuelve (lat, lng) como floats si son coordenadas finitas dentro de
+    [-90, 90] y [-180, 180]. Lanza ValueError en otro caso: float() acepta
+    'nan', 'inf' y valores como 1e300, que rompen los índices espaciales.
+    """
+    lat, lng = float(lat), float(lng)
+    if not (math.isfinite(lat) and math.isfinite(lng) and -90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError(f"Coordenadas fuera de rango: '{lat},{lng}'.")
+    return lat, lng
+
+
+def parse_latlng(value):
+    """Convierte un texto 'lat,lng' en una tupla de floats. Lanza ValueError si no es válido."""
+    parts = [part.strip() for part in value.split(',')]
+    if len(parts) < 2:
+        raise ValueError(f"Coordenadas inválidas: '{value}'.")
+    return validate_latlng(parts[0], parts[1])
+
+
+@lru_cache(maxsize=1)
+def _load_graph(path):
+    return RoadGraph.from_file(path)
+
+
+def get_offline_graph():
+    """
+    Devuelve el grafo configurado en `OFFLINE_ROUTING_GRAPH_PATH`, o None si el
+    motor offline no está habilitado. El grafo se carga una sola vez por proceso.
+    """
+    path = getattr(settings, 'OFFLINE_ROUTING_GRAPH_PATH', None)
+    if not path:
+        return None
+    return _load_graph(path)
+
+
+def build_directions_response(graph, start, end):
+    """
+    Calcula una ruta offline entre dos puntos [lat, lng] y la devuelve con la
+    misma forma (simplificada) que la respuesta de la Directions API de Google,
+    para que los clientes existentes puedan consumirla sin cambios.
+    """
+    max_snap = getattr(settings, 'OFFLINE_ROUTING_MAX_SNAP_M', 2000)
+    speed_kmh = getattr(settings, 'OFFLINE_ROUTING_SPEED_KMH', 30)
+    algorithm = getattr(settings, 'OFFLINE_ROUTING_ALGORITHM', 'astar')
+
+    source, source_gap = graph.nearest_node(*start)
+    target, target_gap = graph.nearest_node(*end)
+    if source_gap > max_snap or target_gap > max_snap:
+        raise NoRouteError("Los puntos están fuera de la cobertura del grafo vial offline.")
+
+    nodes, distance = graph.shortest_path(source, target, algorithm=algorithm)
+    points = [(graph.lats[node], graph.lngs[node]) for node in nodes]
+    meters = int(round(distance))
+    seconds = int(round(distance / (speed_kmh * 1000 / 3600)))
+
+    return {
+        'status': 'OK',
+        'source': 'offline',
+        'routes': [{
+            'summary': 'Ruta calculada offline',
+            'legs': [{
+                'distance': {'text': f"{meters / 1000:.1f} km", 'value': meters},
+                'duration': {'text': f"{max(1, round(seconds / 60))} mins", 'value': seconds},
+                'start_location': {'lat': points[0][0], 'lng': points[0][1]},
+                'end_location': {'lat': points[-1][0], 'lng': points[-1][1]},
+            }],
+            'overview_polyline': {'points': encode_polyline(points)},
+        }],
+    }
@@ -0,0 +1,148 @@
+import os
+import tempfile
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from driver.offline_routing import (
+    NoRouteError,
+    RoadGraph,
+    _load_graph,
+    build_directions_response,
+    build_grid_graph,
+    encode_polyline,
+)
+from institutions.models import Institution
+from users.models import Users
+
+
+class OfflineRoutingEngineTest(SimpleTestCase):
+    """
+    Casos de prueba para el motor de enrutamiento offline sobre la rejilla sintética.
+    """
+
+    def setUp(self):
+        self.graph = build_grid_graph(20, 20, spacing_m=100.0)
+
+    def test_grid_graph_csr_structure(self):
+        """Verifica el tamaño de los arreglos CSR de la rejilla."""
+        self.assertEqual(self.graph.node_count, 400)
+        # Cada arista no dirigida se guarda en ambos sentidos.
+        self.assertEqual(self.graph.edge_count, 2 * (2 * 20 * 19))
+        self.assertEqual(self.graph.offsets[-1], self.graph.edge_count)
+
+    def test_astar_and_bidirectional_agree(self):
+        """Ambos algoritmos deben encontrar la misma distancia mínima (distancia Manhattan en la rejilla)."""
+        source, target = 0, 399
+        _, astar_distance = self.graph.shortest_path(source, target, algorithm='astar')
+        path, bidirectional_distance = self.graph.shortest_path(source, target, algorithm='bidirectional')
+        self.assertAlmostEqual(astar_distance, bidirectional_distance, places=3)
+        self.assertAlmostEqual(astar_distance, 38 * 100.0, delta=5.0)
+        self.assertEqual(path[0], source)
+        self.assertEqual(path[-1], target)
+        self.assertEqual(len(path), 39)
+
+    def test_directed_graph_without_path(self):
+        """En un grafo dirigido no se puede recorrer una arista en sentido contrario."""
+        graph = RoadGraph([0.0, 0.0], [0.0, 0.001], [(0, 1)], directed=True)
+        self.assertEqual(graph.astar(0, 1)[0], [0, 1])
+        with self.assertRaises(NoRouteError):
+            graph.astar(1, 0)
+        with self.assertRaises(NoRouteError):
+            graph.bidirectional_dijkstra(1, 0)
+
+    def test_nearest_node(self):
+        """El nodo más cercano a la posición exacta de un nodo es ese mismo nodo."""
+        node = 215
+        found, distance = self.graph.nearest_node(self.graph.lats[node], self.graph.lngs[node])
+        self.assertEqual(found, node)
+        self.assertAlmostEqual(distance, 0.0, places=6)
+
+    def test_file_round_trip(self):
+        """Un grafo guardado en disco se recarga con la misma estructura."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.json')
+            self.graph.to_file(path)
+            loaded = RoadGraph.from_file(path)
+        self.assertEqual(loaded.node_count, self.graph.node_count)
+        self.assertEqual(loaded.edge_count, self.graph.edge_count)
+        self.assertAlmostEqual(loaded.astar(0, 399)[1], self.graph.astar(0, 399)[1], delta=1.0)
+
+    def test_encode_polyline(self):
+        """Verifica el ejemplo oficial del algoritmo de polilíneas de Google."""
+        points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        self.assertEqual(encode_polyline(points), '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+
+    def test_directions_response_outside_coverage(self):
+        """Los puntos lejanos al grafo no se enrutan."""
+        with self.assertRaises(NoRouteError):
+            build_directions_response(self.graph, (10.0, -70.0), (10.1, -70.1))
+
+
+class OfflineDirectionsViewTest(APITestCase):
+    """
+    Casos de prueba para el respaldo offline de `RouteDirectionsView`.
+    """
+
+    def setUp(self):
+        institution = Institution.objects.create(
+            official_name="Universidad Test",
+            email="test@univalle.edu.co",
+            ipassword=make_password("institutionpass123"),
+        )
+        user = Users.objects.create(
+            full_name="Driver User",
+            institutional_mail="driver@test.com",
+            student_code="2023001",
+            udocument="12345678",
+            direction="Test Address",
+            uphone="+573001234567",
+            upassword=make_password("driverpass123"),
+            user_type=Users.TYPE_STUDENT,
+            institution=institution,
+        )
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.graph_path = os.path.join(self.tmp.name, 'grid.json')
+        self.graph = build_grid_graph(10, 10)
+        self.graph.to_file(self.graph_path)
+        _load_graph.cache_clear()
+
+    def tearDown(self):
+        _load_graph.cache_clear()
+        self.tmp.cleanup()
+
+    def test_offline_directions_without_api_key(self):
+        """Sin clave de Google, la vista responde con el grafo offline configurado."""
+        start = f"{self.graph.lats[0]},{self.graph.lngs[0]}"
+        end = f"{self.graph.lats[99]},{self.graph.lngs[99]}"
+        with override_settings(API_KEY_GOOGLE_MAPS=None, OFFLINE_ROUTING_GRAPH_PATH=self.graph_path):
+            response = self.client.get(f'/api/driver/route-directions/?start={start}&end={end}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'OK')
+        self.assertEqual(response.data['source'], 'offline')
+        leg = response.data['routes'][0]['legs'][0]
+        self.assertAlmostEqual(leg['distance']['value'], 1800, delta=5)
+
+    def test_offline_directions_invalid_coordinates(self):
+        """Coordenadas mal formadas devuelven 400 en el modo offline."""
+        with override_settings(API_KEY_GOOGLE_MAPS=None, OFFLINE_ROUTING_GRAPH_PATH=self.graph_path):
+            response = self.client.get('/api/driver/route-directions/?start=abc&end=3.3,-76.5')
+        self.assertEqual(response.status_code, 400)
+
+    def test_without_offline_graph_keeps_original_error(self):
+        """Si el motor no está configurado, se conserva el error original."""
+        with override_settings(API_KEY_GOOGLE_MAPS=None, OFFLINE_ROUTING_GRAPH_PATH=None):
+            response = self.client.get('/api/driver/route-directions/?start=3.1,-76.1&end=3.2,-76.2')
+        self.assertEqual(response.status_code, 500)
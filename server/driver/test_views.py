@@ -1,5 +1,7 @@
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils import timezone
 from datetime import datetime, timedelta
 from unittest.mock import patch, Mock
@@ -318,4 +320,83 @@ class DriverViewsTest(APITestCase):
     def test_mark_travel_as_completed_view_invalid_token(self):
         """Prueba la finalización de un viaje con un token JWT inválido."""
         # Omitir test debido a dependencias del modelo Travel.
-        self.skipTest("Travel model requires Vehicle and Route, skipping invalid token test")
\ No newline at end of file
+        self.skipTest("Travel model requires Vehicle and Route, skipping invalid token test")
+
+@override_settings(API_KEY_GOOGLE_MAPS='test-key')
+class ReverseGeocodeBatchViewTest(APITestCase):
+    """
+    Casos de prueba para la geocodificación inversa por lotes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        user = Users.objects.create(
+            full_name="Batch User",
+            institutional_mail="batch@test.com",
+            student_code="2023003",
+            udocument="11223344",
+            direction="Test Address",
+            uphone="+573001234569",
+            upassword=make_password("batchpass123"),
+            user_type=Users.TYPE_STUDENT,
+        )
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.url = '/api/driver/reverse-geocode/batch/'
+
+    def _fake_google(self, url, params=None, **kwargs):
+        response = Mock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = {'status': 'OK', 'results': [{'formatted_address': f"Dirección {params['latlng']}"}]}
+        return response
+
+    @patch('driver.views.requests.get')
+    def test_batch_deduplicates_and_keeps_order(self, mock_get):
+        """Los puntos que caen en la misma celda se consultan una sola vez y el orden se conserva."""
+        mock_get.side_effect = self._fake_google
+        points = ['3.12341,-76.12341', {'lat': 3.5, 'lng': -76.5}, '3.12344,-76.12339']
+
+        response = self.client.post(self.url, {'points': points}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(response.data['unique_points'], 2)
+        results = response.data['results']
+        self.assertEqual([item['latlng'] for item in results], ['3.1234,-76.1234', '3.5000,-76.5000', '3.1234,-76.1234'])
+        self.assertEqual(results[1]['results'][0]['formatted_address'], 'Dirección 3.5000,-76.5000')
+
+    @patch('driver.views.requests.get')
+    def test_batch_answers_from_cache(self, mock_get):
+        """Una segunda petición con los mismos puntos no contacta a Google."""
+        mock_get.side_effect = self._fake_google
+        self.client.post(self.url, {'points': ['3.1,-76.1']}, format='json')
+
+        response = self.client.post(self.url, {'points': ['3.1,-76.1']}, format='json')
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(response.data['upstream_requests'], 0)
+        self.assertTrue(response.data['results'][0]['cached'])
+
+    def test_batch_rejects_too_many_points(self):
+        """Se rechazan los lotes que superan el máximo configurado."""
+        with override_settings(REVERSE_GEOCODE_BATCH_MAX=2):
+            response = self.client.post(self.url, {'points': ['1,1', '2,2', '3,3']}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_rejects_malformed_points(self):
+        """Los puntos mal formados devuelven 400."""
+        response = self.client.post(self.url, {'points': ['abc']}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    @patch('driver.views.requests.get')
+    def test_batch_rejects_non_finite_and_out_of_range_points(self, mock_get):
+        """NaN, infinito o fuera de rango devuelven 400 sin consultar a Google."""
+        for bad in ('nan,-76.5', {'lat': 'inf', 'lng': 0}, '1e300,1e300', {'lat': 3.1, 'lng': 200}):
+            response = self.client.post(self.url, {'points': ['3.1,-76.1', bad]}, format='json')
+            self.assertEqual(response.status_code, 400, bad)
+            self.assertEqual(response.data['index'], 1)
+        mock_get.assert_not_called()
@@ -4,8 +4,10 @@ from django.urls import path
 from .views import (
     RouteDirectionsView, 
     ReverseGeocodeView, 
+    ReverseGeocodeBatchView,
     MarkTravelAsCompletedView, 
-    StartTravelView
+    StartTravelView,
+    CancelTravelView
 )
 
 # Define los patrones de URL para la aplicación 'driver'.
@@ -16,10 +18,16 @@ urlpatterns = [
     
     # Endpoint para obtener una dirección legible a partir de coordenadas (geocodificación inversa).
     path('reverse-geocode/', ReverseGeocodeView.as_view(), name='reverse-geocode'),
+
+    # Endpoint para geocodificar varias coordenadas en una sola petición (con caché y deduplicación).
+    path('reverse-geocode/batch/', ReverseGeocodeBatchView.as_view(), name='reverse-geocode-batch'),
     
     # Endpoint para que un conductor marque un viaje como completado.
     path('travel/<int:travel_id>/complete/', MarkTravelAsCompletedView.as_view(), name='driver-travel-complete'),
     
     # Endpoint para que un conductor inicie un viaje previamente programado.
     path('travel/<int:travel_id>/start/', StartTravelView.as_view(), name='driver-start-travel'),
-]
\ No newline at end of file
+
+    # Endpoint para que un conductor cancele un viaje que aún no ha comenzado.
+    path('travel/<int:travel_id>/cancel/', CancelTravelView.as_view(), name='driver-cancel-travel'),
+]
@@ -1,17 +1,23 @@
 # server/driver/views.py
 
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema # <-- Importar
-from travel.models import Travel
-from driver.models import Driver
+from travel import state_machine
+from driver.offline_routing import NoRouteError, build_directions_response, get_offline_graph, parse_latlng, validate_latlng
 from users.permissions import IsAuthenticatedCustom
 import logging
 logger = logging.getLogger(__name__)
 import requests
 
+# Estados de la Directions API que indican que Google no está disponible para
+# nosotros (cuota agotada, clave rechazada, fallo interno) y no un problema de la ruta.
+GOOGLE_UNAVAILABLE_STATUSES = {'OVER_QUERY_LIMIT', 'OVER_DAILY_LIMIT', 'REQUEST_DENIED', 'UNKNOWN_ERROR'}
+
 class RouteDirectionsView(APIView):
 
     permission_classes = [IsAuthenticatedCustom]
@@ -25,7 +31,10 @@ class RouteDirectionsView(APIView):
             return Response({"error": "Los parámetros 'start' y 'end' son requeridos."}, status=status.HTTP_400_BAD_REQUEST)
         api_key = settings.API_KEY_GOOGLE_MAPS
         if not api_key:
-             return Response({"error": "La clave de la API de Google Maps no está configurada en el servidor."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            offline = self._offline_directions(start_coords, end_coords)
+            if offline is not None:
+                return offline
+            return Response({"error": "La clave de la API de Google Maps no está configurada en el servidor."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         google_maps_url = 'https://maps.googleapis.com/maps/api/directions/json'
         params = {'origin': start_coords, 'destination': end_coords, 'key': api_key, 'language': 'es'}
         try:
@@ -33,10 +42,37 @@ class RouteDirectionsView(APIView):
             response.raise_for_status()
             data = response.json()
             if data.get('status') != 'OK':
+                if data.get('status') in GOOGLE_UNAVAILABLE_STATUSES:
+                    offline = self._offline_directions(start_coords, end_coords)
+                    if offline is not None:
+                        return offline
                 return Response({"error": f"Error de la API de Google: {data.get('status')}"}, status=status.HTTP_400_BAD_REQUEST)
             return Response(data)
         except requests.exceptions.RequestException as e:
+            offline = self._offline_directions(start_coords, end_coords)
+            if offline is not None:
+                return offline
             return Response({"error": f"Error al contactar la API de Google Maps: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def _offline_directions(self, start_coords, end_coords):
+        """
+        Intenta resolver la ruta con el motor offline (ver `driver.offline_routing`).
+        Devuelve None si el motor no está configurado, para que la vista
+        mantenga su comportamiento original.
+        """
+        graph = get_offline_graph()
+        if graph is None:
+            return None
+        try:
+            start = parse_latlng(start_coords)
+            end = parse_latlng(end_coords)
+        except ValueError:
+            return Response({"error": "Los parámetros 'start' y 'end' deben tener el formato 'lat,lng'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(build_directions_response(graph, start, end))
+        except NoRouteError as e:
+            logger.warning(f"Motor offline sin ruta entre {start_coords} y {end_coords}: {e}")
+            return Response({"error": f"No se encontró una ruta offline: {e}"}, status=status.HTTP_404_NOT_FOUND)
         
 class ReverseGeocodeView(APIView):
     permission_classes = [IsAuthenticatedCustom]
@@ -62,39 +98,135 @@ class ReverseGeocodeView(APIView):
         except requests.exceptions.RequestException as e:
             return Response({"error": f"Error al contactar la API de Geocoding de Google: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
+class ReverseGeocodeBatchView(APIView):
+    """
+    Geocodificación inversa por lotes.
+
+    Recibe hasta `REVERSE_GEOCODE_BATCH_MAX` coordenadas, las cuantiza (redondeo a
+    `REVERSE_GEOCODE_QUANTIZE_DECIMALS` decimales) y las deduplica. Responde desde
+    la caché cuando es posible y solo consulta a Google los puntos faltantes, con
+    concurrencia acotada. Los resultados se devuelven en el mismo orden de entrada.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+
+    @swagger_auto_schema(operation_summary="Endpoint para convertir varias coordenadas en direcciones en una sola petición.")
+    def post(self, request, *args, **kwargs):
+        """Maneja las peticiones POST con la lista de coordenadas."""
+        points = request.data.get('points') if isinstance(request.data, dict) else None
+        if not isinstance(points, list) or not points:
+            return Response({"error": "El campo 'points' es requerido y debe ser una lista no vacía."}, status=status.HTTP_400_BAD_REQUEST)
+        max_points = settings.REVERSE_GEOCODE_BATCH_MAX
+        if len(points) > max_points:
+            return Response({"error": f"Se admiten como máximo {max_points} coordenadas por petición."}, status=status.HTTP_400_BAD_REQUEST)
+
+        keys = []
+        for position, point in enumerate(points):
+            try:
+                keys.append(self._quantize(point))
+            except (TypeError, ValueError, KeyError):
+                # Un punto inválido rechaza el lote: no se cuantiza ni se consulta a Google.
+                return Response({
+                    "error": "Cada punto debe ser 'lat,lng' o un objeto con 'lat' y 'lng', con latitud "
+                             "entre -90 y 90 y longitud entre -180 y 180.",
+                    "index": position,
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        unique_keys = list(dict.fromkeys(keys))
+        cached = cache.get_many([self._cache_key(key) for key in unique_keys])
+        results = {key: cached[self._cache_key(key)] for key in unique_keys if self._cache_key(key) in cached}
+        misses = [key for key in unique_keys if key not in results]
+
+        if misses:
+            api_key = settings.API_KEY_GOOGLE_MAPS
+            if not api_key:
+                return Response({"error": "La clave de la API de Google Maps no está configurada en el servidor."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            with ThreadPoolExecutor(max_workers=settings.REVERSE_GEOCODE_BATCH_CONCURRENCY) as executor:
+                fetched = dict(zip(misses, executor.map(lambda key: self._fetch(key, api_key), misses)))
+            cache.set_many(
+                {self._cache_key(key): value for key, value in fetched.items() if value['status'] in ('OK', 'ZERO_RESULTS')},
+                timeout=settings.REVERSE_GEOCODE_CACHE_TTL,
+            )
+            results.update(fetched)
+
+        hits = set(unique_keys) - set(misses)
+        return Response({
+            "results": [dict(results[key], latlng=key, cached=key in hits) for key in keys],
+            "unique_points": len(unique_keys),
+            "upstream_requests": len(misses),
+        })
+
+    @staticmethod
+    def _quantize(point):
+        """Normaliza un punto a la cadena 'lat,lng' redondeada que sirve de clave de deduplicación."""
+        if isinstance(point, dict):
+            lat, lng = validate_latlng(point['lat'], point['lng'])
+        else:
+            lat, lng = parse_latlng(str(point))
+        decimals = settings.REVERSE_GEOCODE_QUANTIZE_DECIMALS
+        return f"{round(lat, decimals):.{decimals}f},{round(lng, decimals):.{decimals}f}"
+
+    @staticmethod
+    def _cache_key(key):
+        return f"reverse_geocode:{key}"
+
+    @staticmethod
+    def _fetch(latlng, api_key):
+        """Consulta la API de Geocoding para un único punto; los errores se reportan por punto."""
+        google_geocode_url = 'https://maps.googleapis.com/maps/api/geocode/json'
+        params = {'latlng': latlng, 'key': api_key, 'language': 'es'}
+        try:
+            response = requests.get(google_geocode_url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            return {"status": "ERROR", "error": f"Error al contactar la API de Geocoding de Google: {e}", "results": []}
+        return {"status": data.get('status'), "results": data.get('results', [])}
+
+# Respuesta HTTP para cada resultado de una transición de estado del viaje.
+TRANSITION_STATUS = {
+    state_machine.OUTCOME_APPLIED: status.HTTP_200_OK,
+    state_machine.OUTCOME_ALREADY_IN_STATE: status.HTTP_200_OK,
+    state_machine.OUTCOME_NOT_FOUND: status.HTTP_404_NOT_FOUND,
+    state_machine.OUTCOME_NOT_OWNER: status.HTTP_403_FORBIDDEN,
+    state_machine.OUTCOME_NOT_APPROVED: status.HTTP_403_FORBIDDEN,
+    state_machine.OUTCOME_CONFLICT: status.HTTP_409_CONFLICT,
+}
+
+
+def transition_response(result, success_message, already_message, success_key="success"):
+    """Convierte un `TransitionResult` en la respuesta del endpoint."""
+    if result.outcome == state_machine.OUTCOME_APPLIED:
+        body = {success_key: success_message}
+    elif result.outcome == state_machine.OUTCOME_ALREADY_IN_STATE:
+        body = {"message": already_message}
+    elif result.outcome == state_machine.OUTCOME_NOT_FOUND:
+        body = {"error": "No se encontró un viaje con el ID proporcionado."}
+    elif result.outcome == state_machine.OUTCOME_NOT_OWNER:
+        body = {"error": "No tienes permiso para modificar este viaje."}
+    elif result.outcome == state_machine.OUTCOME_NOT_APPROVED:
+        body = {"error": "Solo los conductores aprobados pueden cambiar el estado de sus viajes."}
+    else:
+        body = {"error": f"Este viaje no admite esta acción. Estado actual: {result.state}."}
+    body.update({"travel_id": result.travel_id, "outcome": result.outcome, "travel_state": result.state})
+    return Response(body, status=TRANSITION_STATUS[result.outcome])
+
+
 class StartTravelView(APIView):
     
     permission_classes = [IsAuthenticatedCustom]
 
     @swagger_auto_schema(operation_summary="Endpoint para que un conductor inicie un viaje que estaba previamente programado.")
     def post(self, request, travel_id, *args, **kwargs):
-        """Maneja la petición POST para cambiar el estado del viaje a 'in_progress'."""
-        user = request.user
-        logger.info(f"--- INICIANDO DEPURACIÓN EN StartTravelView ---")
-        logger.info(f"Usuario autenticado por el token: '{user.full_name}' con UID: {user.uid}")
-        driver_exists = Driver.objects.filter(pk=user.uid).exists()
-        logger.info(f"¿Existe un registro en la tabla 'driver' con pk={user.uid}? -> {driver_exists}")
-        try:
-            driver = user.driver
-            logger.info(f"¡ÉXITO! Se encontró el perfil de conductor para el UID {user.uid}. Estado: {driver.validate_state}")
-            if driver.validate_state != 'approved':
-                logger.warning(f"Validación fallida: El conductor {user.uid} no está aprobado. Estado actual: {driver.validate_state}")
-                return Response({"error": "Solo los conductores aprobados pueden iniciar viajes."}, status=status.HTTP_403_FORBIDDEN)
-        except Driver.DoesNotExist:
-            logger.error(f"¡FALLO! Driver.DoesNotExist para el usuario con UID: {user.uid}. No se encontró un perfil de conductor asociado.")
-            return Response({"error": "Acceso denegado. No tienes un perfil de conductor."}, status=status.HTTP_403_FORBIDDEN)
-        try:
-            travel = Travel.objects.get(id=travel_id)
-        except Travel.DoesNotExist:
-            return Response({"error": "No se encontró un viaje con el ID proporcionado."}, status=status.HTTP_404_NOT_FOUND)
-        if travel.driver != driver:
-            logger.warning(f"Validación fallida: El conductor del token (UID: {driver.pk}) no es el dueño del viaje (Dueño UID: {travel.driver.pk})")
-            return Response({"error": "No tienes permiso para iniciar este viaje."}, status=status.HTTP_403_FORBIDDEN)
-        if travel.travel_state != 'scheduled':
-            return Response({"error": f"Este viaje no se puede iniciar. Estado actual: {travel.travel_state}."}, status=status.HTTP_400_BAD_REQUEST)
-        travel.travel_state = 'in_progress'
-        travel.save(update_fields=['travel_state'])
-        return Response({"success": f"El viaje {travel.id} ha comenzado exitosamente."}, status=status.HTTP_200_OK)
+        """
+        Maneja la petición POST para cambiar el estado del viaje a 'in_progress'.
+        El cambio es un único UPDATE condicional (ver `travel.state_machine`).
+        """
+        result = state_machine.start_travel(travel_id, request.user.uid)
+        return transition_response(
+            result,
+            f"El viaje {travel_id} ha comenzado exitosamente.",
+            "Este viaje ya está en curso."
+        )
 
 class MarkTravelAsCompletedView(APIView):
    
@@ -102,22 +234,25 @@ class MarkTravelAsCompletedView(APIView):
 
     @swagger_auto_schema(operation_summary="Endpoint para que un conductor marque uno de sus viajes como 'completado'.")
     def patch(self, request, travel_id, *args, **kwargs):
-        """Maneja la petición PATCH para cambiar el estado a 'completed'."""
-        user = request.user
-        try:
-            driver = user.driver
-            if driver.validate_state != 'approved':
-                return Response({"error": "Solo los conductores aprobados pueden marcar viajes como completados."}, status=status.HTTP_403_FORBIDDEN)
-        except Driver.DoesNotExist:
-            return Response({"error": "Acceso denegado. No tienes un perfil de conductor."}, status=status.HTTP_403_FORBIDDEN)
-        try:
-            travel = Travel.objects.get(id=travel_id)
-        except Travel.DoesNotExist:
-            return Response({"error": "No se encontró un viaje con el ID proporcionado."}, status=status.HTTP_404_NOT_FOUND)
-        if travel.driver != driver:
-            return Response({"error": "No tienes permiso para modificar este viaje."}, status=status.HTTP_403_FORBIDDEN)
-        if travel.travel_state == 'completed':
-            return Response({"message": "Este viaje ya ha sido marcado como completado."}, status=status.HTTP_200_OK)
-        travel.travel_state = 'completed'
-        travel.save(update_fields=['travel_state'])
-        return Response({"message": f"El viaje {travel.id} ha sido marcado como completado."}, status=status.HTTP_200_OK)
\ No newline at end of file
+        """Maneja la petición PATCH para cambiar el estado de un viaje en curso a 'completed'."""
+        result = state_machine.complete_travel(travel_id, request.user.uid)
+        return transition_response(
+            result,
+            f"El viaje {travel_id} ha sido marcado como completado.",
+            "Este viaje ya ha sido marcado como completado.",
+            success_key="message"
+        )
+
+class CancelTravelView(APIView):
+
+    permission_classes = [IsAuthenticatedCustom]
+
+    @swagger_auto_schema(operation_summary="Endpoint para que un conductor cancele uno de sus viajes programados.")
+    def post(self, request, travel_id, *args, **kwargs):
+        """Maneja la petición POST para cambiar el estado de un viaje programado a 'cancelled'."""
+        result = state_machine.cancel_travel(travel_id, request.user.uid)
+        return transition_response(
+            result,
+            f"El viaje {travel_id} ha sido cancelado.",
+            "Este viaje ya estaba cancelado."
+        )
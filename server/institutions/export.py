@@ -0,0 +1,201 @@
+# server/institutions/export.py
+
+"""
+Exportación masiva del historial de una institución: viajes, reservas y
+calificaciones, en CSV o JSONL.
+
+Las filas se leen con `values()` (sin instanciar modelos) y
+`QuerySet.iterator(chunk_size=...)`, que en PostgreSQL usa un cursor del lado
+del servidor, y se escriben a medida que llegan. La memoria usada depende del
+tamaño del bloque, no del de la exportación, así que el mismo generador sirve
+para el endpoint (`StreamingHttpResponse`) y para el comando
+`manage.py export_institution_data`.
+
+Las filas salen ordenadas por `id`. Si la descarga se corta, el cliente puede
+reanudarla con `after=<último id recibido>`: la exportación continúa en la
+fila siguiente y, en CSV, sin repetir el encabezado.
+"""
+
+import csv
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from assessment.models import Assessment
+from config.renderers import dumps_json, encode_default
+from realize.models import Realize
+from travel.models import Travel
+
+OUTPUT_CSV = 'csv'
+OUTPUT_JSONL = 'jsonl'
+OUTPUT_CONTENT_TYPES = {
+    OUTPUT_CSV: 'text/csv; charset=utf-8',
+    OUTPUT_JSONL: 'application/x-ndjson',
+}
+
+# `columns` son pares (nombre en el archivo, ruta de values()).
+ExportDataset = namedtuple('ExportDataset', 'model institution_lookup time_lookup columns')
+
+DATASETS = {
+    'travels': ExportDataset(
+        model=Travel,
+        institution_lookup='driver__user__institution_id',
+        time_lookup='time',
+        columns=(
+            ('id', 'id'),
+            ('time', 'time'),
+            ('travel_state', 'travel_state'),
+            ('price', 'price'),
+            ('driver_id', 'driver'),
+            ('driver_name', 'driver__user__full_name'),
+            ('vehicle_plate', 'vehicle__plate'),
+            ('route_start', 'route__startLocation'),
+            ('route_destination', 'route__destination'),
+        ),
+    ),
+    'reservations': ExportDataset(
+        model=Realize,
+        institution_lookup='travel__driver__user__institution_id',
+        time_lookup='travel__time',
+        columns=(
+            ('id', 'id'),
+            ('travel_id', 'travel'),
+            ('travel_time', 'travel__time'),
+            ('user_id', 'user'),
+            ('user_name', 'user__full_name'),
+            ('status', 'status'),
+        ),
+    ),
+    'assessments': ExportDataset(
+        model=Assessment,
+        institution_lookup='travel__driver__user__institution_id',
+        time_lookup='travel__time',
+        columns=(
+            ('id', 'id'),
+            ('travel_id', 'travel'),
+            ('travel_time', 'travel__time'),
+            ('driver_id', 'driver'),
+            ('user_id', 'user'),
+            ('score', 'score'),
+            ('comment', 'comment'),
+        ),
+    ),
+}
+
+
+class ExportError(ValueError):
+    """Parámetros de exportación inválidos."""
+
+
+Export = namedtuple('Export', 'content_type filename chunks')
+
+
+def parse_bound(value, name, end=False):
+    """
+    Fecha (`2026-10-01`) o fecha y hora ISO 8601. Una fecha como límite
+    final incluye el día completo.
+    """
+    if not value:
+        return None
+    message = f"El parámetro '{name}' debe ser una fecha (AAAA-MM-DD) o fecha y hora ISO 8601."
+    try:
+        # La fecha sola se revisa primero: `parse_datetime` también la acepta
+        # (como medianoche) y el límite final no incluiría el día. Con el
+        # formato correcto pero valores imposibles (`2026-02-30`, `T25:00`)
+        # ambas funciones lanzan ValueError en lugar de devolver None.
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+        else:
+            moment = parse_datetime(value)
+            if moment is None:
+                raise ExportError(message)
+    except (ValueError, OverflowError):
+        raise ExportError(message)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(dataset, institution_id, since=None, until=None, after=None):
+    """Filas de la institución en el rango [since, until), después del id `after`."""
+    queryset = dataset.model.objects.filter(**{dataset.institution_lookup: institution_id})
+    if since:
+        queryset = queryset.filter(**{f'{dataset.time_lookup}__gte': since})
+    if until:
+        queryset = queryset.filter(**{f'{dataset.time_lookup}__lt': until})
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    return queryset.order_by('id').values_list(*(path for _, path in dataset.columns))
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (str, int, float)):
+        return value
+    return encode_default(value)
+
+
+class _Echo:
+    """Pseudo-archivo para `csv.writer`: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(lines, chunk_size):
+    """Agrupa las líneas en bloques para no hacer una escritura por fila."""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+    if buffer:
+        yield b''.join(buffer)
+
+
+def csv_lines(dataset, rows, header=True):
+    writer = csv.writer(_Echo())
+    if header:
+        yield writer.writerow([name for name, _ in dataset.columns]).encode('utf-8')
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row]).encode('utf-8')
+
+
+def jsonl_lines(dataset, rows):
+    names = [name for name, _ in dataset.columns]
+    for row in rows:
+        yield dumps_json(dict(zip(names, row))) + b'\n'
+
+
+def build_export(name, institution_id, output=OUTPUT_CSV, since=None, until=None, after=None, chunk_size=None):
+    """
+    Valida los parámetros y devuelve un `Export` cuyo `chunks` es un generador
+    de bloques de bytes. La consulta no se ejecuta hasta que se consume.
+    """
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ExportError(f"Conjunto desconocido '{name}'. Opciones: {', '.join(DATASETS)}.")
+    if output not in OUTPUT_CONTENT_TYPES:
+        raise ExportError(f"Formato de salida desconocido '{output}'. Opciones: {', '.join(OUTPUT_CONTENT_TYPES)}.")
+    if after is not None:
+        try:
+            after = int(after)
+        except (TypeError, ValueError):
+            raise ExportError("El parámetro 'after' debe ser el id de la última fila recibida.")
+    since = parse_bound(since, 'since')
+    until = parse_bound(until, 'until', end=True)
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+    rows = export_queryset(dataset, institution_id, since, until, after).iterator(chunk_size=chunk_size)
+    if output == OUTPUT_CSV:
+        lines = csv_lines(dataset, rows, header=after is None)
+    else:
+        lines = jsonl_lines(dataset, rows)
+    filename = f'{name}-{institution_id}.{output}'
+    return Export(OUTPUT_CONTENT_TYPES[output], filename, _chunks(lines, chunk_size))
@@ -0,0 +1,61 @@
+# server/institutions/management/commands/export_institution_data.py
+
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from institutions.export import DATASETS, OUTPUT_CONTENT_TYPES, OUTPUT_CSV, ExportError, build_export
+
+
+class Command(BaseCommand):
+    """
+    Define el comando `manage.py export_institution_data`.
+    Escribe en un archivo (o en la salida estándar) la exportación de viajes,
+    reservas o calificaciones de una institución, con memoria constante.
+    Con `--after` continúa una exportación interrumpida; con `--file` en un
+    archivo existente, las filas se agregan al final.
+    """
+    help = 'Exporta en CSV o JSONL el historial de una institución.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('institution_id', type=int, help='ID de la institución.')
+        parser.add_argument('dataset', choices=list(DATASETS), help='Datos a exportar.')
+        parser.add_argument('--output', choices=list(OUTPUT_CONTENT_TYPES), default=OUTPUT_CSV,
+                            help='Formato de salida.')
+        parser.add_argument('--since', help='Fecha inicial del viaje (AAAA-MM-DD o ISO 8601).')
+        parser.add_argument('--until', help='Fecha final del viaje, incluida si es una fecha.')
+        parser.add_argument('--after', type=int, help='Reanuda después de esta fila (id).')
+        parser.add_argument('--file', help='Archivo de destino (por defecto, la salida estándar).')
+        parser.add_argument('--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE,
+                            help='Filas por bloque leído de la base de datos.')
+
+    def handle(self, *args, **options):
+        try:
+            export = build_export(
+                options['dataset'],
+                options['institution_id'],
+                output=options['output'],
+                since=options['since'],
+                until=options['until'],
+                after=options['after'],
+                chunk_size=options['chunk_size'],
+            )
+        except ExportError as exc:
+            raise CommandError(str(exc))
+
+        if options['file']:
+            mode = 'ab' if options['after'] is not None else 'wb'
+            with open(options['file'], mode) as target:
+                written = self._write(export, target)
+            self.stderr.write(self.style.SUCCESS(f'{written} bytes escritos en {options["file"]}.'))
+        else:
+            self._write(export, sys.stdout.buffer)
+
+    def _write(self, export, target):
+        written = 0
+        for chunk in export.chunks:
+            target.write(chunk)
+            written += len(chunk)
+        target.flush()
+        return written
@@ -4,6 +4,7 @@ import jwt
 from django.conf import settings
 from rest_framework.permissions import BasePermission
 import logging
+from config.batch import shared_principal
 from .models import Institution
 
 logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ class IsInstitutionAuthenticated(BasePermission):
             # Busca la institución en la base de datos y la adjunta al objeto 'request'.
             # Esto permite que las vistas accedan a la institución autenticada
             # de forma sencilla a través de `request.institution`.
-            request.institution = Institution.objects.get(id_institution=institution_id)
+            request.institution = shared_principal(request, Institution, institution_id)
             return True
 
         except jwt.ExpiredSignatureError:
@@ -0,0 +1,126 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+import jwt
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from institutions.models import Institution
+from realize.models import Realize
+from travel.test_views import TravelSearchTestMixin
+
+
+class InstitutionExportViewTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para la exportación continua del historial de la institución.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.first = self._travel(self.near_route, -72, state='completed')
+        self.second = self._travel(self.near_route, -24, state='completed')
+        self.third = self._travel(self.far_route, 24)
+        Realize.objects.create(user=self.user, travel=self.first, status=Realize.STATUS_CONFIRMED)
+        other = Institution.objects.create(official_name="Other University", email="other@university.edu", phone="+5700000000")
+        self.token = self._institution_token(self.institution)
+        self.other_token = self._institution_token(other)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def _institution_token(self, institution):
+        return jwt.encode(
+            {'institution_id': institution.id_institution, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256'
+        )
+
+    def _get(self, url, **params):
+        response = self.client.get(url, params)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode('utf-8')
+
+    def test_csv_export_streams_rows_in_id_order(self):
+        response, body = self._get('/api/institutions/export/travels/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('travels-', response['Content-Disposition'])
+        rows = list(csv.reader(body.splitlines()))
+        self.assertEqual(rows[0][:3], ['id', 'time', 'travel_state'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [self.first.id, self.second.id, self.third.id])
+        self.assertEqual(rows[1][5], 'Test Driver')
+
+    def test_jsonl_export(self):
+        response, body = self._get('/api/institutions/export/reservations/', output='jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['travel_id'], self.first.id)
+        self.assertEqual(lines[0]['status'], Realize.STATUS_CONFIRMED)
+
+    def test_resume_after_last_id_skips_header(self):
+        _, body = self._get('/api/institutions/export/travels/', after=self.first.id)
+        rows = list(csv.reader(body.splitlines()))
+        self.assertEqual([int(row[0]) for row in rows], [self.second.id, self.third.id])
+
+    def test_date_range_filter(self):
+        today = timezone.localdate()
+        _, body = self._get(
+            '/api/institutions/export/travels/',
+            since=(today - timedelta(days=2)).isoformat(),
+            until=today.isoformat(),
+        )
+        rows = list(csv.reader(body.splitlines()))[1:]
+        self.assertEqual([int(row[0]) for row in rows], [self.second.id])
+
+    def test_end_date_includes_the_whole_day(self):
+        _, body = self._get('/api/institutions/export/travels/', until=timezone.localtime(self.third.time).date().isoformat())
+        rows = list(csv.reader(body.splitlines()))[1:]
+        self.assertEqual([int(row[0]) for row in rows], [self.first.id, self.second.id, self.third.id])
+
+    def test_other_institution_sees_nothing(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.other_token}')
+        _, body = self._get('/api/institutions/export/travels/')
+        self.assertEqual(len(body.splitlines()), 1)
+
+    def test_invalid_parameters(self):
+        for url, params in (
+            ('/api/institutions/export/payments/', {}),
+            ('/api/institutions/export/travels/', {'output': 'xml'}),
+            ('/api/institutions/export/travels/', {'since': 'ayer'}),
+            ('/api/institutions/export/travels/', {'after': 'x'}),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn('error', response.json())
+
+    def test_impossible_dates_are_rejected(self):
+        for params in ({'since': '2026-02-30'}, {'until': '2026-10-01T25:00'}, {'until': '9999-12-31'}):
+            response = self.client.get('/api/institutions/export/travels/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+    def test_user_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = self.client.get('/api/institutions/export/travels/')
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_management_command_resumes_into_the_same_file(self):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        institution_id = str(self.institution.id_institution)
+        _, expected = self._get('/api/institutions/export/travels/')
+
+        # Primera corrida interrumpida tras el primer viaje; la segunda continúa.
+        call_command('export_institution_data', institution_id, 'travels', file=path,
+                     until=self.second.time.isoformat(), stderr=StringIO())
+        call_command('export_institution_data', institution_id, 'travels', file=path,
+                     after=self.first.id, chunk_size=1, stderr=StringIO())
+        with open(path, newline='') as exported:
+            self.assertEqual(exported.read(), expected)
@@ -11,6 +11,7 @@ from .views import (
     DriverApplicationsListView,
     ApproveDriverView,
     RejectDriverView,
+    InstitutionExportView,
 )
 
 # Lista de patrones de URL para la aplicación 'institutions'.
@@ -31,4 +32,7 @@ urlpatterns = [
     path('driver-applications/', DriverApplicationsListView.as_view(), name='institution-driver-applications'),
     path('driver-applications/<str:uid>/approve/', ApproveDriverView.as_view(), name='institution-approve-driver'),
     path('driver-applications/<str:uid>/reject/', RejectDriverView.as_view(), name='institution-reject-driver'),
+
+    # Exportación continua (CSV/JSONL) del historial de la institución.
+    path('export/<str:dataset>/', InstitutionExportView.as_view(), name='institution-export'),
 ]
\ No newline at end of file
@@ -4,6 +4,7 @@ from django.shortcuts import render
 from rest_framework import generics, status, views
 from django.contrib.auth.hashers import check_password
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
 from .models import Institution
 from users.models import Users
@@ -13,6 +14,7 @@ from users.serializers import UsersSerializer
 from rest_framework.response import Response
 from .permissions import IsInstitutionAuthenticated
 from .utils import generate_institution_token
+from .export import OUTPUT_CSV, ExportError, build_export
 
 class InstitutionCreateView(generics.CreateAPIView):
     """
@@ -208,4 +210,41 @@ class RejectDriverView(views.APIView):
         
         user.driver_state = "rechazado"
         user.save()
-        return Response({"message": f"La solicitud de conductor de {user.full_name} ha sido rechazada."}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({"message": f"La solicitud de conductor de {user.full_name} ha sido rechazada."}, status=status.HTTP_200_OK)
+
+
+class InstitutionExportView(views.APIView):
+    """
+    Exporta el historial de la institución autenticada como descarga continua.
+
+    GET /api/institutions/export/<dataset>/
+
+    - dataset: `travels`, `reservations` o `assessments`.
+    - output: `csv` (por defecto) o `jsonl`. (No se llama `format` porque DRF
+      reserva ese parámetro para elegir el renderizador.)
+    - since / until: rango de fechas del viaje (AAAA-MM-DD o ISO 8601).
+    - after: id de la última fila recibida, para reanudar una descarga cortada.
+    """
+    permission_classes = [IsInstitutionAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # El cliente puede pedir `Accept: text/csv`; los errores salen en JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    @swagger_auto_schema(operation_summary="Endpoint para exportar viajes, reservas o calificaciones de mi institución")
+    def get(self, request, dataset):
+        params = request.query_params
+        try:
+            export = build_export(
+                dataset,
+                request.institution.id_institution,
+                output=params.get('output', OUTPUT_CSV),
+                since=params.get('since'),
+                until=params.get('until'),
+                after=params.get('after'),
+            )
+        except ExportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(export.chunks, content_type=export.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{export.filename}"'
+        return response
@@ -0,0 +1,76 @@
+# server/realize/booking.py
+
+"""
+Validación de reservas con un presupuesto fijo de consultas.
+
+Todo lo necesario para aceptar o rechazar una reserva (estado del viaje,
+institución del conductor, capacidad del vehículo, cupos ocupados y si el
+usuario ya tiene una reserva) se obtiene con una sola consulta anotada sobre
+el viaje, en lugar de cargar relaciones de forma perezosa una por una.
+"""
+
+from django.db.models import Exists, F, OuterRef
+from rest_framework import serializers
+
+from travel.models import Travel
+from .confirmation import taken_seats_subquery
+from .models import Realize
+
+
+# Nombres de los estados de viaje tal como se muestran en los mensajes de error.
+STATE_LABELS = {
+    'scheduled': 'Programado',
+    'in_progress': 'En progreso',
+    'completed': 'Completado',
+    'cancelled': 'Cancelado',
+}
+
+
+def load_booking_context(travel_id, user):
+    """
+    Devuelve un diccionario con los datos del viaje necesarios para validar la
+    reserva de `user`, o None si el viaje no existe. Una sola consulta.
+    """
+    return Travel.objects.filter(id=travel_id).annotate(
+        driver_institution_id=F('driver__user__institution_id'),
+        capacity=F('vehicle__capacity'),
+        taken=taken_seats_subquery('pk'),
+        already_reserved=Exists(Realize.objects.filter(travel=OuterRef('pk'), user=user)),
+    ).values(
+        'id', 'travel_state', 'driver_institution_id', 'capacity', 'taken', 'already_reserved'
+    ).first()
+
+
+def validate_booking(user, travel_id, allowed_states=('scheduled',)):
+    """
+    Valida que `user` pueda reservar el viaje y devuelve su contexto (ver
+    `load_booking_context`). Lanza `serializers.ValidationError` si no puede.
+    La disponibilidad de cupos se deja a quien llama, que decide cómo reportarla.
+    """
+    context = load_booking_context(travel_id, user)
+    if context is None:
+        raise serializers.ValidationError(
+            {"id_travel": f'Clave primaria "{travel_id}" inválida - objeto no existe.'}
+        )
+
+    if context['travel_state'] not in allowed_states:
+        labels = " o ".join(f"'{STATE_LABELS.get(state, state)}'" for state in allowed_states)
+        raise serializers.ValidationError({
+            "id_travel": f"No se puede reservar este viaje. Solo se admiten viajes en estado {labels}."
+        })
+
+    if context['already_reserved']:
+        raise serializers.ValidationError("Ya tienes una reserva para este viaje.")
+
+    if not context['driver_institution_id'] or not user.institution_id:
+        raise serializers.ValidationError({"institution_error": "Información de institución faltante."})
+    if user.institution_id != context['driver_institution_id']:
+        raise serializers.ValidationError(
+            {"institution_mismatch": "Solo puedes reservar viajes de tu misma institución."}
+        )
+    return context
+
+
+def has_free_seats(context):
+    """Indica si al viaje del contexto le quedan cupos."""
+    return context['capacity'] - context['taken'] > 0
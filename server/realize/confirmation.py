@@ -0,0 +1,222 @@
+# server/realize/confirmation.py
+
+"""
+Confirmación de reservas con un bloqueo del viaje y un UPDATE condicional.
+
+En lugar de leer la reserva, revisar su estado en Python y guardarla (dos
+consultas y una condición de carrera entre lectura y escritura), la
+confirmación bloquea la fila del viaje (SELECT ... FOR UPDATE) y se expresa
+como:
+
+    UPDATE realize SET status = 'confirmed'
+    WHERE id = ... AND travel = ... AND status = 'pending'
+      AND <capacidad del vehículo> > <cupos ocupados por las demás reservas>
+
+Ocupan cupo las reservas confirmadas y las que llegaron desde la lista de
+espera (`seat_held`). Así, una reserva promovida siempre puede confirmarse y
+una reserva pendiente común no puede tomar el cupo apartado para ella.
+
+El bloqueo es necesario: en READ COMMITTED, dos UPDATE simultáneos de reservas
+distintas del mismo viaje cuentan las confirmadas sin ver la fila del otro y
+ambos pasarían la condición con un solo cupo libre. Con el viaje bloqueado, el
+segundo espera a que el primero termine y su UPDATE, que toma una instantánea
+nueva, ya cuenta esa confirmación. La base de datos solo se vuelve a consultar
+cuando la actualización no afecta ninguna fila, para explicar el motivo.
+
+Para el abordaje masivo (`confirm_reservations_bulk`) el viaje se bloquea una
+vez y todo el lote se valida con una consulta y se confirma con un UPDATE.
+"""
+
+from collections import namedtuple
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from django.db import transaction
+from django.utils import timezone
+
+from travel.feed import touch_travels_on_commit
+from travel.models import Travel
+from .models import Realize
+from .tokens import InvalidQRToken, read_qr_token
+
+# Resultados posibles de una confirmación.
+OUTCOME_CONFIRMED = 'confirmed'
+OUTCOME_ALREADY_CONFIRMED = 'already_confirmed'
+OUTCOME_NOT_FOUND = 'not_found'
+OUTCOME_NOT_PENDING = 'not_pending'
+OUTCOME_FULL = 'full'
+OUTCOME_INVALID_TOKEN = 'invalid_token'
+
+ConfirmationResult = namedtuple('ConfirmationResult', ['realize_id', 'travel_id', 'outcome', 'status'])
+
+
+def taken_seats_subquery(travel_ref='travel', exclude_ref=None):
+    """
+    Subconsulta con el número de cupos ocupados del viaje referenciado (ver
+    `Realize.seat_taken`). Con `exclude_ref` no se cuenta esa reserva.
+    """
+    taken = Realize.objects.filter(Realize.seat_taken(), travel=OuterRef(travel_ref))
+    if exclude_ref is not None:
+        taken = taken.exclude(pk=OuterRef(exclude_ref))
+    taken = taken.order_by().values('travel').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(taken, output_field=IntegerField()), Value(0))
+
+
+def confirm_reservation(realize_id, travel_id=None, driver_id=None):
+    """
+    Confirma una reserva pendiente si el vehículo aún tiene cupos.
+    Si se indica `travel_id` (por ejemplo, leído de un token QR), la reserva
+    también debe pertenecer a ese viaje; si se indica `driver_id`, el viaje debe
+    ser de ese conductor. Devuelve un `ConfirmationResult`.
+    """
+    travels = Travel.objects.select_for_update()
+    if travel_id is not None:
+        travels = travels.filter(id=travel_id)
+    else:
+        travels = travels.filter(id__in=Realize.objects.filter(id=realize_id).values('travel_id'))
+    if driver_id is not None:
+        travels = travels.filter(driver_id=driver_id)
+
+    with transaction.atomic():
+        locked_travel_id = travels.values_list('id', flat=True).first()
+        if locked_travel_id is None:
+            return ConfirmationResult(realize_id, travel_id, OUTCOME_NOT_FOUND, None)
+        updated = Realize.objects.filter(
+            id=realize_id,
+            travel_id=locked_travel_id,
+            status=Realize.STATUS_PENDING,
+            travel__vehicle__capacity__gt=taken_seats_subquery(exclude_ref='pk'),
+        ).update(status=Realize.STATUS_CONFIRMED, updated_at=timezone.now())
+        if updated:
+            touch_travels_on_commit([locked_travel_id])
+            return ConfirmationResult(realize_id, locked_travel_id, OUTCOME_CONFIRMED, Realize.STATUS_CONFIRMED)
+    return diagnose_confirmation(realize_id, locked_travel_id)
+
+
+def diagnose_confirmation(realize_id, travel_id=None):
+    """Explica por qué una confirmación no actualizó la reserva (una consulta)."""
+    row = Realize.objects.filter(id=realize_id).values('travel_id', 'status').first()
+    if row is None or (travel_id is not None and row['travel_id'] != travel_id):
+        return ConfirmationResult(realize_id, travel_id, OUTCOME_NOT_FOUND, None)
+    if row['status'] == Realize.STATUS_CONFIRMED:
+        return ConfirmationResult(realize_id, row['travel_id'], OUTCOME_ALREADY_CONFIRMED, row['status'])
+    if row['status'] != Realize.STATUS_PENDING:
+        return ConfirmationResult(realize_id, row['travel_id'], OUTCOME_NOT_PENDING, row['status'])
+    return ConfirmationResult(realize_id, row['travel_id'], OUTCOME_FULL, row['status'])
+
+
+BulkConfirmationResult = namedtuple('BulkConfirmationResult', ['item', 'realize_id', 'outcome'])
+
+
+def resolve_item(item, travel_id):
+    """
+    Convierte un elemento del lote (ID de reserva o token QR) en un ID de
+    reserva. Devuelve (realize_id, outcome_de_error); el error es None si el
+    elemento es válido. Los tokens se verifican sin consultar la base de datos.
+    """
+    if isinstance(item, bool):
+        return None, OUTCOME_INVALID_TOKEN
+    if isinstance(item, int):
+        return item, None
+    if isinstance(item, str) and item.isdigit():
+        return int(item), None
+    try:
+        realize_id, token_travel_id = read_qr_token(str(item))
+    except InvalidQRToken:
+        return None, OUTCOME_INVALID_TOKEN
+    if token_travel_id != travel_id:
+        return realize_id, OUTCOME_NOT_FOUND
+    return realize_id, None
+
+
+def confirm_reservations_bulk(travel, items):
+    """
+    Confirma un lote de reservas de un mismo viaje dentro de una transacción.
+
+    `travel` es un diccionario con 'id', 'capacity' y 'taken' (ver
+    `lock_driver_travel`). Las reservas se validan con una sola consulta, se
+    confirman en orden mientras haya cupos y se actualizan con un único UPDATE.
+    Las reservas con cupo apartado se confirman sin consumir cupos libres.
+    Las reservas ya confirmadas se reportan como `already_confirmed`, de modo
+    que reenviar un lote (por ejemplo, desde el buffer sin conexión de la app)
+    es idempotente. Devuelve (resultados, cupos_restantes).
+    """
+    resolved = [resolve_item(item, travel['id']) for item in items]
+    wanted = {realize_id for realize_id, error in resolved if error is None}
+    statuses, held = {}, set()
+    if wanted:
+        for realize_id, realize_status, seat_held in Realize.objects.filter(
+            id__in=wanted, travel_id=travel['id']
+        ).values_list('id', 'status', 'seat_held'):
+            statuses[realize_id] = realize_status
+            if seat_held:
+                held.add(realize_id)
+
+    remaining = travel['capacity'] - travel['taken']
+    to_confirm = []
+    outcomes = {}
+    results = []
+    for item, (realize_id, error) in zip(items, resolved):
+        if error is None and realize_id in outcomes:
+            # Elemento repetido en el lote: mismo resultado que la primera vez.
+            outcome = outcomes[realize_id]
+        elif error is not None:
+            outcome = error
+        elif realize_id not in statuses:
+            outcome = OUTCOME_NOT_FOUND
+        elif statuses[realize_id] == Realize.STATUS_CONFIRMED:
+            outcome = OUTCOME_ALREADY_CONFIRMED
+        elif statuses[realize_id] != Realize.STATUS_PENDING:
+            outcome = OUTCOME_NOT_PENDING
+        elif realize_id in held:
+            # Su cupo ya está contado en 'taken'.
+            outcome = OUTCOME_CONFIRMED
+            to_confirm.append(realize_id)
+        elif remaining <= 0:
+            outcome = OUTCOME_FULL
+        else:
+            outcome = OUTCOME_CONFIRMED
+            remaining -= 1
+            to_confirm.append(realize_id)
+        if error is None:
+            outcomes[realize_id] = outcome
+        results.append(BulkConfirmationResult(item, realize_id, outcome))
+
+    if to_confirm:
+        touch_travels_on_commit([travel['id']])
+        updated = Realize.objects.filter(
+            id__in=to_confirm, status=Realize.STATUS_PENDING
+        ).update(status=Realize.STATUS_CONFIRMED, updated_at=timezone.now())
+        if updated != len(to_confirm):
+            # Alguna reserva cambió de estado (por ejemplo, se canceló) entre la
+            # validación y el UPDATE: se corrigen esos resultados.
+            confirmed_now = set(Realize.objects.filter(
+                id__in=to_confirm, status=Realize.STATUS_CONFIRMED
+            ).values_list('id', flat=True))
+            lost = set(to_confirm) - confirmed_now
+            # Las que no tenían cupo apartado lo habían descontado.
+            remaining += len(lost - held)
+            results = [
+                result._replace(outcome=OUTCOME_NOT_PENDING)
+                if result.outcome == OUTCOME_CONFIRMED and result.realize_id in lost else result
+                for result in results
+            ]
+    return results, remaining
+
+
+def lock_driver_travel(travel_id, driver_id):
+    """
+    Bloquea (SELECT ... FOR UPDATE) el viaje del conductor y devuelve su
+    capacidad y el número de cupos ocupados, o None si el viaje no existe
+    o no es suyo. El bloqueo serializa las confirmaciones simultáneas del viaje.
+    """
+    travel = Travel.objects.select_for_update(of=('self',)).filter(
+        id=travel_id,
+        driver_id=driver_id,
+    ).values('id', capacity=F('vehicle__capacity')).first()
+    if travel is not None:
+        # Se cuenta en otra consulta, después de obtener el bloqueo: así se ven
+        # las confirmaciones que terminaron mientras se esperaba.
+        travel['taken'] = Realize.objects.filter(Realize.seat_taken(), travel_id=travel_id).count()
+    return travel
@@ -0,0 +1,38 @@
+from channels.generic.websocket import AsyncWebsocketConsumer
+from config.consumers import NegotiatedFormatMixin
+from .notifications import user_group_name
+
+
+class UserNotificationConsumer(NegotiatedFormatMixin, AsyncWebsocketConsumer):
+    """
+    Canal personal de notificaciones del usuario autenticado (por ejemplo,
+    la promoción desde la lista de espera o su nueva posición en ella).
+    """
+
+    async def connect(self):
+        self.group_name = None
+        user = self.scope.get("user")
+        if not self.scope.get("user_is_authenticated", False):
+            print("Conexión de notificaciones rechazada: No autenticado.")
+            await self.close(code=4001)
+            return
+
+        self.group_name = user_group_name(user.uid)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    # Handler: el usuario pasó de la lista de espera a tener una reserva.
+    async def waitlist_promoted(self, event):
+        await self.send_payload(event)
+
+    # Handler: cambió la posición del usuario en la lista de espera.
+    async def waitlist_position(self, event):
+        await self.send_payload(event)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Este consumer solo envía notificaciones
+        pass
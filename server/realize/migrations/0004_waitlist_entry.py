@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realize', '0003_alter_realize_id'),
+        ('travel', '0002_alter_travel_vehicle_travel_chk_price_positive_and_more'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('travel', models.ForeignKey(db_column='id_travel', on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='travel.travel')),
+                ('user', models.ForeignKey(db_column='uid', on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='users.users')),
+            ],
+            options={
+                'db_table': 'waitlist_entry',
+                'indexes': [models.Index(fields=['travel', 'id'], name='waitlist_travel_order_idx')],
+                'unique_together': {('user', 'travel')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realize', '0004_waitlist_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='realize',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='realize',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='realize_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realize', '0005_realize_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='realize',
+            name='seat_held',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # server/realize/models.py
 
 from django.db import models
+from django.db.models import Q
 from users.models import Users
 from travel.models import Travel
 
@@ -46,12 +47,75 @@ class Realize(models.Model):
         default=STATUS_PENDING
     )
 
+    # La reserva viene de la lista de espera: mientras siga pendiente tiene un
+    # cupo apartado, que nadie más puede confirmar (ver `realize.waitlist`).
+    seat_held = models.BooleanField(default=False)
+
+    # Última modificación, para la sincronización incremental (ver `sync`).
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         """Metadatos del modelo."""
         db_table = 'realize'
         # Restricción para asegurar que un usuario no pueda reservar el mismo viaje más de una vez.
         unique_together = (('user', 'travel'),) 
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='realize_user_updated_idx'),
+        ]
+
+    @classmethod
+    def seat_taken(cls, prefix=''):
+        """
+        Filtro de las reservas que ocupan un cupo del vehículo: las confirmadas
+        y las pendientes con cupo apartado. `prefix` permite usarlo desde otro
+        modelo (por ejemplo, `Realize.seat_taken('realize__')` sobre `Travel`).
+        """
+        return (
+            Q(**{f'{prefix}status': cls.STATUS_CONFIRMED})
+            | Q(**{f'{prefix}status': cls.STATUS_PENDING, f'{prefix}seat_held': True})
+        )
+
+    def __str__(self):
+        """Representación en cadena del objeto."""
+        return f"Reserva {self.id} de {self.user.full_name} para Viaje {self.travel.id} - Estado: {self.status}"
+
+class WaitlistEntry(models.Model):
+    """
+    Lugar de un usuario en la lista de espera de un viaje lleno.
+
+    La cola es FIFO por viaje: el orden lo da el ID autoincremental. Cuando se
+    libera un cupo, la entrada más antigua se convierte en una reserva y se
+    elimina de la lista (ver `realize.waitlist`).
+    """
+    id = models.AutoField(primary_key=True)
+
+    # Usuario que espera un cupo.
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        db_column='uid',
+        related_name='waitlist_entries'
+    )
+
+    # Viaje lleno al que el usuario quiere entrar.
+    travel = models.ForeignKey(
+        Travel,
+        on_delete=models.CASCADE,
+        db_column='id_travel',
+        related_name='waitlist'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Metadatos del modelo."""
+        db_table = 'waitlist_entry'
+        # Un usuario solo puede estar una vez en la lista de espera de cada viaje.
+        unique_together = (('user', 'travel'),)
+        indexes = [
+            models.Index(fields=['travel', 'id'], name='waitlist_travel_order_idx'),
+        ]
 
     def __str__(self):
         """Representación en cadena del objeto."""
-        return f"Reserva {self.id} de {self.user.full_name} para Viaje {self.travel.id} - Estado: {self.status}"
\ No newline at end of file
+        return f"Espera {self.id} de {self.user.full_name} para Viaje {self.travel_id}"
@@ -0,0 +1,34 @@
+# server/realize/notifications.py
+
+"""
+Notificaciones en tiempo real a un usuario concreto a través de Channels.
+
+Cada usuario conectado a `ws/user/notifications/` pertenece al grupo
+`user_notifications_<uid>` (ver `realize.consumers.UserNotificationConsumer`).
+"""
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+
+def user_group_name(uid):
+    """Nombre del grupo de Channels de un usuario."""
+    return f'user_notifications_{uid}'
+
+
+def notify_user(uid, event_type, payload):
+    """
+    Envía un evento al grupo del usuario cuando la transacción actual se
+    confirma, para no anunciar cambios que luego se deshacen.
+    """
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        async_to_sync(channel_layer.group_send)(
+            user_group_name(uid),
+            {"type": event_type, **payload}
+        )
+
+    transaction.on_commit(send)
@@ -0,0 +1,18 @@
+# server/realize/projections.py
+
+"""
+Proyección (ver `config.projection`) del listado de reservas del usuario,
+equivalente a `RealizeSerializer`.
+"""
+
+from config.projection import Projection
+from .serializers import RealizeSerializer
+from .tokens import make_qr_token
+
+REALIZE_PROJECTION = Projection(
+    RealizeSerializer,
+    computed={
+        'qr_token': lambda row, extra, context: make_qr_token(row['id'], row['travel']),
+    },
+    extra_columns=('travel',),
+)
@@ -0,0 +1,6 @@
+from django.urls import path
+from .consumers import UserNotificationConsumer
+
+websocket_urlpatterns = [
+    path('ws/user/notifications/', UserNotificationConsumer.as_asgi()),
+]
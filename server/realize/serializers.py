@@ -2,12 +2,16 @@
 
 from rest_framework import serializers
 from .models import Realize, Users, Travel 
+from .tokens import qr_token_for
+from .booking import validate_booking
+from config.sparse_fields import SparseFieldsSerializerMixin
 
-class RealizeSerializer(serializers.ModelSerializer):
+class RealizeSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializador principal para el modelo Realize.
     Se utiliza para listar, recuperar y actualizar (PATCH/PUT) reservas.
     Permite la visualización del 'status' y su modificación en operaciones de actualización.
+    En los listados admite `?fields=` (ver `config.sparse_fields`).
     """
     # Campo de solo lectura para el ID de la reserva.
     id = serializers.IntegerField(read_only=True)
@@ -22,12 +26,25 @@ class RealizeSerializer(serializers.ModelSerializer):
     # Campo de solo lectura para el ID del viaje, obtenido a través de la relación.
     travelid = serializers.IntegerField(source='travel.id', read_only=True)
 
+    # Token firmado que el pasajero muestra como código QR al abordar.
+    qr_token = serializers.SerializerMethodField()
+
     class Meta:
         model = Realize
-        fields = ['id', 'uid', 'id_travel', 'travelid', 'status']
+        fields = ['id', 'uid', 'id_travel', 'travelid', 'status', 'qr_token']
         # Define qué campos no se pueden modificar directamente a través de este serializador.
         read_only_fields = ['id', 'uid', 'travelid']
 
+    field_requirements = {
+        'uid': {'select_related': ['user']},
+        'id_travel': {'only': ['travel']},
+        'travelid': {'select_related': ['travel']},
+        'qr_token': {'only': ['travel']},
+    }
+
+    def get_qr_token(self, obj):
+        return qr_token_for(obj)
+
     def validate(self, data):
         """
         Realiza validaciones para la creación y actualización de reservas.
@@ -48,26 +65,8 @@ class RealizeSerializer(serializers.ModelSerializer):
             if not travel:
                 raise serializers.ValidationError({"id_travel": "El ID del viaje es requerido."})
 
-            if Realize.objects.filter(user=reserving_user, travel=travel).exists():
-                raise serializers.ValidationError("Ya tienes una reserva para este viaje.")
-
-            # Valida que el viaje esté 'scheduled' o 'in_progress'.
-            if travel.travel_state not in [Travel.TRAVEL_STATES[0][0], Travel.TRAVEL_STATES[1][0]]:
-                current_travel_state_display = next(
-                    (display for value, display in Travel.TRAVEL_STATES if value == travel.travel_state),
-                    travel.travel_state
-                )
-                raise serializers.ValidationError({"id_travel": f"No se puede reservar un viaje en estado '{current_travel_state_display}'."})
-
-            # Valida que el usuario y el conductor pertenezcan a la misma institución.
-            driver_of_travel_user = travel.driver.user
-            if not driver_of_travel_user.institution or not reserving_user.institution:
-                raise serializers.ValidationError({"institution_error": "Información de institución faltante para el conductor o el usuario."})
-
-            if reserving_user.institution.id_institution != driver_of_travel_user.institution.id_institution:
-                raise serializers.ValidationError(
-                    {"institution_mismatch": "Solo puedes reservar viajes ofrecidos por conductores de tu misma institución."}
-                )
+            # Estado del viaje, reserva previa e institución se validan con una sola consulta.
+            validate_booking(reserving_user, travel.id, allowed_states=('scheduled', 'in_progress'))
 
             # Asigna el usuario de la petición a la reserva.
             data['user'] = reserving_user
@@ -82,7 +81,7 @@ class RealizeSerializer(serializers.ModelSerializer):
                 instance = self.instance # La reserva que se está actualizando.
                 
                 # Un usuario solo puede cancelar su propia reserva (a menos que sea admin).
-                if instance.user != reserving_user and reserving_user.user_type != Users.TYPE_ADMIN:
+                if instance.user_id != reserving_user.uid and reserving_user.user_type != Users.TYPE_ADMIN:
                     raise serializers.ValidationError({"status": "No tienes permiso para cancelar esta reserva."})
 
                 if instance.status == Realize.STATUS_CANCELLED:
@@ -97,51 +96,42 @@ class RealizeSerializer(serializers.ModelSerializer):
 class RealizeCreateSerializer(serializers.ModelSerializer):
     """
     Serializador específico para la creación de nuevas reservas.
+
+    El viaje se recibe como un ID simple (no como `PrimaryKeyRelatedField`) para
+    que su existencia se compruebe en la misma consulta que el resto de la
+    validación (ver `realize.booking`).
     """
-    id_travel = serializers.PrimaryKeyRelatedField(queryset=Travel.objects.all(), source='travel', write_only=True)
+    id_travel = serializers.IntegerField(write_only=True)
     uid = serializers.IntegerField(source='user.uid', read_only=True)
     id = serializers.IntegerField(read_only=True) 
-    travel_id = serializers.IntegerField(source='travel.id', read_only=True)
+    travel_id = serializers.IntegerField(read_only=True)
     status = serializers.CharField(read_only=True)
+    qr_token = serializers.SerializerMethodField()
 
     class Meta:
         model = Realize
-        fields = ['id', 'uid', 'id_travel', 'travel_id', 'status']
+        fields = ['id', 'uid', 'id_travel', 'travel_id', 'status', 'qr_token']
         read_only_fields = ['id', 'uid', 'travel_id', 'status'] 
 
+    def get_qr_token(self, obj):
+        return qr_token_for(obj)
+
     def create(self, validated_data):
         return Realize.objects.create(**validated_data)
 
     def validate(self, data):
         """
         Realiza validaciones específicas para la creación de una nueva reserva.
+        Estado del viaje, reserva previa, institución y cupos se obtienen en una
+        sola consulta; el contexto queda en `self.booking_context` para la vista.
         """
         request = self.context.get('request')
         if not request or not hasattr(request, 'user') or not request.user:
             raise serializers.ValidationError("No se pudo obtener el usuario autenticado.")
 
         reserving_user = request.user
-        travel = data.get('travel') 
-
-        if not travel:
-            raise serializers.ValidationError({"id_travel": "El ID del viaje es requerido."})
-
-        # --- ¡CAMBIO CLAVE EN LA LÓGICA DE RESERVA! ---
-        # Ahora, una reserva solo es válida si el estado del viaje es 'scheduled'.
-        if travel.travel_state != 'scheduled':
-            raise serializers.ValidationError({
-                "id_travel": f"No se puede reservar este viaje. Solo se admiten viajes en estado 'Programado'."
-            })
-        
-        # El resto de las validaciones se mantienen.
-        if Realize.objects.filter(user=reserving_user, travel=travel).exists():
-            raise serializers.ValidationError("Ya tienes una reserva para este viaje.")
-        
-        driver_of_travel_user = travel.driver.user
-        if not driver_of_travel_user.institution or not reserving_user.institution:
-            raise serializers.ValidationError({"institution_error": "Información de institución faltante."})
-        if reserving_user.institution.id_institution != driver_of_travel_user.institution.id_institution:
-            raise serializers.ValidationError({"institution_mismatch": "Solo puedes reservar viajes de tu misma institución."})
+        self.booking_context = validate_booking(reserving_user, data['id_travel'])
 
+        data['travel_id'] = data.pop('id_travel')
         data['user'] = reserving_user
-        return data
\ No newline at end of file
+        return data
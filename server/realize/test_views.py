@@ -0,0 +1,542 @@
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from driver.models import Driver
+from institutions.models import Institution
+from realize.booking import validate_booking
+from realize.confirmation import confirm_reservation
+from realize.models import Realize, WaitlistEntry
+from realize.tokens import InvalidQRToken, make_qr_token, read_qr_token
+from route.test_canonical import insert_route_row
+from travel.models import Travel
+from users.models import Users
+from vehicle.models import Vehicle
+
+
+class RealizeTestMixin:
+    """Datos comunes: un conductor con un viaje programado y pasajeros de su institución."""
+
+    def setUp(self):
+        self.institution = Institution.objects.create(official_name="Universidad Test", email="test@univalle.edu.co")
+        self.driver = Driver.objects.create(user=self.create_user("driver@test.com", Users.TYPE_DRIVER), validate_state='approved')
+        self.vehicle = Vehicle.objects.create(
+            driver=self.driver,
+            plate="ABC123",
+            brand="Toyota",
+            model="Corolla",
+            vehicle_type="Sedan",
+            category="metropolitano",
+            soat=datetime.now().date() + timedelta(days=365),
+            tecnomechanical=datetime.now().date() + timedelta(days=365),
+            capacity=2
+        )
+        self.travel = Travel.objects.create(
+            driver=self.driver, vehicle=self.vehicle, route_id=insert_route_row(self.driver),
+            time=timezone.now() + timedelta(hours=1), travel_state='scheduled', price=5000
+        )
+
+    def create_user(self, mail, user_type=Users.TYPE_STUDENT):
+        return Users.objects.create(
+            full_name="Test User",
+            user_type=user_type,
+            institutional_mail=mail,
+            student_code="2023001",
+            udocument="12345678",
+            direction="Test Address",
+            uphone="+573001234567",
+            upassword=make_password("pass12345"),
+            institution=self.institution,
+            user_state=Users.STATE_APPROVED,
+            driver_state=Users.DRIVER_STATE_APPROVED if user_type == Users.TYPE_DRIVER else Users.DRIVER_STATE_NONE,
+        )
+
+    def reserve(self, mail, status=Realize.STATUS_PENDING):
+        return Realize.objects.create(user=self.create_user(mail), travel=self.travel, status=status)
+
+
+class QRTokenTest(APITestCase):
+    """
+    Casos de prueba para los tokens firmados de los códigos QR.
+    """
+
+    def test_round_trip(self):
+        """El token se lee de vuelta como (reserva, viaje)."""
+        self.assertEqual(read_qr_token(make_qr_token(12, 34)), (12, 34))
+
+    def test_tampered_token_is_rejected(self):
+        """Cambiar los IDs invalida la firma."""
+        token = make_qr_token(12, 34)
+        with self.assertRaises(InvalidQRToken):
+            read_qr_token(token.replace('12.34', '13.34'))
+        with self.assertRaises(InvalidQRToken):
+            read_qr_token('basura')
+
+
+class RealizeConfirmByTokenViewTest(RealizeTestMixin, APITestCase):
+    """
+    Casos de prueba para la confirmación de reservas con el token del QR.
+    """
+
+    def url(self, reservation):
+        return f'/api/realize/confirm/token/{make_qr_token(reservation.id, reservation.travel_id)}/'
+
+    def test_confirm_locks_travel_then_updates(self):
+        """Una confirmación válida bloquea el viaje y hace un único UPDATE."""
+        reservation = self.reserve("a@test.com")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url(reservation))
+        statements = [query['sql'] for query in queries.captured_queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 2)
+        self.assertIn('FROM "travel"', statements[0])
+        self.assertTrue(statements[1].startswith('UPDATE "realize"'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['success'], f"La reserva para el viaje {self.travel.id} ha sido confirmada.")
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Realize.STATUS_CONFIRMED)
+
+    def test_second_scan_is_rejected(self):
+        """Escanear dos veces el mismo QR no vuelve a confirmar la reserva."""
+        reservation = self.reserve("a@test.com")
+        self.client.get(self.url(reservation))
+        response = self.client.get(self.url(reservation))
+        self.assertEqual(response.status_code, 400)
+
+    def test_full_vehicle(self):
+        """Con el vehículo lleno la confirmación se rechaza con 409."""
+        self.reserve("a@test.com", Realize.STATUS_CONFIRMED)
+        self.reserve("b@test.com", Realize.STATUS_CONFIRMED)
+        reservation = self.reserve("c@test.com")
+        response = self.client.get(self.url(reservation))
+        self.assertEqual(response.status_code, 409)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Realize.STATUS_PENDING)
+
+    def test_invalid_or_mismatched_token(self):
+        """Un token alterado da 400 y uno de otro viaje da 404."""
+        reservation = self.reserve("a@test.com")
+        self.assertEqual(self.client.get('/api/realize/confirm/token/1.1:firma/').status_code, 400)
+        response = self.client.get(f'/api/realize/confirm/token/{make_qr_token(reservation.id, self.travel.id + 1)}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_reservation_exposes_qr_token(self):
+        """La reserva serializada incluye su token QR."""
+        from realize.serializers import RealizeSerializer
+        reservation = self.reserve("a@test.com")
+        token = RealizeSerializer(reservation).data['qr_token']
+        self.assertEqual(read_qr_token(token), (reservation.id, self.travel.id))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentConfirmationTest(RealizeTestMixin, TransactionTestCase):
+    """
+    Dos escaneos simultáneos de reservas distintas con un solo cupo libre.
+    Necesita una base de datos con SELECT ... FOR UPDATE (PostgreSQL).
+    """
+
+    def test_concurrent_confirms_do_not_overfill(self):
+        self.reserve("a@test.com", Realize.STATUS_CONFIRMED)
+        pending = [self.reserve("b@test.com"), self.reserve("c@test.com")]
+        barrier = threading.Barrier(len(pending))
+        outcomes = []
+
+        def scan(reservation):
+            try:
+                barrier.wait()
+                outcomes.append(confirm_reservation(reservation.id, reservation.travel_id).outcome)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=scan, args=(reservation,)) for reservation in pending]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['confirmed', 'full'])
+        self.assertEqual(Realize.objects.filter(travel=self.travel, status=Realize.STATUS_CONFIRMED).count(), 2)
+
+
+class RealizeConfirmByIdViewTest(RealizeTestMixin, APITestCase):
+    """
+    Casos de prueba para la confirmación por ID, reservada al conductor del viaje.
+    """
+
+    def authenticate(self, user):
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_requires_authentication(self):
+        reservation = self.reserve("a@test.com")
+        response = self.client.get(f'/api/realize/confirm/{reservation.id}/')
+        self.assertIn(response.status_code, (401, 403))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Realize.STATUS_PENDING)
+
+    def test_only_the_travel_driver_can_confirm(self):
+        reservation = self.reserve("a@test.com")
+        self.authenticate(reservation.user)
+        self.assertEqual(self.client.get(f'/api/realize/confirm/{reservation.id}/').status_code, 404)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Realize.STATUS_PENDING)
+
+        self.authenticate(self.driver.user)
+        response = self.client.get(f'/api/realize/confirm/{reservation.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['success'], f"La reserva para el viaje {self.travel.id} ha sido confirmada.")
+
+
+class RealizeBulkConfirmViewTest(RealizeTestMixin, APITestCase):
+    """
+    Casos de prueba para la confirmación masiva de reservas por el conductor.
+    """
+
+    def setUp(self):
+        super().setUp()
+        token = jwt.encode(
+            {'user_id': self.driver.user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def post(self, items, travel_id=None):
+        return self.client.post(
+            '/api/realize/confirm/bulk/',
+            {'travel_id': travel_id or self.travel.id, 'items': items},
+            format='json',
+        )
+
+    def test_mixed_batch(self):
+        """Cada elemento recibe su resultado y solo se confirman los que caben."""
+        by_id = self.reserve("a@test.com")
+        by_token = self.reserve("b@test.com")
+        no_seat = self.reserve("c@test.com")
+        cancelled = self.reserve("d@test.com", Realize.STATUS_CANCELLED)
+        items = [
+            by_id.id,
+            make_qr_token(by_token.id, self.travel.id),
+            by_id.id,
+            no_seat.id,
+            cancelled.id,
+            make_qr_token(by_id.id, self.travel.id + 1),
+            'basura',
+            999999,
+        ]
+
+        # Autenticación + bloqueo del viaje + conteo de confirmadas + validación
+        # del lote + UPDATE, más el SAVEPOINT y su RELEASE de la transacción.
+        with self.assertNumQueries(7):
+            response = self.post(items)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['outcome'] for result in response.data['results']],
+            ['confirmed', 'confirmed', 'confirmed', 'full', 'not_pending', 'not_found', 'invalid_token', 'not_found'],
+        )
+        self.assertEqual(response.data['confirmed'], 2)
+        self.assertEqual(response.data['remaining_seats'], 0)
+        self.assertEqual(
+            Realize.objects.filter(travel=self.travel, status=Realize.STATUS_CONFIRMED).count(), 2
+        )
+
+    def test_resending_batch_is_idempotent(self):
+        """Reenviar el mismo lote no cambia nada y reporta `already_confirmed`."""
+        reservation = self.reserve("a@test.com")
+        self.post([reservation.id])
+        response = self.post([reservation.id])
+        self.assertEqual(response.data['results'][0]['outcome'], 'already_confirmed')
+        self.assertEqual(response.data['remaining_seats'], 1)
+
+    def test_travel_of_another_driver(self):
+        """Un conductor no puede confirmar reservas de un viaje ajeno."""
+        other = Driver.objects.create(user=self.create_user("other@test.com", Users.TYPE_DRIVER), validate_state='approved')
+        token = jwt.encode(
+            {'user_id': other.user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        reservation = self.reserve("a@test.com")
+        response = self.post([reservation.id])
+        self.assertEqual(response.status_code, 404)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Realize.STATUS_PENDING)
+
+    def test_invalid_payload(self):
+        """El lote debe ser una lista no vacía."""
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post('1,2').status_code, 400)
+
+
+class RealizeCreateViewTest(RealizeTestMixin, APITestCase):
+    """
+    Casos de prueba para la creación de reservas y su presupuesto de consultas.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.passenger = self.create_user("passenger@test.com")
+        self.authenticate(self.passenger)
+
+    def authenticate(self, user):
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def book(self, travel_id=None):
+        return self.client.post('/api/realize/create/', {'id_travel': travel_id or self.travel.id}, format='json')
+
+    def test_booking_query_budget(self):
+        """Una reserva cuesta tres consultas: autenticación, validación e INSERT."""
+        with self.assertNumQueries(3):
+            response = self.book()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['travel_id'], self.travel.id)
+        self.assertEqual(response.data['status'], Realize.STATUS_PENDING)
+        self.assertEqual(read_qr_token(response.data['qr_token']), (response.data['id'], self.travel.id))
+
+    def test_duplicate_booking(self):
+        """Un usuario no puede reservar dos veces el mismo viaje."""
+        self.book()
+        response = self.book()
+        self.assertEqual(response.status_code, 400)
+
+    def test_full_travel(self):
+        """Con el viaje lleno no se crea la reserva: el usuario queda en la lista de espera."""
+        self.reserve("a@test.com", Realize.STATUS_CONFIRMED)
+        self.reserve("b@test.com", Realize.STATUS_CONFIRMED)
+        response = self.book()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['waitlist_position'], 1)
+        self.assertFalse(Realize.objects.filter(user=self.passenger).exists())
+
+    def test_travel_not_scheduled_or_missing(self):
+        """Solo se reservan viajes programados que existan."""
+        Travel.objects.filter(id=self.travel.id).update(travel_state='in_progress')
+        self.assertIn('id_travel', self.book().data)
+        self.assertIn('id_travel', self.book(self.travel.id + 100).data)
+
+    def test_state_error_lists_the_allowed_states(self):
+        """El mensaje de estado nombra los estados que sí se admiten."""
+        Travel.objects.filter(id=self.travel.id).update(travel_state='completed')
+        self.assertIn("'Programado'.", str(self.book().data['id_travel']))
+        with self.assertRaises(ValidationError) as raised:
+            validate_booking(self.passenger, self.travel.id, allowed_states=('scheduled', 'in_progress'))
+        self.assertIn("'Programado' o 'En progreso'", str(raised.exception.detail['id_travel']))
+
+    def test_other_institution(self):
+        """No se pueden reservar viajes de otra institución."""
+        other = Institution.objects.create(official_name="Otra", email="otra@test.com", phone="+570000000000")
+        outsider = self.create_user("outsider@test.com")
+        outsider.institution = other
+        outsider.save()
+        self.authenticate(outsider)
+        response = self.book()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('institution_mismatch', response.data)
+
+
+class IdempotencyKeyTest(RealizeTestMixin, APITestCase):
+    """
+    Casos de prueba para el encabezado Idempotency-Key en la creación de reservas.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.authenticate(self.create_user("passenger@test.com"))
+
+    def authenticate(self, user):
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def book(self, travel_id=None, key='clave-1'):
+        return self.client.post(
+            '/api/realize/create/', {'id_travel': travel_id or self.travel.id},
+            format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_response_without_running_view(self):
+        """El reintento devuelve la misma respuesta sin volver a validar ni insertar."""
+        first = self.book()
+        self.assertEqual(first.status_code, 201)
+        # Solo queda la consulta de autenticación.
+        with self.assertNumQueries(1):
+            retry = self.book()
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Realize.objects.filter(travel=self.travel).count(), 1)
+
+    def test_retry_replays_response_headers(self):
+        """Los encabezados de la vista, como Location, también se repiten."""
+        with patch('realize.views.RealizeCreateView.get_success_headers', return_value={'Location': '/api/realize/1/'}):
+            first = self.book()
+        retry = self.book()
+        self.assertEqual(first['Location'], '/api/realize/1/')
+        self.assertEqual(retry['Location'], '/api/realize/1/')
+
+    def test_lost_claim_race_is_a_conflict(self):
+        """Si la entrada expira y otra petición la reserva primero, se responde 409 sin ejecutar la vista."""
+        with patch('config.idempotency.cache') as idempotency_cache:
+            idempotency_cache.add.return_value = False
+            idempotency_cache.get.return_value = None
+            response = self.book()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(idempotency_cache.add.call_count, 2)
+        self.assertFalse(Realize.objects.filter(travel=self.travel).exists())
+
+    def test_reused_key_with_other_payload_is_rejected(self):
+        self.book()
+        other = Travel.objects.create(
+            driver=self.driver, vehicle=self.vehicle, route_id=self.travel.route_id,
+            time=self.travel.time, travel_state='scheduled', price=5000
+        )
+        response = self.book(travel_id=other.id)
+        self.assertEqual(response.status_code, 422)
+
+    def test_keys_are_scoped_per_user(self):
+        self.book()
+        self.authenticate(self.create_user("other@test.com"))
+        response = self.book()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Realize.objects.filter(travel=self.travel).count(), 2)
+
+    def test_without_key_behaves_as_before(self):
+        self.client.post('/api/realize/create/', {'id_travel': self.travel.id}, format='json')
+        response = self.client.post('/api/realize/create/', {'id_travel': self.travel.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class WaitlistTest(RealizeTestMixin, APITestCase):
+    """
+    Casos de prueba para la lista de espera y la promoción automática.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.seated = self.reserve("a@test.com", Realize.STATUS_CONFIRMED)
+        self.reserve("b@test.com", Realize.STATUS_CONFIRMED)
+        self.first = self.create_user("first@test.com")
+        self.second = self.create_user("second@test.com")
+
+    def authenticate(self, user):
+        token = jwt.encode(
+            {'user_id': user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def book(self, user):
+        self.authenticate(user)
+        return self.client.post('/api/realize/create/', {'id_travel': self.travel.id}, format='json')
+
+    def test_fifo_positions(self):
+        """Las posiciones siguen el orden de llegada y reintentar no cambia la posición."""
+        self.assertEqual(self.book(self.first).data['waitlist_position'], 1)
+        self.assertEqual(self.book(self.second).data['waitlist_position'], 2)
+        self.assertEqual(self.book(self.first).data['waitlist_position'], 1)
+        self.assertEqual(WaitlistEntry.objects.filter(travel=self.travel).count(), 2)
+
+        response = self.client.get(f'/api/realize/waitlist/{self.travel.id}/')
+        self.assertEqual(response.data['position'], 1)
+
+    def test_cancellation_promotes_head_and_notifies(self):
+        """Al cancelar una reserva confirmada, el primero en espera obtiene una reserva y se le notifica."""
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+        from realize.notifications import user_group_name
+
+        self.book(self.first)
+        self.book(self.second)
+        layer = get_channel_layer()
+        first_channel = async_to_sync(layer.new_channel)()
+        second_channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(user_group_name(self.first.uid), first_channel)
+        async_to_sync(layer.group_add)(user_group_name(self.second.uid), second_channel)
+
+        self.authenticate(self.seated.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'/api/realize/cancel/{self.seated.id}/', {'status': 'cancelled'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        promoted = Realize.objects.get(user=self.first, travel=self.travel)
+        self.assertEqual(promoted.status, Realize.STATUS_PENDING)
+        self.assertTrue(promoted.seat_held)
+        self.assertEqual(list(WaitlistEntry.objects.values_list('user_id', flat=True)), [self.second.uid])
+
+        event = async_to_sync(layer.receive)(first_channel)
+        self.assertEqual(event['type'], 'waitlist_promoted')
+        self.assertEqual(event['realize_id'], promoted.id)
+        event = async_to_sync(layer.receive)(second_channel)
+        self.assertEqual((event['type'], event['position']), ('waitlist_position', 1))
+
+    def test_leave_waitlist(self):
+        """El usuario puede salir de la lista de espera."""
+        self.book(self.first)
+        self.assertEqual(self.client.delete(f'/api/realize/waitlist/{self.travel.id}/').status_code, 204)
+        self.assertEqual(self.client.get(f'/api/realize/waitlist/{self.travel.id}/').status_code, 404)
+
+    def cancel(self, reservation):
+        self.authenticate(reservation.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(f'/api/realize/cancel/{reservation.id}/', {'status': 'cancelled'}, format='json')
+
+    def test_promoted_seat_cannot_be_taken(self):
+        """El cupo apartado no lo toma una reserva nueva ni la confirmación de otra pendiente."""
+        self.book(self.first)
+        self.cancel(self.seated)
+        promoted = Realize.objects.get(user=self.first, travel=self.travel)
+
+        response = self.book(self.second)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['waitlist_position'], 1)
+
+        other = self.reserve("other@test.com")
+        self.assertEqual(confirm_reservation(other.id).outcome, 'full')
+        self.assertEqual(confirm_reservation(promoted.id).outcome, 'confirmed')
+
+    def test_cancelling_a_promoted_reservation_promotes_the_next(self):
+        """Cancelar una reserva pendiente que tenía el cupo apartado libera el cupo para el siguiente."""
+        self.book(self.first)
+        self.book(self.second)
+        self.cancel(self.seated)
+        promoted = Realize.objects.get(user=self.first, travel=self.travel)
+
+        self.assertEqual(self.cancel(promoted).status_code, 200)
+        self.assertTrue(Realize.objects.get(user=self.second, travel=self.travel).seat_held)
+        self.assertFalse(WaitlistEntry.objects.filter(travel=self.travel).exists())
+
+    def test_pending_without_held_seat_does_not_promote(self):
+        """Cancelar una reserva pendiente común no libera cupos ni promueve a nadie."""
+        pending = self.reserve("pending@test.com")
+        self.book(self.first)
+        self.cancel(pending)
+        self.assertEqual(list(WaitlistEntry.objects.values_list('user_id', flat=True)), [self.first.uid])
@@ -0,0 +1,42 @@
+# server/realize/tokens.py
+
+"""
+Tokens firmados para los códigos QR de las reservas.
+
+El QR contiene un token con el ID de la reserva y el ID del viaje, firmado con
+HMAC (`django.core.signing`) usando la SECRET_KEY del proyecto. Así el servidor
+puede comprobar que el código es auténtico sin consultar la base de datos, y
+nadie puede confirmar reservas ajenas adivinando IDs.
+"""
+
+from django.core import signing
+
+# "Sal" propia de los tokens QR, para que una firma de otro uso no sea válida aquí.
+QR_TOKEN_SALT = 'realize.qr'
+
+
+class InvalidQRToken(Exception):
+    """El token no tiene el formato esperado o su firma no es válida."""
+
+
+def make_qr_token(realize_id, travel_id):
+    """Genera el token firmado para una reserva: '<realize_id>.<travel_id>:<firma>'."""
+    return signing.Signer(salt=QR_TOKEN_SALT).sign(f"{realize_id}.{travel_id}")
+
+
+def qr_token_for(realize):
+    """Atajo para generar el token de una instancia de `Realize`."""
+    return make_qr_token(realize.id, realize.travel_id)
+
+
+def read_qr_token(token):
+    """
+    Verifica la firma del token y devuelve la tupla (realize_id, travel_id).
+    Lanza `InvalidQRToken` si el token fue alterado o no es válido.
+    """
+    try:
+        value = signing.Signer(salt=QR_TOKEN_SALT).unsign(token)
+        realize_id, travel_id = value.split('.')
+        return int(realize_id), int(travel_id)
+    except (signing.BadSignature, ValueError, TypeError):
+        raise InvalidQRToken("El código QR no es válido.")
@@ -1,7 +1,10 @@
 # server/realize/urls.py
 
 from django.urls import path
-from .views import UserRealizeListView, RealizeCreateView, RealizeCancelView, RealizeConfirmView
+from .views import (
+    UserRealizeListView, RealizeCreateView, RealizeCancelView, RealizeConfirmView, RealizeConfirmByTokenView,
+    RealizeBulkConfirmView, WaitlistPositionView
+)
 
 urlpatterns = [
     # Endpoint para que un usuario cree una nueva reserva.
@@ -13,6 +16,15 @@ urlpatterns = [
     # Endpoint para que un usuario cancele una de sus reservas.
     path('cancel/<int:pk>/', RealizeCancelView.as_view(), name='realize-cancel'),
 
-    # Endpoint para que un usuario confirme una de sus reservas.
+    # Endpoint para que el conductor confirme por ID una reserva de su viaje.
     path('confirm/<int:realize_id>/', RealizeConfirmView.as_view(), name='realize-confirm'),
+
+    # Endpoint para confirmar una reserva con el token firmado de su código QR.
+    path('confirm/token/<str:token>/', RealizeConfirmByTokenView.as_view(), name='realize-confirm-token'),
+
+    # Endpoint para que un conductor confirme varias reservas de su viaje en un solo lote.
+    path('confirm/bulk/', RealizeBulkConfirmView.as_view(), name='realize-confirm-bulk'),
+
+    # Endpoint para consultar o abandonar la lista de espera de un viaje.
+    path('waitlist/<int:travel_id>/', WaitlistPositionView.as_view(), name='realize-waitlist'),
 ]
\ No newline at end of file
@@ -5,18 +5,33 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import NotFound, ValidationError
 from drf_yasg.utils import swagger_auto_schema
-from .models import Realize
+from .models import Realize, WaitlistEntry
+from .confirmation import (
+    OUTCOME_CONFIRMED, OUTCOME_FULL, OUTCOME_NOT_FOUND, confirm_reservation,
+    confirm_reservations_bulk, lock_driver_travel
+)
+from .tokens import InvalidQRToken, read_qr_token
+from .booking import has_free_seats
+from .waitlist import enqueue, promote_next, waitlist_position
 from .serializers import RealizeSerializer, RealizeCreateSerializer
+from .projections import REALIZE_PROJECTION
 from users.permissions import IsAuthenticatedCustom
+from config.etag import ConditionalGetMixin
+from config.idempotency import IdempotentCreateMixin
+from config.projection import ProjectionListMixin
+from config.sparse_fields import SparseFieldsViewMixin
 from users.models import Users
 from rest_framework.permissions import AllowAny
+from django.conf import settings
+from django.db import IntegrityError, transaction
 
-class UserRealizeListView(generics.ListAPIView):
+class UserRealizeListView(ConditionalGetMixin, ProjectionListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     """
     Vista para listar TODAS y ÚNICAMENTE las reservas del usuario autenticado.
     """
     serializer_class = RealizeSerializer
     permission_classes = [IsAuthenticatedCustom]
+    projection = REALIZE_PROJECTION
 
     @swagger_auto_schema(operation_summary="Endpoint para listar mis reservas")
     def get(self, request, *args, **kwargs):
@@ -36,7 +51,7 @@ class UserRealizeListView(generics.ListAPIView):
         return Realize.objects.filter(user=user).select_related('user', 'travel')
 
 
-class RealizeCreateView(generics.CreateAPIView):
+class RealizeCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """Vista para crear una nueva reserva."""
     serializer_class = RealizeCreateSerializer
     permission_classes = [IsAuthenticatedCustom]
@@ -45,15 +60,34 @@ class RealizeCreateView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
 
+    def create(self, request, *args, **kwargs):
+        """
+        Crea la reserva si el viaje tiene cupos. Si está lleno, el usuario entra
+        en la lista de espera y se responde 202 con su posición, para que el
+        cliente espere la notificación en lugar de reintentar.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        context = serializer.booking_context
+        if not has_free_seats(context):
+            entry, position = enqueue(request.user, context['id'])
+            return Response({
+                "detail": "No hay asientos disponibles para este viaje. Quedaste en la lista de espera.",
+                "travel_id": context['id'],
+                "waitlist_entry_id": entry.id,
+                "waitlist_position": position,
+            }, status=status.HTTP_202_ACCEPTED)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
     def perform_create(self, serializer):
-        """Asigna el usuario autenticado y valida la disponibilidad de asientos."""
-        travel_instance = serializer.validated_data.get('travel')
-        if travel_instance:
-            capacity = travel_instance.vehicle.capacity
-            confirmed_reservations = Realize.objects.filter(travel=travel_instance, status=Realize.STATUS_CONFIRMED).count()
-            if (capacity - confirmed_reservations) <= 0:
-                raise ValidationError("No hay asientos disponibles para este viaje.")
-        serializer.save(user=self.request.user)
+        """Asigna el usuario autenticado y guarda la reserva."""
+        try:
+            serializer.save(user=self.request.user)
+        except IntegrityError:
+            # Otra petición simultánea creó la misma reserva (unique_together).
+            raise ValidationError("Ya tienes una reserva para este viaje.")
 
 class RealizeCancelView(generics.UpdateAPIView):
     """Vista para cancelar una reserva."""
@@ -70,42 +104,149 @@ class RealizeCancelView(generics.UpdateAPIView):
             return Response({"detail": "Solo se permite cambiar el estado a 'cancelled'."}, status=status.HTTP_400_BAD_REQUEST)
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        # La cancelación y la promoción del primero de la lista de espera
+        # ocurren en la misma transacción.
+        with transaction.atomic():
+            serializer.save()
+            promote_next(instance.travel_id)
         return Response(serializer.data)
 
+class WaitlistPositionView(APIView):
+    """
+    Vista para consultar o abandonar el lugar del usuario en la lista de espera
+    de un viaje.
+
+    GET    /api/realize/waitlist/<travel_id>/ -> {"travel_id", "position"}
+    DELETE /api/realize/waitlist/<travel_id>/ -> 204
+    """
+    permission_classes = [IsAuthenticatedCustom]
+
+    def _get_entry(self, request, travel_id):
+        try:
+            return WaitlistEntry.objects.get(user=request.user, travel_id=travel_id)
+        except WaitlistEntry.DoesNotExist:
+            raise NotFound("No estás en la lista de espera de este viaje.")
+
+    @swagger_auto_schema(operation_summary="Endpoint para consultar mi posición en la lista de espera")
+    def get(self, request, travel_id, *args, **kwargs):
+        entry = self._get_entry(request, travel_id)
+        return Response({"travel_id": travel_id, "position": waitlist_position(entry)}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(operation_summary="Endpoint para salir de la lista de espera")
+    def delete(self, request, travel_id, *args, **kwargs):
+        self._get_entry(request, travel_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def confirmation_response(result):
+    """Convierte el resultado de `confirm_reservation` en la respuesta HTTP correspondiente."""
+    if result.outcome == OUTCOME_CONFIRMED:
+        return Response(
+            {"success": f"La reserva para el viaje {result.travel_id} ha sido confirmada."},
+            status=status.HTTP_200_OK
+        )
+    if result.outcome == OUTCOME_NOT_FOUND:
+        return Response({"error": "La reserva especificada no existe."}, status=status.HTTP_404_NOT_FOUND)
+    if result.outcome == OUTCOME_FULL:
+        return Response({"error": "No hay asientos disponibles para este viaje."}, status=status.HTTP_409_CONFLICT)
+    return Response(
+        {"error": f"No se puede confirmar esta reserva. Estado actual: {result.status}."},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
 class RealizeConfirmView(APIView):
     """
-    Vista PÚBLICA para confirmar una reserva pendiente.
-    Esta acción sería activada al escanear un código QR que contiene la URL
-    de este endpoint. No requiere autenticación.
+    Vista para que el conductor confirme por ID una reserva pendiente de su viaje.
+
+    Antes era pública y la activaba el código QR; como cualquiera podía
+    confirmar reservas recorriendo los IDs, ahora solo la puede usar el
+    conductor del viaje. Los QR usan `RealizeConfirmByTokenView`.
     """
-    permission_classes = [AllowAny]
+    permission_classes = [IsAuthenticatedCustom]
 
     @swagger_auto_schema(
-        operation_summary="Endpoint (Público) para confirmar una reserva por ID",
-        operation_description="Recibe el ID de una reserva y cambia su estado de 'pending' a 'confirmed'. No requiere token."
+        operation_summary="Endpoint para confirmar por ID una reserva de mi viaje (conductor)",
+        operation_description="Recibe el ID de una reserva del viaje del conductor y cambia su estado de 'pending' a 'confirmed'."
     )
-    # CAMBIO 2: Se cambia el método de POST a GET.
     def get(self, request, realize_id, *args, **kwargs):
         """
         Maneja la petición GET para confirmar una reserva específica.
         - `realize_id`: Es el ID de la reserva a confirmar (viene de la URL).
         """
-        # CAMBIO 3: Se elimina toda la lógica de verificación de usuario.
-        
-        # 1. Obtener la reserva que se quiere confirmar.
+        # Bloqueo del viaje y UPDATE condicional (ver `realize.confirmation`).
+        return confirmation_response(confirm_reservation(realize_id, driver_id=request.user.uid))
+
+
+class RealizeConfirmByTokenView(APIView):
+    """
+    Vista PÚBLICA para confirmar una reserva escaneando su código QR.
+
+    El QR contiene un token firmado con el ID de la reserva y el del viaje
+    (ver `realize.tokens`). La firma se verifica sin consultar la base de datos
+    y la confirmación bloquea el viaje antes del UPDATE condicional, así que es
+    segura ante escaneos simultáneos y respeta la capacidad del vehículo.
+    """
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_summary="Endpoint (Público) para confirmar una reserva con el token del QR",
+        operation_description="Verifica el token firmado y cambia la reserva de 'pending' a 'confirmed'."
+    )
+    def get(self, request, token, *args, **kwargs):
         try:
-            reservation = Realize.objects.select_related('travel').get(id=realize_id)
-        except Realize.DoesNotExist:
-            return Response({"error": "La reserva especificada no existe."}, status=status.HTTP_404_NOT_FOUND)
-        
-        # 2. Validar que la reserva esté en estado 'pending'.
-        if reservation.status != Realize.STATUS_PENDING:
-            return Response({"error": f"No se puede confirmar esta reserva. Estado actual: {reservation.status}."}, status=status.HTTP_400_BAD_REQUEST)
-            
-        # 3. Cambiar el estado y guardar.
-        reservation.status = Realize.STATUS_CONFIRMED
-        reservation.save(update_fields=['status'])
-        
-        # 4. Devolver una respuesta de éxito.
-        return Response({"success": f"La reserva para el viaje {reservation.travel.id} ha sido confirmada."}, status=status.HTTP_200_OK)
\ No newline at end of file
+            realize_id, travel_id = read_qr_token(token)
+        except InvalidQRToken as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return confirmation_response(confirm_reservation(realize_id, travel_id))
+
+
+class RealizeBulkConfirmView(APIView):
+    """
+    Vista para que un conductor confirme de una vez varias reservas de su viaje
+    (por ejemplo, al abordar en el campus o al sincronizar los QR escaneados sin
+    conexión).
+
+    POST /api/realize/confirm/bulk/
+    Body: {"travel_id": 10, "items": [15, "15.10:firma...", ...]}
+
+    Cada elemento puede ser el ID de la reserva o el token de su QR. Todo el
+    lote se procesa en una transacción: el viaje se bloquea, las reservas se
+    validan con una consulta y se confirman con un único UPDATE mientras haya
+    cupos. Reenviar el mismo lote es seguro: las reservas ya confirmadas se
+    informan como `already_confirmed`.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+
+    @swagger_auto_schema(operation_summary="Endpoint para confirmar varias reservas de un viaje (conductor)")
+    def post(self, request, *args, **kwargs):
+        travel_id = request.data.get('travel_id')
+        items = request.data.get('items')
+        if not isinstance(travel_id, int) or isinstance(travel_id, bool):
+            return Response({"error": "El campo 'travel_id' es requerido y debe ser un entero."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(items, list) or not items:
+            return Response({"error": "El campo 'items' debe ser una lista no vacía."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.REALIZE_BULK_CONFIRM_MAX:
+            return Response(
+                {"error": f"Se permiten como máximo {settings.REALIZE_BULK_CONFIRM_MAX} reservas por lote."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            travel = lock_driver_travel(travel_id, request.user.uid)
+            if travel is None:
+                return Response(
+                    {"error": "El viaje no existe o no pertenece a este conductor."},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            results, remaining = confirm_reservations_bulk(travel, items)
+
+        return Response({
+            "travel_id": travel_id,
+            "confirmed": len({result.realize_id for result in results if result.outcome == OUTCOME_CONFIRMED}),
+            "remaining_seats": remaining,
+            "results": [
+                {"item": result.item, "realize_id": result.realize_id, "outcome": result.outcome}
+                for result in results
+            ],
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,87 @@
+# server/realize/waitlist.py
+
+"""
+Lista de espera FIFO para viajes llenos.
+
+Cuando un viaje no tiene cupos, la petición de reserva se encola en lugar de
+rechazarse. Cada cancelación que libera un cupo promueve la primera entrada de
+la cola: se toma con `SELECT ... FOR UPDATE SKIP LOCKED`, de modo que dos
+cancelaciones simultáneas nunca promueven a la misma persona ni se bloquean
+entre sí, y se convierte en una reserva pendiente con el cupo apartado
+(`Realize.seat_taken`) dentro de la misma transacción. Ese cupo cuenta como
+ocupado, así que ni una reserva nueva ni la confirmación de otra pendiente
+pueden quitárselo: el orden de la cola se respeta. El usuario promovido y los
+que siguen esperando reciben su nueva situación por WebSocket.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from travel.models import Travel
+
+from .booking import has_free_seats, load_booking_context
+from .models import Realize, WaitlistEntry
+from .notifications import notify_user
+
+
+def waitlist_position(entry):
+    """Posición (empezando en 1) de la entrada en la cola de su viaje."""
+    return WaitlistEntry.objects.filter(travel_id=entry.travel_id, id__lte=entry.id).count()
+
+
+def enqueue(user, travel_id):
+    """
+    Añade al usuario a la lista de espera del viaje (o devuelve su entrada si ya
+    estaba en ella). Devuelve la tupla (entrada, posición).
+    """
+    try:
+        with transaction.atomic():
+            entry = WaitlistEntry.objects.create(user=user, travel_id=travel_id)
+    except IntegrityError:
+        entry = WaitlistEntry.objects.get(user=user, travel_id=travel_id)
+    return entry, waitlist_position(entry)
+
+
+def promote_next(travel_id):
+    """
+    Si el viaje tiene cupos, convierte la primera entrada de su lista de espera
+    en una reserva pendiente con el cupo apartado. Devuelve la reserva o None.
+    """
+    with transaction.atomic():
+        # El mismo bloqueo que las confirmaciones (ver `realize.confirmation`):
+        # el cupo libre que se cuenta abajo no puede confirmarse mientras tanto.
+        if Travel.objects.select_for_update().filter(id=travel_id).values_list('id', flat=True).first() is None:
+            return None
+        entry = WaitlistEntry.objects.select_for_update(skip_locked=True).filter(
+            travel_id=travel_id
+        ).select_related('user').order_by('id').first()
+        if entry is None:
+            return None
+
+        context = load_booking_context(travel_id, entry.user)
+        if context is None or context['travel_state'] != 'scheduled' or not has_free_seats(context):
+            return None
+
+        # Si el usuario tenía una reserva previa (por ejemplo, cancelada), se reutiliza.
+        reservation, _ = Realize.objects.update_or_create(
+            user=entry.user,
+            travel_id=travel_id,
+            defaults={'status': Realize.STATUS_PENDING, 'seat_held': True},
+        )
+        entry.delete()
+
+        notify_user(entry.user_id, 'waitlist_promoted', {
+            'travel_id': travel_id,
+            'realize_id': reservation.id,
+        })
+        publish_positions(travel_id)
+        return reservation
+
+
+def publish_positions(travel_id):
+    """Envía su nueva posición a los usuarios que siguen en la cola del viaje."""
+    waiting = WaitlistEntry.objects.filter(travel_id=travel_id).order_by('id').values_list(
+        'user_id', flat=True
+    )[:settings.WAITLIST_NOTIFY_LIMIT]
+    for position, uid in enumerate(waiting, start=1):
+        notify_user(uid, 'waitlist_position', {'travel_id': travel_id, 'position': position})
@@ -12,4 +12,8 @@ class TrouteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     
     # El nombre de la aplicación.
-    name = 'route'
\ No newline at end of file
+    name = 'route'
+
+    def ready(self):
+        """Registra las señales de la app (invalidación del índice de proximidad)."""
+        import route.signals
@@ -0,0 +1,131 @@
+# server/route/canonical.py
+
+"""
+Agrupación ("interning") de rutas en rutas canónicas compartidas.
+
+Muchos conductores de una misma institución crean rutas casi idénticas (por
+ejemplo "Campus → Terminal"). En lugar de guardar, enriquecer y dibujar cada
+una por separado, las rutas cuyos extremos caen dentro de la tolerancia
+`ROUTE_INTERNING_TOLERANCE_M` se asignan a una misma `CanonicalRoute`.
+"""
+
+import logging
+import zlib
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import Users
+from .geo import SpatialHashIndex, cell_key, cell_size_deg, neighbor_cell_keys
+from .models import CanonicalRoute, Route
+
+logger = logging.getLogger(__name__)
+
+# Espacio de claves de los advisory locks de PostgreSQL usados al agrupar rutas.
+INTERN_LOCK_NAMESPACE = zlib.crc32(b'route.intern_route') & 0x7FFFFFFF
+
+
+def route_endpoints(route):
+    """Devuelve los puntos de inicio y fin de una ruta como tuplas (lat, lng)."""
+    start = (float(route.startPointCoords[0]), float(route.startPointCoords[1]))
+    end = (float(route.endPointCoords[0]), float(route.endPointCoords[1]))
+    return start, end
+
+
+def build_canonical(route, institution_id, start, end, size_deg):
+    """Crea (sin guardar) una ruta canónica a partir de la primera ruta de un grupo."""
+    return CanonicalRoute(
+        institution_id=institution_id,
+        startLocation=route.startLocation,
+        destination=route.destination,
+        start_lat=start[0],
+        start_lng=start[1],
+        end_lat=end[0],
+        end_lng=end[1],
+        start_cell=cell_key(*start, size_deg),
+        end_cell=cell_key(*end, size_deg),
+    )
+
+
+def intern_route(route):
+    """
+    Asigna la ruta a la ruta canónica más cercana de su institución, o crea
+    una nueva si ninguna está dentro de la tolerancia. Devuelve la canónica.
+    """
+    tolerance = settings.ROUTE_INTERNING_TOLERANCE_M
+    size_deg = cell_size_deg(tolerance)
+    start, end = route_endpoints(route)
+    institution_id = Users.objects.filter(driver=route.driver_id).values_list('institution_id', flat=True).first()
+
+    with transaction.atomic():
+        lock_institution_routes(institution_id)
+        candidates = CanonicalRoute.objects.filter(
+            institution_id=institution_id,
+            start_cell__in=neighbor_cell_keys(*start, size_deg),
+            end_cell__in=neighbor_cell_keys(*end, size_deg),
+        )
+        index = SpatialHashIndex(tolerance)
+        for candidate in candidates:
+            index.add(candidate, (candidate.start_lat, candidate.start_lng), (candidate.end_lat, candidate.end_lng))
+
+        canonical = index.find(start, end)
+        if canonical is None:
+            canonical = build_canonical(route, institution_id, start, end, size_deg)
+            canonical.save()
+        Route.objects.filter(pk=route.pk).update(canonical=canonical, updated_at=timezone.now())
+        route.canonical = canonical
+        if not canonical.encoded_polyline:
+            # El enriquecimiento se hace al escribir la ruta, no al consultarla.
+            transaction.on_commit(lambda: enrich_canonical_route(canonical))
+    return canonical
+
+
+def lock_institution_routes(institution_id):
+    """
+    Serializa la agrupación de rutas de una institución hasta el fin de la
+    transacción. Un `select_for_update` sobre las candidatas no basta: si
+    todavía no hay ninguna canónica cercana no bloquea nada, y dos creaciones
+    simultáneas crearían canónicas duplicadas. En PostgreSQL se toma un
+    advisory lock por institución; otros motores serializan las escrituras.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s, %s)', [INTERN_LOCK_NAMESPACE, institution_id or 0]
+            )
+
+
+def enrich_canonical_route(canonical):
+    """
+    Calcula la polilínea, distancia y duración de una ruta canónica con el
+    motor offline (si está configurado) y las guarda. Como el resultado se
+    comparte, cada grupo de rutas se enriquece una sola vez. Se llama al crear
+    la ruta (ver `intern_route`) o desde `dedupe_routes --enrich`, nunca al
+    consultarla.
+    """
+    if canonical.encoded_polyline:
+        return canonical
+
+    # Importación local: el motor offline vive en la app 'driver'.
+    from driver.offline_routing import NoRouteError, build_directions_response, get_offline_graph
+
+    graph = get_offline_graph()
+    if graph is None:
+        return canonical
+    try:
+        directions = build_directions_response(
+            graph,
+            (canonical.start_lat, canonical.start_lng),
+            (canonical.end_lat, canonical.end_lng),
+        )
+    except NoRouteError as e:
+        logger.warning(f"No se pudo enriquecer la ruta canónica {canonical.id}: {e}")
+        return canonical
+
+    route_data = directions['routes'][0]
+    canonical.encoded_polyline = route_data['overview_polyline']['points']
+    canonical.distance_m = route_data['legs'][0]['distance']['value']
+    canonical.duration_s = route_data['legs'][0]['duration']['value']
+    canonical.save(update_fields=['encoded_polyline', 'distance_m', 'duration_s'])
+    return canonical
@@ -0,0 +1,226 @@
+# server/route/geo.py
+
+"""
+Utilidades geográficas compartidas por las apps que trabajan con coordenadas.
+
+Incluye la distancia geodésica y un "spatial hash" simple: el plano se divide
+en celdas de tamaño fijo (en grados) y cada punto se identifica por la celda
+que lo contiene, de modo que los puntos cercanos se buscan solo en las celdas
+vecinas en lugar de compararlos contra todos. `GeohashGridIndex` aplica la
+misma idea con la malla de los geohashes y distancias vectorizadas (NumPy).
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Radio medio de la Tierra en metros.
+EARTH_RADIUS_M = 6371008.8
+
+# Metros que mide un grado de latitud.
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Distancia geodésica (en metros) entre dos puntos [lat, lng]."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def cell_size_deg(tolerance_m):
+    """Tamaño de celda (en grados) para una tolerancia dada en metros."""
+    return tolerance_m / METERS_PER_DEGREE
+
+
+def cell_key(lat, lng, size_deg):
+    """Clave de la celda que contiene el punto, con la forma 'fila:columna'."""
+    return f"{math.floor(lat / size_deg)}:{math.floor(lng / size_deg)}"
+
+
+def neighbor_cell_keys(lat, lng, size_deg):
+    """
+    Claves de la celda del punto y de sus vecinas. En longitud se amplía el
+    rango según la latitud, porque un grado de longitud mide menos metros
+    lejos del ecuador.
+    """
+    row = math.floor(lat / size_deg)
+    col = math.floor(lng / size_deg)
+    lng_span = math.ceil(1 / max(math.cos(math.radians(lat)), 0.01))
+    return [
+        f"{r}:{c}"
+        for r in range(row - 1, row + 2)
+        for c in range(col - lng_span, col + lng_span + 1)
+    ]
+
+
+class SpatialHashIndex:
+    """
+    Índice en memoria de pares (origen, destino) agrupados por celdas.
+
+    Cada entrada se guarda bajo la combinación de la celda de origen y la de
+    destino; `find` devuelve la entrada más cercana cuyos dos extremos estén
+    dentro de la tolerancia.
+    """
+
+    def __init__(self, tolerance_m):
+        self.tolerance_m = tolerance_m
+        self.size_deg = cell_size_deg(tolerance_m)
+        self._buckets = {}
+
+    def add(self, item, start, end):
+        key = (cell_key(*start, self.size_deg), cell_key(*end, self.size_deg))
+        self._buckets.setdefault(key, []).append((item, start, end))
+
+    def find(self, start, end):
+        best, best_score = None, math.inf
+        end_keys = neighbor_cell_keys(*end, self.size_deg)
+        for start_key in neighbor_cell_keys(*start, self.size_deg):
+            for end_key in end_keys:
+                for item, item_start, item_end in self._buckets.get((start_key, end_key), ()):
+                    start_gap = haversine_m(*start, *item_start)
+                    end_gap = haversine_m(*end, *item_end)
+                    if start_gap <= self.tolerance_m and end_gap <= self.tolerance_m and start_gap + end_gap < best_score:
+                        best, best_score = item, start_gap + end_gap
+        return best
+
+
+# --- Malla geohash ---
+
+
+def geohash_cell_size_deg(precision):
+    """
+    Tamaño (alto, ancho) en grados de una celda geohash de la precisión dada.
+    Con precisión 6 cada celda mide unos 1.2 km x 0.6 km.
+    """
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def bounding_box(lat, lng, radius_m):
+    """Caja (lat_min, lat_max, lng_min, lng_max) que contiene el círculo de radio dado."""
+    dlat = radius_m / METERS_PER_DEGREE
+    dlng = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def haversine_many_m(lat, lng, lats, lngs):
+    """
+    Versión vectorizada de `haversine_m`: distancia (en metros) desde un punto
+    a cada punto de los arreglos `lats`/`lngs`. Si el primer punto también se
+    pasa como arreglos, se calcula la distancia elemento a elemento.
+    """
+    phi1 = np.radians(np.asarray(lat, dtype=float))
+    phi2 = np.radians(np.asarray(lats, dtype=float))
+    dphi = phi2 - phi1
+    dlmb = np.radians(np.asarray(lngs, dtype=float) - np.asarray(lng, dtype=float))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# Precisión de la malla geohash del índice en memoria (celdas de ~1.2 km x 0.6 km).
+GEOHASH_PRECISION = 6
+
+# Resultado de una búsqueda: id de la ruta y distancias (m) a los puntos pedidos.
+ProximityMatch = namedtuple('ProximityMatch', ['route_id', 'start_distance_m', 'end_distance_m'])
+
+
+class GeohashGridIndex:
+    """
+    Índice en memoria de rutas agrupadas por la celda geohash de su origen.
+
+    Las celdas se representan como enteros (fila * columnas + columna) en la
+    misma malla que los geohashes de la precisión dada, lo que permite
+    construir el índice y calcular la cobertura de una consulta con NumPy.
+    """
+
+    def __init__(self, ids, start_lats, start_lngs, end_lats, end_lngs, precision=GEOHASH_PRECISION):
+        self.precision = precision
+        self.cell_lat, self.cell_lng = geohash_cell_size_deg(precision)
+        self.columns = int(round(360.0 / self.cell_lng))
+
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.start_lats = np.asarray(start_lats, dtype=float)
+        self.start_lngs = np.asarray(start_lngs, dtype=float)
+        self.end_lats = np.asarray(end_lats, dtype=float)
+        self.end_lngs = np.asarray(end_lngs, dtype=float)
+
+        keys = self._cell_keys(self.start_lats, self.start_lngs)
+        # Las posiciones se ordenan por celda; cada celda ocupa un tramo contiguo.
+        self._order = np.argsort(keys, kind='stable')
+        self._keys, self._offsets = np.unique(keys[self._order], return_index=True)
+        self._offsets = np.append(self._offsets, len(self._order))
+
+    @classmethod
+    def from_rows(cls, rows, precision=GEOHASH_PRECISION):
+        """Construye el índice a partir de tuplas (id, start_lat, start_lng, end_lat, end_lng)."""
+        rows = list(rows)
+        if not rows:
+            return cls([], [], [], [], [], precision)
+        ids, start_lats, start_lngs, end_lats, end_lngs = zip(*rows)
+        return cls(ids, start_lats, start_lngs, end_lats, end_lngs, precision)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell_keys(self, lats, lngs):
+        rows = np.floor((np.asarray(lats) + 90.0) / self.cell_lat).astype(np.int64)
+        cols = np.floor((np.asarray(lngs) + 180.0) / self.cell_lng).astype(np.int64)
+        return rows * self.columns + cols
+
+    def _candidates(self, lat, lng, radius_m):
+        """Posiciones de las rutas cuyo origen cae en las celdas que cubren el círculo."""
+        lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, radius_m)
+        row_lo = int(np.floor((lat_min + 90.0) / self.cell_lat))
+        row_hi = int(np.floor((lat_max + 90.0) / self.cell_lat))
+        col_lo = int(np.floor((lng_min + 180.0) / self.cell_lng))
+        col_hi = int(np.floor((lng_max + 180.0) / self.cell_lng))
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        cols = np.arange(col_lo, col_hi + 1, dtype=np.int64)
+        wanted = (rows[:, None] * self.columns + cols[None, :]).ravel()
+
+        slots = np.searchsorted(self._keys, wanted)
+        found = slots < len(self._keys)
+        slots, wanted = slots[found], wanted[found]
+        slots = slots[self._keys[slots] == wanted]
+        if not len(slots):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            self._order[self._offsets[slot]:self._offsets[slot + 1]] for slot in slots
+        ])
+
+    def query(self, start, radius_m, end=None, end_radius_m=None, limit=None):
+        """
+        Rutas cuyo origen está a menos de `radius_m` de `start` y, si se indica
+        `end`, cuyo destino está a menos de `end_radius_m` de `end`. Se ordenan
+        por la suma de ambas distancias.
+        """
+        if not len(self.ids):
+            return []
+        positions = self._candidates(start[0], start[1], radius_m)
+        if not len(positions):
+            return []
+
+        start_dist = haversine_many_m(start[0], start[1], self.start_lats[positions], self.start_lngs[positions])
+        mask = start_dist <= radius_m
+        if end is not None:
+            end_radius_m = radius_m if end_radius_m is None else end_radius_m
+            end_dist = haversine_many_m(end[0], end[1], self.end_lats[positions], self.end_lngs[positions])
+            mask &= end_dist <= end_radius_m
+        else:
+            end_dist = np.zeros_like(start_dist)
+
+        positions, start_dist, end_dist = positions[mask], start_dist[mask], end_dist[mask]
+        order = np.argsort(start_dist + end_dist, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return [
+            ProximityMatch(int(self.ids[p]), float(start_dist[i]), float(end_dist[i]) if end is not None else None)
+            for i, p in zip(order, positions[order])
+        ]
@@ -0,0 +1,91 @@
+# server/route/management/commands/dedupe_routes.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from route.canonical import build_canonical, enrich_canonical_route, route_endpoints
+from route.geo import SpatialHashIndex, cell_size_deg
+from route.models import CanonicalRoute, Route
+
+
+class Command(BaseCommand):
+    """
+    Define el comando `manage.py dedupe_routes`.
+    Agrupa las rutas existentes en rutas canónicas compartidas, de modo que los
+    datos anteriores a la introducción de `CanonicalRoute` queden deduplicados.
+    """
+    help = 'Agrupa las rutas existentes en rutas canónicas compartidas por institución.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Elimina todas las rutas canónicas y vuelve a agrupar todas las rutas.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Calcula los grupos sin guardar cambios en la base de datos.',
+        )
+        parser.add_argument(
+            '--enrich',
+            action='store_true',
+            help='Calcula la polilínea de las rutas canónicas que aún no la tienen.',
+        )
+
+    def handle(self, *args, **options):
+        tolerance = settings.ROUTE_INTERNING_TOLERANCE_M
+        size_deg = cell_size_deg(tolerance)
+        indexes = {}
+        created = merged = 0
+        now = timezone.now()
+
+        with transaction.atomic():
+            if options['rebuild']:
+                CanonicalRoute.objects.all().delete()
+                routes = Route.objects.all()
+            else:
+                routes = Route.objects.filter(canonical__isnull=True)
+                # Las canónicas existentes se cargan primero para reutilizarlas.
+                for canonical in CanonicalRoute.objects.all().iterator(chunk_size=2000):
+                    index = indexes.setdefault(canonical.institution_id, SpatialHashIndex(tolerance))
+                    index.add(canonical, (canonical.start_lat, canonical.start_lng), (canonical.end_lat, canonical.end_lng))
+
+            pending = []
+            routes = routes.select_related('driver__user').order_by('id')
+            for route in routes.iterator(chunk_size=2000):
+                institution_id = route.driver.user.institution_id
+                start, end = route_endpoints(route)
+                index = indexes.setdefault(institution_id, SpatialHashIndex(tolerance))
+                canonical = index.find(start, end)
+                if canonical is None:
+                    canonical = build_canonical(route, institution_id, start, end, size_deg)
+                    if not options['dry_run']:
+                        canonical.save()
+                    index.add(canonical, start, end)
+                    created += 1
+                else:
+                    merged += 1
+                route.canonical = canonical
+                route.updated_at = now
+                pending.append(route)
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+            else:
+                Route.objects.bulk_update(pending, ['canonical', 'updated_at'], batch_size=500)
+
+        prefix = '[simulación] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Rutas procesadas: {len(pending)}. '
+            f'Rutas canónicas creadas: {created}. Rutas agrupadas en canónicas existentes: {merged}.'
+        ))
+
+        if options['enrich'] and not options['dry_run']:
+            enriched = 0
+            for canonical in CanonicalRoute.objects.filter(Q(encoded_polyline__isnull=True) | Q(encoded_polyline='')).iterator():
+                enriched += bool(enrich_canonical_route(canonical).encoded_polyline)
+            self.stdout.write(self.style.SUCCESS(f'Rutas canónicas enriquecidas: {enriched}.'))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 11:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0003_alter_institution_email_alter_institution_phone'),
+        ('route', '0003_alter_route_driver'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalRoute',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('startLocation', models.CharField(max_length=255)),
+                ('destination', models.CharField(max_length=255)),
+                ('start_lat', models.FloatField()),
+                ('start_lng', models.FloatField()),
+                ('end_lat', models.FloatField()),
+                ('end_lng', models.FloatField()),
+                ('start_cell', models.CharField(max_length=40)),
+                ('end_cell', models.CharField(max_length=40)),
+                ('encoded_polyline', models.TextField(blank=True, null=True)),
+                ('distance_m', models.IntegerField(blank=True, null=True)),
+                ('duration_s', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='canonical_routes', to='institutions.institution')),
+            ],
+            options={
+                'db_table': 'canonical_route',
+            },
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='routes', to='route.canonicalroute'),
+        ),
+        migrations.AddIndex(
+            model_name='canonicalroute',
+            index=models.Index(fields=['institution', 'start_cell', 'end_cell'], name='canonical_route_cells_idx'),
+        ),
+    ]
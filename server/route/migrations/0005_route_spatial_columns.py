@@ -0,0 +1,76 @@
+# Generated by Django 5.2 on 2026-10-19 11:07
+
+from django.db import migrations, models
+
+
+def backfill_spatial_columns(apps, schema_editor):
+    """Copia las coordenadas de las rutas existentes a las nuevas columnas."""
+    Route = apps.get_model('route', 'Route')
+    batch = []
+    for route in Route.objects.only('id', 'startPointCoords', 'endPointCoords').iterator(chunk_size=2000):
+        if route.startPointCoords and len(route.startPointCoords) >= 2:
+            route.start_lat, route.start_lng = route.startPointCoords[0], route.startPointCoords[1]
+        if route.endPointCoords and len(route.endPointCoords) >= 2:
+            route.end_lat, route.end_lng = route.endPointCoords[0], route.endPointCoords[1]
+        batch.append(route)
+        if len(batch) >= 2000:
+            Route.objects.bulk_update(batch, ['start_lat', 'start_lng', 'end_lat', 'end_lng'])
+            batch = []
+    if batch:
+        Route.objects.bulk_update(batch, ['start_lat', 'start_lng', 'end_lat', 'end_lng'])
+
+
+def create_gist_index(apps, schema_editor):
+    """
+    Índice GiST sobre el punto de origen, usado por `route.proximity` para
+    filtrar por caja envolvente. Solo existe en PostgreSQL.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS route_start_point_gist ON route USING gist (point(start_lng, start_lat))'
+        )
+
+
+def drop_gist_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS route_start_point_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('route', '0004_canonical_route'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='end_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='end_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='start_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='start_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='route',
+            index=models.Index(fields=['start_lat', 'start_lng'], name='route_start_latlng_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='route',
+            index=models.Index(fields=['end_lat', 'end_lng'], name='route_end_latlng_idx'),
+        ),
+        migrations.RunPython(backfill_spatial_columns, migrations.RunPython.noop),
+        migrations.RunPython(create_gist_index, drop_gist_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('route', '0005_route_spatial_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='route',
+            index=models.Index(fields=['driver', 'updated_at', 'id'], name='route_driver_updated_idx'),
+        ),
+    ]
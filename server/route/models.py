@@ -4,6 +4,59 @@ from django.db import models
 from django.contrib.postgres.fields import ArrayField
 from driver.models import Driver
 
+class CanonicalRoute(models.Model):
+    """
+    Ruta canónica compartida por varias rutas casi idénticas de una institución.
+
+    Las rutas cuyos puntos de inicio y fin caen dentro de la tolerancia
+    `ROUTE_INTERNING_TOLERANCE_M` se agrupan en una sola ruta canónica, que
+    guarda una única polilínea y un único registro de enriquecimiento
+    (distancia y duración) para todas ellas.
+    """
+    id = models.AutoField(primary_key=True)
+
+    # Institución a la que pertenecen los conductores de las rutas agrupadas.
+    institution = models.ForeignKey(
+        'institutions.Institution',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='canonical_routes'
+    )
+
+    # Nombres legibles tomados de la primera ruta del grupo.
+    startLocation = models.CharField(max_length=255)
+    destination = models.CharField(max_length=255)
+
+    # Coordenadas representativas del grupo.
+    start_lat = models.FloatField()
+    start_lng = models.FloatField()
+    end_lat = models.FloatField()
+    end_lng = models.FloatField()
+
+    # Celdas del "spatial hash" (ver `route.geo`) del origen y del destino.
+    start_cell = models.CharField(max_length=40)
+    end_cell = models.CharField(max_length=40)
+
+    # Datos de enriquecimiento compartidos por todas las rutas del grupo.
+    encoded_polyline = models.TextField(null=True, blank=True)
+    distance_m = models.IntegerField(null=True, blank=True)
+    duration_s = models.IntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """Representación en cadena del objeto."""
+        return f"Ruta canónica {self.id}: de {self.startLocation} a {self.destination}"
+
+    class Meta:
+        """Metadatos del modelo."""
+        db_table = 'canonical_route'
+        indexes = [
+            models.Index(fields=['institution', 'start_cell', 'end_cell'], name='canonical_route_cells_idx'),
+        ]
+
+
 class Route(models.Model):
     """
     Representa una ruta predefinida creada por un conductor.
@@ -32,10 +85,51 @@ class Route(models.Model):
     # Coordenadas [latitud, longitud] para el punto de destino.
     endPointCoords = ArrayField(models.FloatField(), size=2)
 
+    # Ruta canónica a la que se asignó esta ruta (ver `route.canonical`).
+    canonical = models.ForeignKey(
+        CanonicalRoute,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='routes'
+    )
+
+    # Copia desnormalizada de las coordenadas en columnas indexables, usada por
+    # la búsqueda por proximidad (ver `route.proximity`). Se rellenan en `save()`.
+    start_lat = models.FloatField(null=True, blank=True, editable=False)
+    start_lng = models.FloatField(null=True, blank=True, editable=False)
+    end_lat = models.FloatField(null=True, blank=True, editable=False)
+    end_lng = models.FloatField(null=True, blank=True, editable=False)
+
+    # Última modificación, para la sincronización incremental (ver `sync`).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def sync_spatial_fields(self):
+        """Copia las coordenadas de los ArrayField a las columnas indexadas."""
+        if self.startPointCoords and len(self.startPointCoords) >= 2:
+            self.start_lat, self.start_lng = float(self.startPointCoords[0]), float(self.startPointCoords[1])
+        if self.endPointCoords and len(self.endPointCoords) >= 2:
+            self.end_lat, self.end_lng = float(self.endPointCoords[0]), float(self.endPointCoords[1])
+
+    def save(self, *args, **kwargs):
+        """Mantiene sincronizadas las columnas espaciales antes de guardar."""
+        self.sync_spatial_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'startPointCoords', 'endPointCoords'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {
+                'start_lat', 'start_lng', 'end_lat', 'end_lng'
+            }
+        super().save(*args, **kwargs)
+
     def __str__(self):
         """Representación en cadena del objeto."""
         return f"Ruta {self.id}: de {self.startLocation} a {self.destination} (Conductor: {self.driver.user.full_name})"
 
     class Meta:
         """Metadatos del modelo."""
-        db_table = 'route' # Nombre de la tabla en la base de datos.
\ No newline at end of file
+        db_table = 'route' # Nombre de la tabla en la base de datos.
+        indexes = [
+            models.Index(fields=['start_lat', 'start_lng'], name='route_start_latlng_idx'),
+            models.Index(fields=['end_lat', 'end_lng'], name='route_end_latlng_idx'),
+            models.Index(fields=['driver', 'updated_at', 'id'], name='route_driver_updated_idx'),
+        ]
\ No newline at end of file
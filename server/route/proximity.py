@@ -0,0 +1,94 @@
+# server/route/proximity.py
+
+"""
+Búsqueda de rutas por proximidad: "rutas que salen a menos de R km de mí y
+llegan a menos de R km de X".
+
+Hay dos estrategias según la base de datos:
+
+- PostgreSQL: un índice GiST sobre el punto de origen (`point(start_lng,
+  start_lat)`, creado en la migración 0005) filtra por caja envolvente y los
+  candidatos se reordenan por distancia geodésica en Python.
+- Otros motores (SQLite en desarrollo y tests): un índice en memoria por
+  institución que agrupa las rutas en celdas geohash y calcula las distancias
+  con haversine vectorizado (NumPy).
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from .geo import GeohashGridIndex, bounding_box
+from .models import Route
+
+# Índices en memoria por institución (solo para motores sin GiST).
+_INDEX_CACHE = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def invalidate_route_index(institution_id=None):
+    """Descarta el índice en memoria de una institución (o de todas)."""
+    with _INDEX_LOCK:
+        if institution_id is None:
+            _INDEX_CACHE.clear()
+        else:
+            _INDEX_CACHE.pop(institution_id, None)
+
+
+def _institution_routes(institution_id):
+    return Route.objects.filter(
+        driver__user__institution_id=institution_id,
+        start_lat__isnull=False,
+        end_lat__isnull=False,
+    )
+
+
+def get_route_index(institution_id):
+    """Devuelve (y construye si hace falta) el índice en memoria de la institución."""
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(institution_id)
+    if index is None:
+        rows = _institution_routes(institution_id).values_list(
+            'id', 'start_lat', 'start_lng', 'end_lat', 'end_lng'
+        )
+        index = GeohashGridIndex.from_rows(rows)
+        with _INDEX_LOCK:
+            _INDEX_CACHE[institution_id] = index
+    return index
+
+
+def _postgres_candidates(institution_id, start, radius_m, end, end_radius_m):
+    """
+    Filtra por caja envolvente usando el índice GiST sobre el punto de origen
+    (y el índice B-tree de las coordenadas de destino).
+    """
+    lat_min, lat_max, lng_min, lng_max = bounding_box(start[0], start[1], radius_m)
+    queryset = _institution_routes(institution_id).extra(
+        where=['point(start_lng, start_lat) <@ box(point(%s, %s), point(%s, %s))'],
+        params=[lng_min, lat_min, lng_max, lat_max],
+    )
+    if end is not None:
+        lat_min, lat_max, lng_min, lng_max = bounding_box(end[0], end[1], end_radius_m)
+        queryset = queryset.filter(
+            end_lat__range=(lat_min, lat_max),
+            end_lng__range=(lng_min, lng_max),
+        )
+    rows = queryset.values_list('id', 'start_lat', 'start_lng', 'end_lat', 'end_lng')
+    return GeohashGridIndex.from_rows(rows)
+
+
+def find_nearby_routes(institution_id, start, radius_m, end=None, end_radius_m=None, limit=None):
+    """
+    Rutas de la institución cercanas a `start` (y a `end`, si se indica),
+    ordenadas por distancia. Devuelve una lista de `route.geo.ProximityMatch`.
+    """
+    if limit is None:
+        limit = settings.PROXIMITY_MAX_CANDIDATES
+    if end_radius_m is None:
+        end_radius_m = radius_m
+    if connection.vendor == 'postgresql':
+        index = _postgres_candidates(institution_id, start, radius_m, end, end_radius_m)
+    else:
+        index = get_route_index(institution_id)
+    return index.query(start, radius_m, end=end, end_radius_m=end_radius_m, limit=limit)
@@ -1,7 +1,7 @@
 # server/route/serializers.py
 
 from rest_framework import serializers
-from .models import Route
+from .models import CanonicalRoute, Route
 
 class RouteSerializer(serializers.ModelSerializer):
     """
@@ -21,5 +21,35 @@ class RouteSerializer(serializers.ModelSerializer):
             'startLocation',
             'destination',
             'startPointCoords',
-            'endPointCoords'
+            'endPointCoords',
+            'canonical'
+        ]
+        # La ruta canónica la asigna el servidor al crear la ruta.
+        read_only_fields = ['canonical']
+
+
+class CanonicalRouteSerializer(serializers.ModelSerializer):
+    """
+    Serializador para las rutas canónicas compartidas (rutas populares).
+
+    Incluye cuántas rutas de conductores y cuántos viajes usan la ruta canónica.
+    """
+    route_count = serializers.IntegerField(read_only=True)
+    travel_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = CanonicalRoute
+        fields = [
+            'id',
+            'startLocation',
+            'destination',
+            'start_lat',
+            'start_lng',
+            'end_lat',
+            'end_lng',
+            'encoded_polyline',
+            'distance_m',
+            'duration_s',
+            'route_count',
+            'travel_count'
         ]
\ No newline at end of file
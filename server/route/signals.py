@@ -0,0 +1,23 @@
+# server/route/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.response_cache import bump_institution_generation_on_commit, driver_institution_id
+from .models import Route
+from .proximity import invalidate_route_index
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def route_changed(sender, instance, **kwargs):
+    """
+    Descarta el índice de proximidad en memoria de la institución del
+    conductor cuando una de sus rutas se crea, modifica o elimina, para que la
+    siguiente búsqueda lo reconstruya, e invalida la caché de respuestas de la
+    institución. Los índices de las demás instituciones se conservan.
+    """
+    institution_id = driver_institution_id(instance.driver_id)
+    invalidate_route_index(institution_id)
+    # Las respuestas en caché de la institución del conductor dejan de ser válidas.
+    bump_institution_generation_on_commit(institution_id)
@@ -0,0 +1,216 @@
+import threading
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from driver.models import Driver
+from institutions.models import Institution
+from route.canonical import intern_route
+from route.geo import SpatialHashIndex, haversine_m
+from route.models import CanonicalRoute, Route
+from users.models import Users
+
+
+def insert_route_row(driver, canonical=None, start=(None, None), end=(None, None)):
+    """
+    Inserta una fila de ruta con SQL directo. El ArrayField de PostgreSQL no se
+    puede guardar en SQLite, así que las coordenadas se dejan vacías y solo se
+    rellenan (si se indican) las columnas desnormalizadas de latitud/longitud.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO route (driver_id, "startLocation", destination, "startPointCoords", "endPointCoords", '
+            'canonical_id, start_lat, start_lng, end_lat, end_lng, updated_at) '
+            'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+            [driver.pk, 'Campus', 'Terminal', '', '', canonical.pk if canonical else None, *start, *end,
+             timezone.now()],
+        )
+        return cursor.lastrowid
+
+
+class SpatialHashIndexTest(SimpleTestCase):
+    """
+    Casos de prueba para el índice espacial usado en el agrupamiento de rutas.
+    """
+
+    def test_haversine(self):
+        """Un grado de latitud mide aproximadamente 111 km."""
+        self.assertAlmostEqual(haversine_m(0, 0, 1, 0), 111195, delta=10)
+
+    def test_find_within_tolerance(self):
+        """Encuentra la entrada cuyos dos extremos están dentro de la tolerancia."""
+        index = SpatialHashIndex(150)
+        index.add('campus-terminal', (3.3750, -76.5330), (3.4680, -76.5190))
+        # Unos 60 m de diferencia en cada extremo.
+        self.assertEqual(index.find((3.3755, -76.5333), (3.4684, -76.5193)), 'campus-terminal')
+
+    def test_find_rejects_far_points(self):
+        """No agrupa rutas cuyo destino está fuera de la tolerancia."""
+        index = SpatialHashIndex(150)
+        index.add('campus-terminal', (3.3750, -76.5330), (3.4680, -76.5190))
+        self.assertIsNone(index.find((3.3750, -76.5330), (3.4720, -76.5190)))
+
+    def test_find_across_cell_border(self):
+        """Dos puntos muy cercanos en celdas distintas se siguen encontrando."""
+        index = SpatialHashIndex(150)
+        size = index.size_deg
+        border = size * 1000
+        index.add('a', (border - 1e-6, 0.0), (1.0, 1.0))
+        self.assertEqual(index.find((border + 1e-6, 0.0), (1.0, 1.0)), 'a')
+
+    def test_find_returns_closest(self):
+        """Con varias candidatas, devuelve la más cercana."""
+        index = SpatialHashIndex(150)
+        index.add('lejana', (3.3760, -76.5330), (3.4680, -76.5190))
+        index.add('cercana', (3.3751, -76.5330), (3.4680, -76.5190))
+        self.assertEqual(index.find((3.3750, -76.5330), (3.4680, -76.5190)), 'cercana')
+
+
+class CanonicalRouteTestMixin:
+    """Datos comunes: una institución con un conductor aprobado."""
+
+    def create_driver(self, institution, mail):
+        user = Users.objects.create(
+            full_name="Driver User",
+            user_type=Users.TYPE_DRIVER,
+            institutional_mail=mail,
+            student_code="2023001",
+            udocument="12345678",
+            direction="Test Address",
+            uphone="+573001234567",
+            upassword=make_password("driverpass123"),
+            institution=institution,
+            user_state=Users.STATE_APPROVED,
+            driver_state=Users.DRIVER_STATE_APPROVED,
+        )
+        return Driver.objects.create(user=user, validate_state='approved')
+
+
+class InternRouteTest(CanonicalRouteTestMixin, TestCase):
+    """
+    Casos de prueba para la asignación de rutas a rutas canónicas.
+    """
+
+    def setUp(self):
+        self.institution = Institution.objects.create(official_name="Universidad Test", email="test@univalle.edu.co")
+        self.driver_a = self.create_driver(self.institution, "a@test.com")
+        self.driver_b = self.create_driver(self.institution, "b@test.com")
+
+    def _route(self, driver, start, end):
+        route_id = insert_route_row(driver)
+        return Route(id=route_id, driver=driver, startLocation='Campus', destination='Terminal',
+                     startPointCoords=list(start), endPointCoords=list(end))
+
+    def test_near_identical_routes_share_canonical(self):
+        """Dos rutas casi idénticas de conductores distintos comparten la ruta canónica."""
+        first = intern_route(self._route(self.driver_a, (3.3750, -76.5330), (3.4680, -76.5190)))
+        second = intern_route(self._route(self.driver_b, (3.3755, -76.5333), (3.4684, -76.5193)))
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(CanonicalRoute.objects.count(), 1)
+        self.assertEqual(first.institution_id, self.institution.id_institution)
+        self.assertEqual(Route.objects.filter(canonical=first).count(), 2)
+
+    def test_different_routes_get_different_canonicals(self):
+        """Rutas con destinos distintos no se agrupan."""
+        first = intern_route(self._route(self.driver_a, (3.3750, -76.5330), (3.4680, -76.5190)))
+        second = intern_route(self._route(self.driver_b, (3.3750, -76.5330), (3.4000, -76.5500)))
+        self.assertNotEqual(first.pk, second.pk)
+
+    def test_new_canonical_is_enriched_after_commit(self):
+        """La polilínea se calcula al confirmar la creación, no al consultar la ruta."""
+        with patch('route.canonical.enrich_canonical_route') as enrich:
+            with self.captureOnCommitCallbacks() as callbacks:
+                canonical = intern_route(self._route(self.driver_a, (3.3750, -76.5330), (3.4680, -76.5190)))
+            enrich.assert_not_called()
+            for callback in callbacks:
+                callback()
+        enrich.assert_called_once_with(canonical)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Usa pg_advisory_xact_lock.')
+class ConcurrentInternRouteTest(CanonicalRouteTestMixin, TransactionTestCase):
+    """
+    Dos rutas casi idénticas creadas a la vez cuando aún no existe ninguna
+    ruta canónica cercana.
+    """
+
+    def test_concurrent_routes_share_one_canonical(self):
+        institution = Institution.objects.create(official_name="Universidad Test", email="test@univalle.edu.co")
+        drivers = [self.create_driver(institution, "a@test.com"), self.create_driver(institution, "b@test.com")]
+        routes = [
+            Route.objects.create(driver=driver, startLocation='Campus', destination='Terminal',
+                                 startPointCoords=[3.3750, -76.5330], endPointCoords=[3.4680, -76.5190])
+            for driver in drivers
+        ]
+        barrier = threading.Barrier(len(routes))
+
+        def create(route):
+            try:
+                barrier.wait()
+                intern_route(route)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create, args=(route,)) for route in routes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(CanonicalRoute.objects.count(), 1)
+        self.assertEqual(Route.objects.filter(canonical__isnull=False).count(), 2)
+
+
+class PopularRouteListViewTest(CanonicalRouteTestMixin, APITestCase):
+    """
+    Casos de prueba para el endpoint de rutas populares.
+    """
+
+    def setUp(self):
+        self.institution = Institution.objects.create(official_name="Universidad Test", email="test@univalle.edu.co")
+        self.driver = self.create_driver(self.institution, "a@test.com")
+        token = jwt.encode(
+            {'user_id': self.driver.user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _canonical(self, name, institution):
+        return CanonicalRoute.objects.create(
+            institution=institution, startLocation=name, destination='Terminal',
+            start_lat=3.37, start_lng=-76.53, end_lat=3.46, end_lng=-76.51,
+            start_cell='0:0', end_cell='0:0',
+        )
+
+    def test_popular_routes_ordered_by_usage(self):
+        """Las rutas canónicas se ordenan por uso y las que no tienen rutas se omiten."""
+        popular = self._canonical('Campus', self.institution)
+        less_popular = self._canonical('Biblioteca', self.institution)
+        self._canonical('Sin rutas', self.institution)
+        other = Institution.objects.create(official_name="Otra", email="otra@test.com", phone="+570000000000")
+        self._canonical('Otra institución', other)
+        for _ in range(3):
+            insert_route_row(self.driver, popular)
+        insert_route_row(self.driver, less_popular)
+
+        response = self.client.get('/api/route/popular/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [popular.id, less_popular.id])
+        self.assertEqual(response.data[0]['route_count'], 3)
+
+    def test_popular_routes_unauthorized(self):
+        """Sin token no se puede consultar el endpoint."""
+        self.client.credentials()
+        response = self.client.get('/api/route/popular/')
+        self.assertEqual(response.status_code, 403)
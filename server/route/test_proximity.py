@@ -0,0 +1,112 @@
+import random
+
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, TestCase
+
+from institutions.models import Institution
+from route.geo import GeohashGridIndex, haversine_m, haversine_many_m
+from route.models import Route
+from route.proximity import find_nearby_routes, invalidate_route_index
+from route.test_canonical import CanonicalRouteTestMixin, insert_route_row
+
+CAMPUS = (3.3750, -76.5330)
+TERMINAL = (3.4680, -76.5190)
+
+
+class GeohashGridIndexTest(SimpleTestCase):
+    """
+    Casos de prueba para el índice en memoria de la búsqueda por proximidad.
+    """
+
+    def test_vectorized_haversine_matches_scalar(self):
+        """La versión vectorizada coincide con la distancia escalar."""
+        lats, lngs = [3.40, 3.45, -4.0], [-76.50, -76.55, 10.0]
+        distances = haversine_many_m(*CAMPUS, lats, lngs)
+        for lat, lng, distance in zip(lats, lngs, distances):
+            self.assertAlmostEqual(distance, haversine_m(*CAMPUS, lat, lng), places=3)
+
+    def test_query_matches_brute_force(self):
+        """El índice devuelve exactamente las rutas que encuentra una búsqueda exhaustiva."""
+        rng = random.Random(7)
+        rows = [
+            (i, 3.35 + rng.random() * 0.15, -76.56 + rng.random() * 0.08,
+             3.35 + rng.random() * 0.15, -76.56 + rng.random() * 0.08)
+            for i in range(2000)
+        ]
+        index = GeohashGridIndex.from_rows(rows)
+        radius = 1500
+        expected = {
+            row[0] for row in rows
+            if haversine_m(*CAMPUS, row[1], row[2]) <= radius and haversine_m(*TERMINAL, row[3], row[4]) <= radius
+        }
+
+        matches = index.query(CAMPUS, radius, end=TERMINAL)
+
+        self.assertEqual(len(matches), len(expected))
+        self.assertEqual({match.route_id for match in matches}, expected)
+        totals = [match.start_distance_m + match.end_distance_m for match in matches]
+        self.assertEqual(totals, sorted(totals))
+
+    def test_query_without_destination_and_limit(self):
+        """Sin destino solo se filtra por el origen, y `limit` acota los resultados."""
+        index = GeohashGridIndex.from_rows([
+            (1, 3.3751, -76.5330, 0.0, 0.0),
+            (2, 3.3760, -76.5330, 0.0, 0.0),
+            (3, 3.5000, -76.5330, 0.0, 0.0),
+        ])
+        matches = index.query(CAMPUS, 500, limit=1)
+        self.assertEqual([match.route_id for match in matches], [1])
+        self.assertIsNone(matches[0].end_distance_m)
+
+    def test_empty_index(self):
+        """Un índice vacío no devuelve resultados."""
+        self.assertEqual(GeohashGridIndex.from_rows([]).query(CAMPUS, 1000), [])
+
+
+class FindNearbyRoutesTest(CanonicalRouteTestMixin, TestCase):
+    """
+    Casos de prueba para la búsqueda de rutas cercanas por institución.
+    """
+
+    def setUp(self):
+        invalidate_route_index()
+        self.institution = Institution.objects.create(official_name="Universidad Test", email="test@univalle.edu.co")
+        self.driver = self.create_driver(self.institution, "a@test.com")
+
+    def tearDown(self):
+        invalidate_route_index()
+
+    def test_finds_routes_of_the_institution(self):
+        """Encuentra la ruta cercana de la institución y omite las lejanas y las de otras instituciones."""
+        near = insert_route_row(self.driver, start=(3.3755, -76.5333), end=(3.4684, -76.5193))
+        insert_route_row(self.driver, start=(3.4500, -76.5330), end=(3.4684, -76.5193))
+        other = Institution.objects.create(official_name="Otra", email="otra@test.com", phone="+570000000000")
+        other_driver = self.create_driver(other, "b@test.com")
+        insert_route_row(other_driver, start=(3.3755, -76.5333), end=(3.4684, -76.5193))
+
+        matches = find_nearby_routes(self.institution.id_institution, CAMPUS, 1000, end=TERMINAL)
+
+        self.assertEqual([match.route_id for match in matches], [near])
+
+    def test_index_is_rebuilt_after_invalidation(self):
+        """Tras invalidar el índice, la búsqueda ve las rutas nuevas."""
+        self.assertEqual(find_nearby_routes(self.institution.id_institution, CAMPUS, 1000), [])
+        route_id = insert_route_row(self.driver, start=CAMPUS, end=TERMINAL)
+        invalidate_route_index()
+        matches = find_nearby_routes(self.institution.id_institution, CAMPUS, 1000)
+        self.assertEqual([match.route_id for match in matches], [route_id])
+
+    def test_route_change_only_invalidates_its_institution(self):
+        """Cambiar una ruta de otra institución no descarta el índice de esta."""
+        other = Institution.objects.create(official_name="Otra", email="otra@test.com", phone="+570000000000")
+        other_driver = self.create_driver(other, "b@test.com")
+        self.assertEqual(find_nearby_routes(self.institution.id_institution, CAMPUS, 1000), [])
+        route_id = insert_route_row(self.driver, start=CAMPUS, end=TERMINAL)
+
+        other_route = Route(id=insert_route_row(other_driver), driver=other_driver)
+        post_save.send(sender=Route, instance=other_route, created=True)
+        self.assertEqual(find_nearby_routes(self.institution.id_institution, CAMPUS, 1000), [])
+
+        post_save.send(sender=Route, instance=Route(id=route_id, driver=self.driver), created=True)
+        matches = find_nearby_routes(self.institution.id_institution, CAMPUS, 1000)
+        self.assertEqual([match.route_id for match in matches], [route_id])
@@ -6,6 +6,7 @@ from .views import (
     RouteListView,
     RouteDetailView,
     RouteDeleteView,
+    PopularRouteListView,
 )
 
 # Lista de patrones de URL para la aplicación 'route'.
@@ -16,6 +17,9 @@ urlpatterns = [
     # Endpoint para listar todas las rutas disponibles en la institución del usuario.
     path('list/', RouteListView.as_view(), name='route-list'),
     
+    # Endpoint para listar las rutas canónicas (compartidas) más usadas de la institución.
+    path('popular/', PopularRouteListView.as_view(), name='route-popular'),
+    
     # Endpoint para que un conductor liste únicamente sus propias rutas.
     path('my-routes/', RouteDetailView.as_view(), name='route-my-routes'),
     
@@ -1,14 +1,18 @@
 # server/route/views.py
 
+from django.db.models import Count
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from drf_yasg.utils import swagger_auto_schema # <-- Importación añadida
-from .models import Route
-from .serializers import RouteSerializer
+from .canonical import intern_route
+from .models import CanonicalRoute, Route
+from .serializers import CanonicalRouteSerializer, RouteSerializer
 from driver.models import Driver
 from users.models import Users
 from users.permissions import IsAuthenticatedCustom
+from config.etag import ConditionalGetMixin
+from config.response_cache import InstitutionResponseCacheMixin
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,13 +27,20 @@ class RouteCreateView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
 
-class RouteListView(generics.ListAPIView):
+    def perform_create(self, serializer):
+        """Guarda la ruta y la asigna a su ruta canónica compartida."""
+        route = serializer.save()
+        intern_route(route)
+
+class RouteListView(ConditionalGetMixin, InstitutionResponseCacheMixin, generics.ListAPIView):
     """
     Vista para listar todas las rutas disponibles para los conductores
     aprobados de la misma institución que el usuario autenticado.
     """
     serializer_class = RouteSerializer
     permission_classes = [IsAuthenticatedCustom]
+    # La respuesta se comparte en caché entre los miembros de la institución.
+    response_cache_endpoint = 'route-list'
 
     @swagger_auto_schema(operation_summary="Endpoint para listar rutas de la institución")
     def get(self, request, *args, **kwargs):
@@ -49,7 +60,41 @@ class RouteListView(generics.ListAPIView):
         )
         return Route.objects.filter(driver__in=drivers_aprobados)
 
-class RouteDetailView(generics.ListAPIView): 
+class PopularRouteListView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    Vista para listar las rutas canónicas más usadas de la institución del
+    usuario autenticado. Cada ruta canónica agrupa las rutas casi idénticas
+    de varios conductores.
+    """
+    serializer_class = CanonicalRouteSerializer
+    permission_classes = [IsAuthenticatedCustom]
+
+    @swagger_auto_schema(operation_summary="Endpoint para listar las rutas populares de la institución")
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """
+        Ordena las rutas canónicas por número de viajes y de rutas que las usan.
+        El parámetro opcional `?limit=` acota el número de resultados (por defecto 20).
+        """
+        user = self.request.user
+        if not user.institution_id:
+            return CanonicalRoute.objects.none()
+        try:
+            limit = max(1, min(int(self.request.query_params.get('limit', 20)), 100))
+        except ValueError:
+            limit = 20
+        return CanonicalRoute.objects.filter(
+            institution_id=user.institution_id
+        ).annotate(
+            route_count=Count('routes', distinct=True),
+            travel_count=Count('routes__travel', distinct=True)
+        ).filter(
+            route_count__gt=0
+        ).order_by('-travel_count', '-route_count', 'id')[:limit]
+
+class RouteDetailView(ConditionalGetMixin, generics.ListAPIView):
     """
     Vista para que un conductor autenticado y aprobado liste
     únicamente sus propias rutas.
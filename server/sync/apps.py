@@ -0,0 +1,13 @@
+# server/sync/apps.py
+
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    """Sincronización incremental para clientes con almacenamiento local."""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+
+    def ready(self):
+        """Registra las señales que guardan las lápidas de las filas eliminadas."""
+        import sync.signals
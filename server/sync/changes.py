@@ -0,0 +1,218 @@
+# server/sync/changes.py
+
+"""
+Sincronización incremental (`GET /api/sync/?since=<token>`).
+
+El cliente guarda localmente sus viajes, reservas, rutas y vehículos, y en
+cada reconexión pide solo lo que cambió desde su último token:
+
+- `changes`: filas nuevas o modificadas, con la misma forma que los
+  listados (`/api/travel/institution/`, `/api/realize/my-reservations/`,
+  `/api/route/my-routes/`, `/api/vehicle/my-vehicles/`).
+- `deleted`: ids que el cliente debe borrar. Son las filas eliminadas
+  (lápidas de `sync.models.Tombstone`) y las canceladas.
+
+Cada conjunto se recorre por (updated_at, id) con un cursor *keyset*. Las
+reservas, rutas y vehículos tienen índices (usuario o conductor, updated_at,
+id), así que una página cuesta lo mismo sin importar el tamaño de la tabla.
+Los viajes se filtran por la institución del conductor, que está en otra
+tabla: se recorren con el índice (updated_at, id) y el costo depende de los
+viajes de todas las instituciones que cambiaron desde el cursor. El token es
+la lista de cursores firmada con `django.core.signing`: el cliente no puede
+alterarlo ni usar el de otro usuario.
+
+Los cursores que se agotan en una página (aunque otro conjunto todavía tenga
+más) avanzan a la hora de inicio de la petición menos SYNC_OVERLAP_SECONDS,
+para no perder filas cuyo `updated_at` es anterior a la consulta pero cuya
+transacción confirmó después. El cliente aplica los cambios por id, así que
+recibir una fila dos veces no tiene efecto.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.utils import timezone
+
+from realize.models import Realize
+from realize.projections import REALIZE_PROJECTION
+from route.models import Route
+from route.serializers import RouteSerializer
+from travel.models import Travel
+from travel.projections import TRAVEL_DETAIL_PROJECTION
+from vehicle.models import Vehicle
+from vehicle.serializers import VehicleSerializer
+
+from .models import Tombstone
+
+TOKEN_SALT = 'sync.changes'
+TOMBSTONES = 'deleted'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# `scope(user)` devuelve el queryset visible; `tombstones(user)` el filtro de
+# sus lápidas; `removed` las filas que se informan como eliminadas.
+SyncDataset = namedtuple('SyncDataset', 'scope tombstones removed render')
+
+
+class SyncTokenError(ValueError):
+    """Token inválido, alterado o de otro usuario."""
+
+
+class SyncTokenExpired(SyncTokenError):
+    """El token es anterior a la retención de las lápidas: hay que empezar de cero."""
+
+
+def _render_travels(queryset, request):
+    return TRAVEL_DETAIL_PROJECTION.render(queryset, {'request': request})
+
+
+def _render_reservations(queryset, request):
+    return REALIZE_PROJECTION.render(queryset, {'request': request})
+
+
+def _render_routes(queryset, request):
+    return RouteSerializer(queryset, many=True).data
+
+
+def _render_vehicles(queryset, request):
+    return VehicleSerializer(queryset, many=True).data
+
+
+def _institution_travels(user):
+    if not user.institution_id:
+        return Travel.objects.none()
+    return Travel.objects.filter(driver__user__institution_id=user.institution_id)
+
+
+DATASETS = {
+    'travels': SyncDataset(
+        scope=_institution_travels,
+        tombstones=lambda user: Q(dataset='travels', institution_id=user.institution_id),
+        removed=Q(travel_state='cancelled'),
+        render=_render_travels,
+    ),
+    'reservations': SyncDataset(
+        scope=lambda user: Realize.objects.filter(user_id=user.pk),
+        tombstones=lambda user: Q(dataset='reservations', owner_id=user.pk),
+        removed=Q(status=Realize.STATUS_CANCELLED),
+        render=_render_reservations,
+    ),
+    'routes': SyncDataset(
+        scope=lambda user: Route.objects.filter(driver_id=user.pk),
+        tombstones=lambda user: Q(dataset='routes', owner_id=user.pk),
+        removed=None,
+        render=_render_routes,
+    ),
+    'vehicles': SyncDataset(
+        scope=lambda user: Vehicle.objects.filter(driver_id=user.pk),
+        tombstones=lambda user: Q(dataset='vehicles', owner_id=user.pk),
+        removed=None,
+        render=_render_vehicles,
+    ),
+}
+
+
+def _to_micros(moment):
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def encode_token(user, cursors):
+    payload = {
+        'u': user.pk,
+        'c': {name: [_to_micros(moment), last_id] for name, (moment, last_id) in cursors.items()},
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+
+def decode_token(token, user, now):
+    """Cursores del token."""
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        if payload['u'] != user.pk:
+            raise SyncTokenError("El token de sincronización pertenece a otro usuario.")
+        cursors = {name: (_from_micros(moment), last_id) for name, (moment, last_id) in payload['c'].items()}
+    except SyncTokenError:
+        raise
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise SyncTokenError("Token de sincronización inválido.")
+
+    deleted_since = cursors.get(TOMBSTONES)
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if deleted_since is None or deleted_since[0] < now - retention:
+        raise SyncTokenExpired("El token de sincronización expiró. Sincronice de nuevo sin `since`.")
+    return cursors
+
+
+def after(queryset, field, cursor):
+    """Filas estrictamente posteriores al cursor (momento, id)."""
+    if cursor is None:
+        return queryset
+    moment, last_id = cursor
+    return queryset.filter(Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': last_id}))
+
+
+def _page(queryset, field, cursor, limit, *columns):
+    rows = list(after(queryset, field, cursor).order_by(field, 'id').values_list(field, 'id', *columns)[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def build_sync_page(request, token=None, limit=None):
+    """
+    Arma la respuesta de `/api/sync/`. Sin token se envía el estado completo,
+    paginado, y el token que sigue solo trae diferencias.
+    """
+    user = request.user
+    now = timezone.now()
+    # Cursor de los conjuntos agotados (ver el solape en la documentación del módulo).
+    exhausted = (now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), 0)
+    limit = limit or settings.SYNC_PAGE_SIZE
+    if token:
+        cursors = decode_token(token, user, now)
+    else:
+        # Las lápidas anteriores no interesan a un cliente sin datos locales.
+        cursors = {TOMBSTONES: exhausted}
+
+    changes = {}
+    deleted = {name: [] for name in DATASETS}
+    next_cursors = {}
+    has_more = False
+
+    for name, dataset in DATASETS.items():
+        cursor = cursors.get(name)
+        queryset = dataset.scope(user)
+        if dataset.removed is not None and cursor is None:
+            queryset = queryset.exclude(dataset.removed)
+        removed = ExpressionWrapper(dataset.removed, output_field=BooleanField()) if dataset.removed is not None else Value(False)
+        rows, more = _page(queryset.annotate(sync_removed=removed), 'updated_at', cursor, limit, 'sync_removed')
+        changed_ids = [row_id for _, row_id, is_removed in rows if not is_removed]
+        deleted[name].extend(row_id for _, row_id, is_removed in rows if is_removed)
+        changes[name] = dataset.render(
+            dataset.scope(user).filter(id__in=changed_ids).order_by('updated_at', 'id'), request
+        ) if changed_ids else []
+        next_cursors[name] = rows[-1][:2] if more else exhausted
+        has_more = has_more or more
+
+    tombstone_filter = Q()
+    for dataset in DATASETS.values():
+        tombstone_filter |= dataset.tombstones(user)
+    rows, more = _page(
+        Tombstone.objects.filter(tombstone_filter), 'deleted_at', cursors[TOMBSTONES], limit, 'dataset', 'object_id'
+    )
+    for _, _, dataset_name, object_id in rows:
+        deleted[dataset_name].append(object_id)
+    next_cursors[TOMBSTONES] = rows[-1][:2] if more else exhausted
+    has_more = has_more or more
+
+    return {
+        'changes': changes,
+        'deleted': deleted,
+        'next': encode_token(user, next_cursors),
+        'has_more': has_more,
+    }
@@ -0,0 +1,32 @@
+# server/sync/management/commands/purge_sync_tombstones.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    """
+    Define el comando `manage.py purge_sync_tombstones`.
+    Borra las lápidas más antiguas que la retención. Los tokens de
+    sincronización anteriores a ese límite se rechazan con 410, así que ningún
+    cliente necesita las lápidas borradas. Pensado para ejecutarse a diario.
+    """
+    help = 'Elimina las lápidas de sincronización vencidas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Días que se conservan las lápidas.',
+        )
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - timedelta(days=options['retention_days'])
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=limit).delete()
+        self.stdout.write(self.style.SUCCESS(f'Lápidas eliminadas: {deleted}.'))
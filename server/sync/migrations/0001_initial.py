@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('dataset', models.CharField(max_length=20)),
+                ('object_id', models.IntegerField()),
+                ('institution_id', models.IntegerField(blank=True, null=True)),
+                ('owner_id', models.IntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'sync_tombstone',
+                'indexes': [models.Index(fields=['dataset', 'institution_id', 'deleted_at', 'id'], name='tombstone_institution_idx'), models.Index(fields=['dataset', 'owner_id', 'deleted_at', 'id'], name='tombstone_owner_idx'), models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# server/sync/models.py
+
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Registro de una fila eliminada de viajes, reservas, rutas o vehículos, para
+    que `/api/sync/` pueda avisar a los clientes que la tienen guardada.
+
+    No usa llaves foráneas: la fila (y a veces el conductor o la institución)
+    ya no existe. El alcance se guarda como enteros: `institution_id` para los
+    viajes, que ve toda la institución, y `owner_id` (uid del usuario o del
+    conductor) para los demás conjuntos.
+    """
+    id = models.AutoField(primary_key=True)
+    dataset = models.CharField(max_length=20)
+    object_id = models.IntegerField()
+    institution_id = models.IntegerField(null=True, blank=True)
+    owner_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        """Metadatos del modelo."""
+        db_table = 'sync_tombstone'
+        indexes = [
+            models.Index(fields=['dataset', 'institution_id', 'deleted_at', 'id'], name='tombstone_institution_idx'),
+            models.Index(fields=['dataset', 'owner_id', 'deleted_at', 'id'], name='tombstone_owner_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        """Representación en cadena del objeto."""
+        return f"{self.dataset} {self.object_id} eliminado el {self.deleted_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,37 @@
+# server/sync/signals.py
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from config.response_cache import driver_institution_id
+from realize.models import Realize
+from route.models import Route
+from travel.models import Travel
+from vehicle.models import Vehicle
+
+from .models import Tombstone
+
+# Las eliminaciones en cascada (por ejemplo, las reservas de un viaje borrado)
+# también envían `post_delete`, así que cada fila deja su lápida.
+
+
+@receiver(post_delete, sender=Travel)
+def travel_deleted_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        dataset='travels', object_id=instance.id, institution_id=driver_institution_id(instance.driver_id)
+    )
+
+
+@receiver(post_delete, sender=Realize)
+def realize_deleted_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(dataset='reservations', object_id=instance.id, owner_id=instance.user_id)
+
+
+@receiver(post_delete, sender=Route)
+def route_deleted_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(dataset='routes', object_id=instance.id, owner_id=instance.driver_id)
+
+
+@receiver(post_delete, sender=Vehicle)
+def vehicle_deleted_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(dataset='vehicles', object_id=instance.id, owner_id=instance.driver_id)
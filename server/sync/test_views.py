@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+from django.core import signing
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from realize.confirmation import confirm_reservation
+from realize.models import Realize
+from sync.changes import TOKEN_SALT
+from sync.models import Tombstone
+from travel.models import Travel
+from travel.state_machine import transition_travel
+from travel.test_views import TravelSearchTestMixin
+from vehicle.models import Vehicle
+
+SYNC_URL = '/api/sync/'
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class SyncViewTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para la sincronización incremental.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.travel = self._travel(self.near_route, 2)
+        self.cancelled = self._travel(self.near_route, 3, state='cancelled')
+        self.reservation = Realize.objects.create(user=self.user, travel=self.travel, status=Realize.STATUS_CONFIRMED)
+
+    def _sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(SYNC_URL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def _ids(self, body, name):
+        return [row['id'] for row in body['changes'][name]]
+
+    def test_initial_sync_returns_current_state(self):
+        body = self._sync()
+        self.assertFalse(body['has_more'])
+        self.assertEqual(self._ids(body, 'travels'), [self.travel.id])
+        self.assertEqual(self._ids(body, 'reservations'), [self.reservation.id])
+        self.assertEqual(self._ids(body, 'vehicles'), [self.vehicle.id])
+        self.assertEqual(sorted(self._ids(body, 'routes')), sorted([self.near_route, self.far_route]))
+        self.assertEqual(body['deleted'], {'travels': [], 'reservations': [], 'routes': [], 'vehicles': []})
+
+    def test_rows_match_list_endpoints(self):
+        body = self._sync()
+        self.assertEqual(body['changes']['reservations'], self.client.get('/api/realize/my-reservations/').json())
+        self.assertEqual(body['changes']['vehicles'], self.client.get('/api/vehicle/my-vehicles/').json())
+
+    def test_only_changes_since_token(self):
+        token = self._sync()['next']
+        self.assertEqual(self._sync(token)['changes'], {'travels': [], 'reservations': [], 'routes': [], 'vehicles': []})
+
+        self.vehicle.capacity = 5
+        self.vehicle.save()
+        new_travel = self._travel(self.far_route, 4)
+        body = self._sync(token)
+        self.assertEqual(self._ids(body, 'vehicles'), [self.vehicle.id])
+        self.assertEqual(body['changes']['vehicles'][0]['capacity'], 5)
+        self.assertEqual(self._ids(body, 'travels'), [new_travel.id])
+        self.assertEqual(self._ids(body, 'reservations'), [])
+
+    def test_reservation_changes_touch_the_travel(self):
+        token = self._sync()['next']
+        other = self._travel(self.far_route, 5)
+        token = self._sync(token)['next']
+        with self.captureOnCommitCallbacks(execute=True):
+            Realize.objects.create(user=self.user, travel=other)
+        body = self._sync(token)
+        self.assertEqual(self._ids(body, 'travels'), [other.id])
+        self.assertEqual(len(self._ids(body, 'reservations')), 1)
+
+    def test_cancelled_and_deleted_rows_are_reported(self):
+        token = self._sync()['next']
+        self.reservation.status = Realize.STATUS_CANCELLED
+        self.reservation.save()
+        spare = Vehicle.objects.create(
+            driver=self.driver, plate="XYZ987", brand="Renault", model="Logan", vehicle_type="Sedan",
+            category="metropolitano", soat=self.vehicle.soat, tecnomechanical=self.vehicle.tecnomechanical, capacity=4
+        )
+        body = self._sync(token)
+        self.assertEqual(body['deleted']['reservations'], [self.reservation.id])
+        self.assertEqual(self._ids(body, 'vehicles'), [spare.id])
+
+        spare_id, travel_id, reservation_id = spare.id, self.travel.id, self.reservation.id
+        spare.delete()
+        # Las reservas del viaje se eliminan en cascada y también dejan lápida.
+        self.travel.delete()
+        body = self._sync(body['next'])
+        self.assertEqual(body['deleted']['vehicles'], [spare_id])
+        self.assertEqual(body['deleted']['travels'], [travel_id])
+        self.assertEqual(body['deleted']['reservations'], [reservation_id])
+        self.assertEqual(body['changes']['vehicles'], [])
+
+    def test_pagination_visits_every_row_once(self):
+        created = [self._travel(self.far_route, hours).id for hours in range(10, 15)]
+        seen = []
+        token, pages = None, 0
+        while True:
+            body = self._sync(token, limit=2)
+            seen.extend(self._ids(body, 'travels'))
+            token, pages = body['next'], pages + 1
+            if not body['has_more']:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(seen), sorted([self.travel.id] + created))
+
+    def test_tombstones_are_scoped_to_the_caller(self):
+        token = self._sync()['next']
+        Tombstone.objects.create(dataset='vehicles', object_id=999, owner_id=self.user.uid + 100)
+        Tombstone.objects.create(dataset='travels', object_id=998, institution_id=self.institution.id_institution + 1)
+        body = self._sync(token)
+        self.assertEqual(body['deleted'], {'travels': [], 'reservations': [], 'routes': [], 'vehicles': []})
+
+    def test_invalid_tokens(self):
+        token = self._sync()['next']
+        response = self.client.get(SYNC_URL, {'since': token[:-2] + 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        payload['u'] = self.user.uid + 1
+        response = self.client.get(SYNC_URL, {'since': signing.dumps(payload, salt=TOKEN_SALT)})
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.client.get(SYNC_URL, {'limit': 'x'}).status_code, 400)
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=1)
+    def test_expired_token_requires_full_sync(self):
+        token = self._sync()['next']
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        payload['c']['deleted'][0] -= int(timedelta(days=2).total_seconds() * 1_000_000)
+        response = self.client.get(SYNC_URL, {'since': signing.dumps(payload, salt=TOKEN_SALT)})
+        self.assertEqual(response.status_code, 410)
+
+    @override_settings(SYNC_OVERLAP_SECONDS=60)
+    def test_complete_token_overlaps_recent_rows(self):
+        token = self._sync()['next']
+        self.assertEqual(self._ids(self._sync(token), 'travels'), [self.travel.id])
+
+    @override_settings(SYNC_OVERLAP_SECONDS=60)
+    def test_partial_page_overlaps_exhausted_datasets(self):
+        """Una fila que confirma tarde no se pierde aunque otro conjunto siga paginando."""
+        started = timezone.now()
+        body = self._sync(limit=1)
+        self.assertTrue(body['has_more'])
+        self.assertEqual(self._ids(body, 'vehicles'), [self.vehicle.id])
+        # `updated_at` anterior a la primera página, visible solo después.
+        Vehicle.objects.filter(pk=self.vehicle.pk).update(capacity=6, updated_at=started)
+        body = self._sync(body['next'], limit=1)
+        self.assertEqual(self._ids(body, 'vehicles'), [self.vehicle.id])
+        self.assertEqual(body['changes']['vehicles'][0]['capacity'], 6)
+
+    def test_queryset_updates_refresh_updated_at(self):
+        before = timezone.now() - timedelta(minutes=1)
+        Realize.objects.filter(pk=self.reservation.pk).update(status=Realize.STATUS_PENDING, updated_at=before)
+        Travel.objects.filter(pk=self.travel.pk).update(updated_at=before)
+        confirm_reservation(self.reservation.id)
+        transition_travel('start', self.travel.id, self.driver.pk)
+        self.reservation.refresh_from_db()
+        self.travel.refresh_from_db()
+        self.assertGreater(self.reservation.updated_at, before)
+        self.assertGreater(self.travel.updated_at, before)
@@ -0,0 +1,43 @@
+# server/sync/views.py
+
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from django.conf import settings
+
+from users.permissions import IsAuthenticatedCustom
+from .changes import SyncTokenError, SyncTokenExpired, build_sync_page
+
+
+class SyncView(APIView):
+    """
+    Cambios de viajes, reservas, rutas y vehículos desde el último token.
+
+    GET /api/sync/?since=<token>&limit=<n>
+
+    Sin `since` responde el estado completo (paginado). Mientras `has_more`
+    sea verdadero, el cliente debe pedir de inmediato la página siguiente con
+    `next`; al terminar guarda `next` para la próxima reconexión. Un 410
+    indica que el token expiró y hay que sincronizar desde cero.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+
+    @swagger_auto_schema(operation_summary="Endpoint para sincronizar los cambios desde el último token")
+    def get(self, request):
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                return Response({"error": "El parámetro 'limit' debe ser un número entero."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            limit = max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE))
+        try:
+            page = build_sync_page(request, request.query_params.get('since'), limit)
+        except SyncTokenExpired as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_410_GONE)
+        except SyncTokenError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page, status=status.HTTP_200_OK)
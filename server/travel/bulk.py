@@ -0,0 +1,97 @@
+# server/travel/bulk.py
+
+"""
+Creación masiva de viajes (por ejemplo, todas las salidas del día de una ruta
+institucional).
+
+Cada fila se valida primero en forma (tipos, precio, estado) con
+`TravelBulkRowSerializer`, sin tocar la base de datos. Después todas las
+referencias se resuelven con una consulta por tipo de modelo (conductores,
+vehículos y rutas) en lugar de una por fila, y se comprueba que el vehículo y
+la ruta de cada fila pertenezcan a su conductor. Si alguna fila tiene errores
+no se crea ninguna; si todas son válidas se insertan con un único `bulk_create`.
+"""
+
+from django.db import transaction
+from rest_framework import serializers
+
+from driver.models import Driver
+from route.models import Route
+from vehicle.models import Vehicle
+from .feed import touch_travels_on_commit
+from .models import Travel
+
+
+class TravelBulkRowSerializer(serializers.Serializer):
+    """Forma de una fila del lote. El conductor es, por defecto, el usuario autenticado."""
+    driver = serializers.IntegerField(required=False)
+    vehicle = serializers.IntegerField()
+    route = serializers.IntegerField()
+    time = serializers.DateTimeField()
+    price = serializers.IntegerField(min_value=0)
+    travel_state = serializers.ChoiceField(choices=Travel.TRAVEL_STATES, default='scheduled')
+
+
+def validate_travel_rows(rows, user):
+    """
+    Valida el lote completo. Devuelve (viajes_sin_guardar, errores), donde
+    `errores` es una lista de {"index": i, "errors": {...}}; los viajes solo
+    son utilizables si no hubo errores. Tres consultas sin importar el tamaño.
+    """
+    errors = []
+    parsed = []
+    for index, row in enumerate(rows):
+        serializer = TravelBulkRowSerializer(data=row)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            data.setdefault('driver', user.uid)
+            parsed.append((index, data))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+
+    # Los conductores del lote deben pertenecer a la institución del usuario.
+    drivers = dict(Driver.objects.filter(
+        pk__in={data['driver'] for _, data in parsed},
+        user__institution_id=user.institution_id,
+    ).values_list('pk', 'validate_state')) if user.institution_id else {}
+    vehicles = dict(Vehicle.objects.filter(
+        id__in={data['vehicle'] for _, data in parsed}
+    ).values_list('id', 'driver_id'))
+    routes = dict(Route.objects.filter(
+        id__in={data['route'] for _, data in parsed}
+    ).values_list('id', 'driver_id'))
+
+    travels = []
+    for index, data in parsed:
+        row_errors = {}
+        driver_id = data['driver']
+        if driver_id not in drivers:
+            row_errors['driver'] = ["El conductor no existe o no pertenece a tu institución."]
+        elif drivers[driver_id] != 'approved':
+            row_errors['driver'] = ["El conductor no está aprobado."]
+        if vehicles.get(data['vehicle']) != driver_id:
+            row_errors['vehicle'] = ["Este vehículo no pertenece al conductor."]
+        if routes.get(data['route']) != driver_id:
+            row_errors['route'] = ["Esta ruta no pertenece al conductor."]
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+            continue
+        travels.append(Travel(
+            driver_id=driver_id,
+            vehicle_id=data['vehicle'],
+            route_id=data['route'],
+            time=data['time'],
+            travel_state=data['travel_state'],
+            price=data['price'],
+        ))
+    errors.sort(key=lambda error: error['index'])
+    return travels, errors
+
+
+def create_travels(travels):
+    """Inserta los viajes validados en una sola transacción y un solo INSERT."""
+    with transaction.atomic():
+        created = Travel.objects.bulk_create(travels)
+        # bulk_create no dispara post_save: los viajes nuevos se publican aquí.
+        touch_travels_on_commit([travel.id for travel in created], bump=False)
+        return created
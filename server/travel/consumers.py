@@ -1,11 +1,13 @@
-import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from .models import Travel
+from .feed import feed_group_name
 from users.models import Users
 from driver.models import Driver
+from config.consumers import NegotiatedFormatMixin
+from config.renderers import PayloadDecodeError
 
-class LocationConsumer(AsyncWebsocketConsumer):
+class LocationConsumer(NegotiatedFormatMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.travel_id = None
         self.room_group_name = None
@@ -91,17 +93,17 @@ class LocationConsumer(AsyncWebsocketConsumer):
             )
             print(f"❌ WebSocket DESCONECTADO del viaje: {self.travel_id}")
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         user = self.scope["user"]
         driver_status = self.scope.get("driver_status")
 
         # Solo el conductor asignado y aprobado puede enviar datos
         if not (driver_status == 'approved' and self.travel and self.travel.driver.user == user):
-            await self.send(text_data=json.dumps({"error": "No autorizado para enviar ubicación."}))
+            await self.send_payload({"error": "No autorizado para enviar ubicación."})
             return
 
         try:
-            data = json.loads(text_data)
+            data = self.decode_payload(text_data, bytes_data)
             if 'lat' in data and 'lon' in data:
                 await self.channel_layer.group_send(
                     self.room_group_name,
@@ -115,15 +117,24 @@ class LocationConsumer(AsyncWebsocketConsumer):
                         }
                     }
                 )
-        except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({"error": "Mensaje JSON malformado."}))
+        except PayloadDecodeError:
+            await self.send_payload({"error": "Mensaje JSON malformado."})
         except Exception as e:
             print(f"Error inesperado en receive: {e}")
-            await self.send(text_data=json.dumps({"error": "Error interno del servidor."}))
+            await self.send_payload({"error": "Error interno del servidor."})
 
     async def location_update(self, event):
         location_data = event['location']
-        await self.send(text_data=json.dumps(location_data))
+        await self.send_payload(location_data)
+
+    # El viaje terminó (completado o cancelado): se avisa y se cierra la conexión.
+    async def travel_ended(self, event):
+        await self.send_payload({
+            'event': 'travel_ended',
+            'travel_id': event['travel_id'],
+            'travel_state': event['travel_state']
+        })
+        await self.close(code=4005)
 
     @database_sync_to_async
     def _get_travel_object_with_driver_and_institution(self, travel_id):
@@ -131,7 +142,7 @@ class LocationConsumer(AsyncWebsocketConsumer):
             return Travel.objects.select_related('driver__user', 'driver__user__institution').get(id=travel_id)
         except Travel.DoesNotExist:
             return None
-class InstitutionMapConsumer(AsyncWebsocketConsumer):
+class InstitutionMapConsumer(NegotiatedFormatMixin, AsyncWebsocketConsumer):
     
     async def connect(self):
         self.user = self.scope.get("user")
@@ -167,7 +178,7 @@ class InstitutionMapConsumer(AsyncWebsocketConsumer):
     
     # Handler para la ubicación que viene de los viajes a los que nos hemos suscrito
     async def location_update(self, event):
-        await self.send(text_data=json.dumps(event['location']))
+        await self.send_payload(event['location'])
         
     # Handler para la notificación de que un nuevo viaje ha comenzado
     async def new_travel_started(self, event):
@@ -175,6 +186,18 @@ class InstitutionMapConsumer(AsyncWebsocketConsumer):
         print(f"MAP CONSUMER: Recibida notificación de nuevo viaje: {travel_id}. Suscribiendo...")
         await self.subscribe_to_travel(travel_id)
 
+    # Handler para la notificación de que un viaje terminó: se deja de seguirlo.
+    async def travel_ended(self, event):
+        group_name = f'travel_{event["travel_id"]}'
+        if group_name in self.subscribed_travel_groups:
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+            self.subscribed_travel_groups.remove(group_name)
+        await self.send_payload({
+            'event': 'travel_ended',
+            'travel_id': event['travel_id'],
+            'travel_state': event['travel_state']
+        })
+
     # Función de ayuda para suscribirse a un grupo de viaje
     async def subscribe_to_travel(self, travel_id):
         group_name = f'travel_{travel_id}'
@@ -191,6 +214,42 @@ class InstitutionMapConsumer(AsyncWebsocketConsumer):
             travel_state='in_progress'
         ).select_related('driver__user'))
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         # Este consumer solo escucha
-        pass
\ No newline at end of file
+        pass
+
+
+class InstitutionTravelFeedConsumer(NegotiatedFormatMixin, AsyncWebsocketConsumer):
+    """
+    Canal de deltas del listado de viajes de la institución del usuario. El
+    cliente carga `/api/travel/institution/` una vez y aplica aquí los cambios
+    de estado y cupos de cada viaje (ver `travel.feed`).
+    """
+
+    async def connect(self):
+        self.group_name = None
+        institution_id = self.scope.get("user_institution_id")
+        if not self.scope.get("user_is_authenticated", False) or not institution_id:
+            print("Conexión al feed de viajes rechazada: No autenticado o sin institución.")
+            await self.close(code=4001)
+            return
+
+        self.group_name = feed_group_name(institution_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    # Handler: cambió el estado o los cupos de uno o más viajes.
+    async def travel_delta(self, event):
+        await self.send_payload({'event': 'travel_delta', 'travels': event['travels']})
+
+    # Handler: un viaje se eliminó del listado.
+    async def travel_removed(self, event):
+        await self.send_payload({'event': 'travel_removed', 'travel_id': event['travel_id']})
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Este consumer solo envía deltas
+        pass
@@ -0,0 +1,101 @@
+# server/travel/feed.py
+
+"""
+Deltas en vivo del listado de viajes de una institución.
+
+En lugar de que los clientes consulten `/api/travel/institution/` una y otra
+vez, cargan el listado una vez y se conectan a `ws/institution/travel_feed/`,
+por donde reciben deltas compactos (estado y cupos) cada vez que un viaje o
+una de sus reservas cambia.
+
+Cuando la transacción que hizo el cambio se confirma, `Travel.version` se
+incrementa con un UPDATE atómico (version = version + 1) y se publica el
+delta con la versión resultante. Hacerlo después del commit evita alargar las
+transacciones que bloquean el viaje (confirmaciones, barridos) y garantiza que
+no se anuncian cambios revertidos. Un cliente que ve saltar la versión de un
+viaje sabe que perdió un delta y debe volver a pedirlo; una versión repetida
+o menor a la conocida se ignora.
+
+Los deltas se envían al grupo `institution_travel_feed_<id>`.
+"""
+
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from config.response_cache import bump_institution_generation
+from realize.models import Realize
+from .models import Travel
+
+
+def feed_group_name(institution_id):
+    """Nombre del grupo de Channels del feed de viajes de una institución."""
+    return f'institution_travel_feed_{institution_id}'
+
+
+def travel_snapshots(travel_ids):
+    """Estado compacto de los viajes indicados (una consulta)."""
+    return list(Travel.objects.filter(id__in=travel_ids).annotate(
+        institution_id=F('driver__user__institution_id'),
+        capacity=F('vehicle__capacity'),
+        taken=Count('realize', filter=Realize.seat_taken('realize__')),
+    ).values('id', 'version', 'travel_state', 'time', 'institution_id', 'capacity', 'taken'))
+
+
+def delta_for(snapshot):
+    """Delta que se envía a los clientes para un viaje."""
+    return {
+        'travel_id': snapshot['id'],
+        'version': snapshot['version'],
+        'travel_state': snapshot['travel_state'],
+        'time': snapshot['time'].isoformat(),
+        'available_seats': snapshot['capacity'] - snapshot['taken'],
+    }
+
+
+def touch_travels_on_commit(travel_ids, bump=True):
+    """Programa `touch_travels` para cuando la transacción actual se confirme."""
+    travel_ids = set(travel_ids)
+    if travel_ids:
+        transaction.on_commit(lambda: touch_travels(travel_ids, bump))
+
+
+def touch_travels(travel_ids, bump=True):
+    """
+    Incrementa la versión de los viajes (si `bump`) y envía sus deltas. Dos
+    consultas por llamada, sin importar cuántos viajes se toquen.
+    """
+    travel_ids = set(travel_ids)
+    if not travel_ids:
+        return
+    if bump:
+        Travel.objects.filter(id__in=travel_ids).update(version=F('version') + 1, updated_at=timezone.now())
+    by_institution = defaultdict(list)
+    for snapshot in travel_snapshots(travel_ids):
+        if snapshot['institution_id']:
+            by_institution[snapshot['institution_id']].append(delta_for(snapshot))
+    for institution_id, deltas in by_institution.items():
+        # Los listados en caché de la institución ya no reflejan estos viajes.
+        bump_institution_generation(institution_id)
+        publish(institution_id, {"type": "travel_delta", "travels": deltas})
+
+
+def publish_removed(travel_id, institution_id):
+    """Avisa que un viaje se eliminó y debe quitarse del listado."""
+    if institution_id:
+        transaction.on_commit(lambda: bump_institution_generation(institution_id))
+        publish(institution_id, {"type": "travel_removed", "travel_id": travel_id})
+
+
+def publish(institution_id, message):
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        async_to_sync(channel_layer.group_send)(feed_group_name(institution_id), message)
+
+    transaction.on_commit(send)
@@ -0,0 +1,31 @@
+# server/travel/management/commands/materialize_schedules.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from travel.schedules import materialize_all
+
+
+class Command(BaseCommand):
+    """
+    Define el comando `manage.py materialize_schedules`.
+    Genera los viajes de todas las programaciones activas dentro del horizonte.
+    Pensado para ejecutarse a diario (por ejemplo, desde cron) de modo que el
+    horizonte avance con el tiempo.
+    """
+    help = 'Genera los viajes de las programaciones recurrentes activas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days',
+            type=int,
+            default=settings.TRAVEL_SCHEDULE_HORIZON_DAYS,
+            help='Días hacia adelante para los que se generan viajes.',
+        )
+
+    def handle(self, *args, **options):
+        report = materialize_all(horizon_days=options['horizon_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Viajes creados: {report.created}. Actualizados: {report.updated}. '
+            f'Retirados: {report.removed}. Omitidos por conflicto: {report.conflicts}.'
+        ))
@@ -0,0 +1,47 @@
+# server/travel/management/commands/sweep_stale_travels.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from travel.sweeper import sweep_stale_travels
+
+
+class Command(BaseCommand):
+    """
+    Define el comando `manage.py sweep_stale_travels`.
+    Cancela los viajes programados que nunca se iniciaron y completa los que
+    llevan demasiado tiempo en curso. Puede ejecutarse una vez (por ejemplo,
+    desde cron) o de forma continua con `--loop`.
+    """
+    help = 'Cancela o completa los viajes que quedaron activos después de su hora.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Repite el barrido indefinidamente.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=settings.TRAVEL_SWEEP_INTERVAL_SECONDS,
+            help='Segundos entre barridos en modo continuo.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TRAVEL_SWEEP_BATCH_SIZE,
+            help='Viajes actualizados por cada UPDATE.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            report = sweep_stale_travels(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Viajes cancelados: {report.cancelled}. Viajes completados: {report.completed}.'
+            ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,144 @@
+# server/travel/matching.py
+
+"""
+Motor de emparejamiento de pasajeros con viajes programados.
+
+Para cada viaje candidato se calcula el desvío que el conductor tendría que
+hacer para recoger al pasajero en P y dejarlo en D sobre su ruta S → E:
+
+    desvío = d(S, P) + d(P, D) + d(D, E) - d(S, E)
+
+El puntaje combina el desvío, la diferencia con la hora pedida y la
+disponibilidad de cupos; todas las operaciones se hacen con NumPy sobre los
+arreglos de candidatos. Un puntaje menor es mejor.
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, F
+
+from realize.models import Realize
+from route.geo import haversine_m, haversine_many_m
+from .models import Travel
+
+# Resultado del emparejamiento para un viaje.
+MatchResult = namedtuple('MatchResult', ['travel_id', 'score', 'detour_m', 'time_offset_s', 'available_seats'])
+
+
+class CandidateArrays:
+    """
+    Viajes candidatos en forma de arreglos paralelos (uno por atributo), listos
+    para puntuarse de forma vectorizada.
+    """
+
+    def __init__(self, ids, start_lats, start_lngs, end_lats, end_lngs, times, available_seats):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.start_lats = np.asarray(start_lats, dtype=float)
+        self.start_lngs = np.asarray(start_lngs, dtype=float)
+        self.end_lats = np.asarray(end_lats, dtype=float)
+        self.end_lngs = np.asarray(end_lngs, dtype=float)
+        # Hora de salida en segundos desde la época.
+        self.times = np.asarray(times, dtype=float)
+        self.available_seats = np.asarray(available_seats, dtype=np.int64)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Construye los arreglos a partir de tuplas
+        (id, start_lat, start_lng, end_lat, end_lng, time, available_seats).
+        """
+        rows = list(rows)
+        if not rows:
+            return cls([], [], [], [], [], [], [])
+        ids, start_lats, start_lngs, end_lats, end_lngs, times, seats = zip(*rows)
+        return cls(ids, start_lats, start_lngs, end_lats, end_lngs, [t.timestamp() for t in times], seats)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def score_candidates(candidates, origin, destination, departure, window_s, seats=1):
+    """
+    Puntúa todos los candidatos. Devuelve (puntajes, desvíos, diferencias de
+    hora en segundos). Los candidatos no elegibles (sin cupos suficientes,
+    fuera de la ventana o con un desvío mayor a `MATCHING_MAX_DETOUR_M`)
+    reciben puntaje infinito.
+    """
+    weights = settings.MATCHING_WEIGHTS
+    max_detour = settings.MATCHING_MAX_DETOUR_M
+
+    pickup = haversine_many_m(candidates.start_lats, candidates.start_lngs, origin[0], origin[1])
+    ride = haversine_m(origin[0], origin[1], destination[0], destination[1])
+    dropoff = haversine_many_m(destination[0], destination[1], candidates.end_lats, candidates.end_lngs)
+    direct = haversine_many_m(candidates.start_lats, candidates.start_lngs, candidates.end_lats, candidates.end_lngs)
+    detour = np.maximum(pickup + ride + dropoff - direct, 0.0)
+
+    time_offset = candidates.times - departure.timestamp()
+    eligible = (
+        (detour <= max_detour)
+        & (np.abs(time_offset) <= window_s)
+        & (candidates.available_seats >= seats)
+    )
+    # Cada término queda normalizado en [0, 1]: se prefieren desvíos cortos,
+    # horas cercanas a la pedida y viajes con cupos de sobra.
+    scores = (
+        weights['detour'] * detour / max_detour
+        + weights['time'] * np.abs(time_offset) / max(window_s, 1)
+        + weights['seats'] * seats / np.maximum(candidates.available_seats, 1)
+    )
+    return np.where(eligible, scores, np.inf), detour, time_offset
+
+
+def top_k(scores, k):
+    """Índices de los `k` mejores puntajes finitos, ordenados de mejor a peor."""
+    finite = np.flatnonzero(np.isfinite(scores))
+    if len(finite) > k:
+        finite = finite[np.argpartition(scores[finite], k - 1)[:k]]
+    return finite[np.argsort(scores[finite], kind='stable')]
+
+
+def rank_candidates(candidates, origin, destination, departure, window_s, seats=1, k=10):
+    """Puntúa los candidatos y devuelve los `k` mejores como `MatchResult`."""
+    if not len(candidates):
+        return []
+    scores, detour, time_offset = score_candidates(candidates, origin, destination, departure, window_s, seats)
+    return [
+        MatchResult(
+            travel_id=int(candidates.ids[i]),
+            score=float(scores[i]),
+            detour_m=float(detour[i]),
+            time_offset_s=float(time_offset[i]),
+            available_seats=int(candidates.available_seats[i]),
+        )
+        for i in top_k(scores, k)
+    ]
+
+
+def load_candidates(institution_id, departure, window_s):
+    """
+    Carga en una sola consulta los viajes programados de la institución cuya
+    salida cae en la ventana, con las coordenadas de su ruta y los cupos
+    restantes (capacidad del vehículo menos cupos ocupados).
+    """
+    window = timedelta(seconds=window_s)
+    rows = Travel.objects.filter(
+        driver__user__institution_id=institution_id,
+        travel_state='scheduled',
+        time__range=(departure - window, departure + window),
+        route__start_lat__isnull=False,
+        route__end_lat__isnull=False,
+    ).annotate(
+        available_seats=F('vehicle__capacity') - Count('realize', filter=Realize.seat_taken('realize__')),
+    ).values_list(
+        'id', 'route__start_lat', 'route__start_lng', 'route__end_lat', 'route__end_lng', 'time', 'available_seats'
+    )
+    return CandidateArrays.from_rows(rows)
+
+
+def find_matches(institution_id, origin, destination, departure, window_s, seats=1, k=10):
+    """Mejores viajes de la institución para un pasajero (ver `rank_candidates`)."""
+    candidates = load_candidates(institution_id, departure, window_s)
+    return rank_candidates(candidates, origin, destination, departure, window_s, seats, k)
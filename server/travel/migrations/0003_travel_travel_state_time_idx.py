@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-19 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel', '0002_alter_travel_vehicle_travel_chk_price_positive_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='travel',
+            index=models.Index(fields=['travel_state', 'time'], name='travel_state_time_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-19 11:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('driver', '0002_remove_driver_id_driver_created_at_driver_user_and_more'),
+        ('route', '0005_route_spatial_columns'),
+        ('travel', '0003_travel_travel_state_time_idx'),
+        ('vehicle', '0004_alter_vehicle_soat_alter_vehicle_tecnomechanical'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TravelSchedule',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('weekdays', models.PositiveSmallIntegerField()),
+                ('departure_time', models.TimeField()),
+                ('price', models.IntegerField()),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='travel_schedules', to='driver.driver')),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='route.route')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='vehicle.vehicle')),
+            ],
+            options={
+                'db_table': 'travel_schedule',
+            },
+        ),
+        migrations.AddField(
+            model_name='travel',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='travels', to='travel.travelschedule'),
+        ),
+        migrations.AddConstraint(
+            model_name='travel',
+            constraint=models.UniqueConstraint(condition=models.Q(('schedule__isnull', False), models.Q(('travel_state', 'cancelled'), _negated=True)), fields=('schedule', 'time'), name='uniq_travel_schedule_time'),
+        ),
+        migrations.AddConstraint(
+            model_name='travelschedule',
+            constraint=models.CheckConstraint(condition=models.Q(('price__gte', 0)), name='chk_schedule_price_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='travelschedule',
+            constraint=models.CheckConstraint(condition=models.Q(('weekdays__gt', 0), ('weekdays__lt', 128)), name='chk_schedule_weekdays'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel', '0004_travel_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='travel',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel', '0005_travel_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='travel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='travel',
+            index=models.Index(fields=['updated_at', 'id'], name='travel_updated_idx'),
+        ),
+    ]
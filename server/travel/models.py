@@ -4,6 +4,40 @@ from vehicle.models import Vehicle
 from route.models import Route  
 from django.db.models import Q, CheckConstraint
 
+
+class TravelSchedule(models.Model):
+    """
+    Programación recurrente de un conductor: una misma ruta, vehículo, hora y
+    precio que se repite ciertos días de la semana. Los viajes concretos se
+    generan con `travel.schedules.materialize_schedule`.
+    """
+    id = models.AutoField(primary_key=True)
+    driver = models.ForeignKey(Driver, on_delete=models.CASCADE, related_name='travel_schedules')
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE)
+    route = models.ForeignKey(Route, on_delete=models.CASCADE)
+    # Días de la semana como máscara de bits: bit 0 = lunes, ..., bit 6 = domingo.
+    weekdays = models.PositiveSmallIntegerField()
+    # Hora de salida (hora local, ver TRAVEL_SCHEDULE_TIME_ZONE).
+    departure_time = models.TimeField()
+    price = models.IntegerField()
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'travel_schedule'
+        constraints = [
+            CheckConstraint(check=Q(price__gte=0), name='chk_schedule_price_positive'),
+            CheckConstraint(check=Q(weekdays__gt=0) & Q(weekdays__lt=128), name='chk_schedule_weekdays'),
+        ]
+
+    def runs_on(self, weekday):
+        """Indica si la programación incluye el día `weekday` (0 = lunes)."""
+        return bool(self.weekdays & (1 << weekday))
+
+
 class Travel(models.Model):
     TRAVEL_STATES = [
         ('scheduled', 'Scheduled'),
@@ -19,9 +53,24 @@ class Travel(models.Model):
     time = models.DateTimeField()
     travel_state = models.CharField(max_length=50)
     price = models.IntegerField()
+    # Programación recurrente que generó el viaje (None si se creó a mano).
+    schedule = models.ForeignKey(
+        TravelSchedule, on_delete=models.SET_NULL, null=True, blank=True, related_name='travels'
+    )
+    # Se incrementa con cada cambio del viaje o de sus reservas (ver travel.feed).
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Última modificación, para la sincronización incremental (ver `sync`).
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'travel'
+        indexes = [
+            # Búsquedas por estado y hora (viajes activos, barrido de viajes abandonados).
+            models.Index(fields=['travel_state', 'time'], name='travel_state_time_idx'),
+            # Recorrido por (updated_at, id) de `/api/sync/`. La institución del
+            # conductor está en otra tabla, así que el índice no la incluye.
+            models.Index(fields=['updated_at', 'id'], name='travel_updated_idx'),
+        ]
         constraints = [
             # Price must be >= 0
             CheckConstraint(check=Q(price__gte=0), name='chk_price_positive'),
@@ -30,5 +79,12 @@ class Travel(models.Model):
             CheckConstraint(
                 check=Q(travel_state__in=['scheduled', 'in_progress', 'completed', 'cancelled']),
                 name='travel_travel_state_check'
+            ),
+
+            # Una programación genera como máximo un viaje vigente por hora de salida.
+            models.UniqueConstraint(
+                fields=['schedule', 'time'],
+                condition=Q(schedule__isnull=False) & ~Q(travel_state='cancelled'),
+                name='uniq_travel_schedule_time'
             )
         ]
\ No newline at end of file
@@ -0,0 +1,102 @@
+# server/travel/projections.py
+
+"""
+Proyecciones (ver `config.projection`) de los listados de viajes.
+
+Producen exactamente la misma respuesta que `TravelDetailSerializer` y
+`DriverTravelWithReservationsSerializer`, pero los campos calculados se
+resuelven para todo el lote con consultas agrupadas: el promedio de cada
+conductor, los cupos ocupados de cada viaje y las reservas visibles, en
+lugar de dos consultas por viaje.
+"""
+
+from django.db.models import Avg, Count
+
+from assessment.models import Assessment
+from config.projection import OMIT, Projection
+from realize.models import Realize
+from realize.tokens import make_qr_token
+from .serializers import DriverTravelWithReservationsSerializer, RealizeInfoSerializer, TravelDetailSerializer
+
+RESERVATION_PROJECTION = Projection(
+    RealizeInfoSerializer,
+    computed={
+        'qr_token': lambda row, extra, context: make_qr_token(row['id'], row['travel']),
+    },
+    extra_columns=('travel',),
+)
+
+
+def reservations_by_travel(travel_ids):
+    """Reservas serializadas de los viajes dados, agrupadas por viaje."""
+    grouped = {}
+    if not travel_ids:
+        return grouped
+    rows = RESERVATION_PROJECTION.rows(Realize.objects.filter(travel_id__in=travel_ids).order_by('id'))
+    for row, data in zip(rows, RESERVATION_PROJECTION.render_rows(rows)):
+        grouped.setdefault(row['travel'], []).append(data)
+    return grouped
+
+
+def travel_detail_extras(rows, context):
+    travel_ids = [row['id'] for row in rows]
+    scores = dict(
+        Assessment.objects.filter(driver_id__in={row['driver'] for row in rows})
+        .order_by().values('driver').annotate(average=Avg('score')).values_list('driver', 'average')
+    )
+    taken = dict(
+        Realize.objects.filter(Realize.seat_taken(), travel_id__in=travel_ids)
+        .order_by().values('travel').annotate(total=Count('id')).values_list('travel', 'total')
+    )
+    # Las reservas solo se muestran al conductor del viaje y nunca en la
+    # respuesta compartida de la caché por institución.
+    own = set()
+    request = context.get('request')
+    if request is not None and not context.get('shared_response'):
+        own = {row['id'] for row in rows if row['driver'] == request.user.pk}
+    return {
+        'scores': scores,
+        'taken': taken,
+        'own': own,
+        'reservations': reservations_by_travel(own),
+    }
+
+
+def driver_score(row, extra, context):
+    average = extra['scores'].get(row['driver'])
+    return round(average, 2) if average is not None else None
+
+
+def available_seats(row, extra, context):
+    return row['vehicle__capacity'] - extra['taken'].get(row['id'], 0)
+
+
+def visible_reservations(row, extra, context):
+    if row['id'] not in extra['own']:
+        return OMIT
+    return extra['reservations'].get(row['id'], [])
+
+
+TRAVEL_DETAIL_PROJECTION = Projection(
+    TravelDetailSerializer,
+    computed={
+        'driver_score': driver_score,
+        'available_seats': available_seats,
+        'reservations': visible_reservations,
+    },
+    extra_columns=('driver', 'vehicle__capacity'),
+    prefetch=travel_detail_extras,
+)
+
+
+def driver_travel_extras(rows, context):
+    return {'reservations': reservations_by_travel([row['id'] for row in rows])}
+
+
+DRIVER_TRAVEL_PROJECTION = Projection(
+    DriverTravelWithReservationsSerializer,
+    computed={
+        'reservations': lambda row, extra, context: extra['reservations'].get(row['id'], []),
+    },
+    prefetch=driver_travel_extras,
+)
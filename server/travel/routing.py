@@ -1,8 +1,10 @@
 from django.urls import path
-from .consumers import LocationConsumer, InstitutionMapConsumer
+from .consumers import LocationConsumer, InstitutionMapConsumer, InstitutionTravelFeedConsumer
 
 websocket_urlpatterns = [
     path('ws/travel/<str:travel_id>/', LocationConsumer.as_asgi()),
 
     path('ws/institution/live_map/', InstitutionMapConsumer.as_asgi()),
+
+    path('ws/institution/travel_feed/', InstitutionTravelFeedConsumer.as_asgi()),
 ]
\ No newline at end of file
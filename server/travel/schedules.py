@@ -0,0 +1,182 @@
+# server/travel/schedules.py
+
+"""
+Materialización de programaciones recurrentes (`TravelSchedule`) en viajes.
+
+Para cada programación se calculan las horas de salida que caen dentro del
+horizonte (por defecto las próximas dos semanas) y se comparan con los viajes
+futuros que ya generó:
+
+- las horas nuevas se insertan con un único `bulk_create`, omitiendo las que
+  quedan demasiado cerca de otro viaje activo del mismo conductor;
+- los viajes cuya hora ya no corresponde (se editaron los días o la hora) se
+  eliminan, o se cancelan si ya tienen reservas;
+- los viajes que siguen vigentes pero con otro vehículo, ruta o precio se
+  actualizan con un solo UPDATE.
+
+Así, editar una programación solo toca las instancias futuras que cambiaron.
+La restricción única (schedule, time) evita duplicados si dos
+materializaciones corren a la vez.
+"""
+
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import state_machine
+from .feed import touch_travels_on_commit
+from .models import Travel, TravelSchedule
+
+MaterializeReport = namedtuple('MaterializeReport', ['created', 'updated', 'removed', 'conflicts'])
+
+# Estados de los viajes que ocupan al conductor a su hora de salida.
+ACTIVE_STATES = (state_machine.STATE_SCHEDULED, state_machine.STATE_IN_PROGRESS)
+
+
+def weekdays_to_mask(weekdays):
+    """Convierte una lista de días (0 = lunes, ..., 6 = domingo) en máscara de bits."""
+    mask = 0
+    for day in weekdays:
+        mask |= 1 << day
+    return mask
+
+
+def mask_to_weekdays(mask):
+    """Operación inversa de `weekdays_to_mask`."""
+    return [day for day in range(7) if mask & (1 << day)]
+
+
+def occurrences(schedule, start, end):
+    """
+    Horas de salida (datetimes con zona horaria) de la programación entre
+    `start` (inclusive) y `end` (exclusive).
+    """
+    tz = ZoneInfo(settings.TRAVEL_SCHEDULE_TIME_ZONE)
+    day = max(start.astimezone(tz).date(), schedule.start_date)
+    last = end.astimezone(tz).date()
+    if schedule.end_date:
+        last = min(last, schedule.end_date)
+    result = []
+    while day <= last:
+        if schedule.runs_on(day.weekday()):
+            departure = datetime.combine(day, schedule.departure_time, tzinfo=tz)
+            if start <= departure < end:
+                result.append(departure)
+        day += timedelta(days=1)
+    return result
+
+
+def materialize_schedule(schedule, now=None, horizon_days=None):
+    """
+    Sincroniza los viajes futuros de `schedule` con su definición actual.
+    Una programación inactiva no tiene horas vigentes, así que materializarla
+    retira sus viajes futuros. Devuelve un `MaterializeReport`.
+    """
+    now = now or timezone.now()
+    horizon_days = horizon_days or settings.TRAVEL_SCHEDULE_HORIZON_DAYS
+    wanted = set(occurrences(schedule, now, now + timedelta(days=horizon_days))) if schedule.active else set()
+
+    with transaction.atomic():
+        # Bloquear la programación serializa materializaciones simultáneas, de
+        # modo que las filas que se cuentan como creadas son las de esta llamada.
+        TravelSchedule.objects.select_for_update().filter(pk=schedule.pk).exists()
+        existing = {
+            row['time']: row
+            for row in Travel.objects.select_for_update().filter(
+                schedule=schedule, time__gte=now, travel_state=state_machine.STATE_SCHEDULED
+            ).values('id', 'time', 'vehicle_id', 'route_id', 'price')
+        }
+
+        missing = wanted - existing.keys()
+        busy = conflicting_departures(schedule, missing)
+        new_times = missing - busy
+        Travel.objects.bulk_create([
+            Travel(
+                driver_id=schedule.driver_id,
+                vehicle_id=schedule.vehicle_id,
+                route_id=schedule.route_id,
+                time=departure,
+                travel_state=state_machine.STATE_SCHEDULED,
+                price=schedule.price,
+                schedule=schedule,
+            )
+            for departure in sorted(new_times)
+        ], ignore_conflicts=True)
+        # Con ignore_conflicts los objetos no reciben su ID y no se sabe cuáles
+        # chocaron (p. ej. con un viaje de la programación ya en curso): los
+        # insertados se buscan por hora entre los viajes programados.
+        created = list(Travel.objects.filter(
+            schedule=schedule, time__in=new_times, travel_state=state_machine.STATE_SCHEDULED
+        ).values_list('id', flat=True)) if new_times else []
+        touch_travels_on_commit(created, bump=False)
+
+        stale = [row['id'] for departure, row in existing.items() if departure not in wanted]
+        removed = retire_travels(stale)
+
+        changed = [
+            row['id'] for departure, row in existing.items()
+            if departure in wanted and (row['vehicle_id'], row['route_id'], row['price'])
+            != (schedule.vehicle_id, schedule.route_id, schedule.price)
+        ]
+        updated = Travel.objects.filter(id__in=changed).update(
+            vehicle_id=schedule.vehicle_id, route_id=schedule.route_id, price=schedule.price,
+            updated_at=timezone.now(),
+        ) if changed else 0
+        touch_travels_on_commit(changed)
+
+    return MaterializeReport(len(created), updated, removed, len(busy))
+
+
+def conflicting_departures(schedule, departures):
+    """
+    Horas de `departures` que quedan a menos de TRAVEL_SCHEDULE_CONFLICT_MINUTES
+    de otro viaje activo del mismo conductor. Una sola consulta para todo el rango.
+    """
+    if not departures:
+        return set()
+    margin = timedelta(minutes=settings.TRAVEL_SCHEDULE_CONFLICT_MINUTES)
+    others = sorted(Travel.objects.filter(
+        driver_id=schedule.driver_id,
+        travel_state__in=ACTIVE_STATES,
+        time__range=(min(departures) - margin, max(departures) + margin),
+    ).exclude(schedule=schedule).values_list('time', flat=True))
+    busy = set()
+    for departure in departures:
+        i = bisect_left(others, departure - margin)
+        if i < len(others) and others[i] < departure + margin:
+            busy.add(departure)
+    return busy
+
+
+def retire_travels(travel_ids):
+    """
+    Retira viajes programados que ya no corresponden a su programación: se
+    eliminan si nadie los reservó y se cancelan (con su evento) si ya tienen
+    reservas. Debe llamarse dentro de una transacción con las filas bloqueadas.
+    """
+    if not travel_ids:
+        return 0
+    reserved = list(Travel.objects.filter(
+        id__in=travel_ids, realize__isnull=False
+    ).distinct().values_list('id', 'driver_id'))
+    cancelled = state_machine.apply_batch_transition(state_machine.ACTION_CANCEL, reserved)
+    _, deleted = Travel.objects.filter(id__in=travel_ids, realize__isnull=True).delete()
+    return cancelled + deleted.get(Travel._meta.label, 0)
+
+
+def materialize_all(now=None, horizon_days=None):
+    """
+    Materializa las programaciones activas de conductores aprobados. Devuelve
+    el reporte agregado.
+    """
+    totals = MaterializeReport(0, 0, 0, 0)
+    schedules = TravelSchedule.objects.filter(active=True, driver__validate_state='approved')
+    for schedule in schedules.iterator():
+        report = materialize_schedule(schedule, now, horizon_days)
+        totals = MaterializeReport(*(a + b for a, b in zip(totals, report)))
+    return totals
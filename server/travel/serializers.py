@@ -2,10 +2,14 @@
 
 from rest_framework import serializers
 from django.db.models import Avg
-from .models import Travel, Vehicle, Driver
+from django.db.models import Exists, OuterRef
+from .models import Travel, TravelSchedule, Vehicle, Driver
+from .schedules import mask_to_weekdays, weekdays_to_mask
 from users.models import Users
 from realize.models import Realize
+from realize.tokens import qr_token_for
 from route.models import Route
+from config.sparse_fields import SparseFieldsSerializerMixin
 
 # --- Serializadores existentes (sin cambios) ---
 class TravelSerializer(serializers.ModelSerializer):
@@ -23,9 +27,15 @@ class TravelSerializer(serializers.ModelSerializer):
         return data
 
 class RouteSerializer(serializers.ModelSerializer):
+    # Campos explícitos: las columnas internas de la ruta (coordenadas
+    # desnormalizadas para la búsqueda por proximidad, ruta canónica y
+    # `updated_at` de la sincronización) no viajan en el feed.
     class Meta:
         model = Route
-        fields = '__all__'
+        fields = [
+            'id', 'driver', 'startLocation', 'destination',
+            'startPointCoords', 'endPointCoords'
+        ]
         ref_name = 'TravelRouteInfo'
 
 class TravelInfoSerializer(serializers.ModelSerializer):
@@ -36,7 +46,10 @@ class TravelInfoSerializer(serializers.ModelSerializer):
 class VehicleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehicle
-        fields = '__all__'
+        fields = [
+            'id', 'driver', 'plate', 'brand', 'model', 'vehicle_type',
+            'category', 'soat', 'tecnomechanical', 'capacity'
+        ]
         ref_name = "TravelVehicleInfo"
 
 class UserForDriverSerializer(serializers.ModelSerializer):
@@ -57,15 +70,22 @@ class RealizeInfoSerializer(serializers.ModelSerializer):
     dentro de la lista de detalles de un viaje.
     """
     user = UserForDriverSerializer(read_only=True)
+    # Token firmado del código QR de abordaje (ver `realize.tokens`).
+    qr_token = serializers.SerializerMethodField()
+
     class Meta:
         model = Realize
-        fields = ['id', 'user', 'status']
+        fields = ['id', 'user', 'status', 'qr_token']
+
+    def get_qr_token(self, obj):
+        return qr_token_for(obj)
 
 # --- SERIALIZADOR PRINCIPAL MODIFICADO ---
-class TravelDetailSerializer(serializers.ModelSerializer):
+class TravelDetailSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializador enriquecido para la lista de viajes.
     Muestra condicionalmente la lista de reservaciones.
+    Admite `?fields=` y `?expand=` (ver `config.sparse_fields`).
     """
     driver = DriverSerializer(read_only=True)
     vehicle = VehicleSerializer(read_only=True)
@@ -79,11 +99,21 @@ class TravelDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Travel
         fields = [
-            'id', 'time', 'travel_state', 'price',
+            'id', 'time', 'travel_state', 'price', 'version',
             'driver', 'vehicle', 'route',
             'driver_score', 'available_seats',
             'reservations' # <-- El campo está aquí, pero se mostrará condicionalmente.
         ]
+
+    expandable_fields = ('driver', 'vehicle', 'route')
+    field_requirements = {
+        'driver': {'select_related': ['driver__user']},
+        'vehicle': {'select_related': ['vehicle']},
+        'route': {'select_related': ['route']},
+        'driver_score': {'select_related': ['driver']},
+        'available_seats': {'select_related': ['vehicle']},
+        'reservations': {'only': ['driver'], 'prefetch_related': ['realize__user']},
+    }
   
     def get_driver_score(self, obj):
         average = obj.driver.assessments.aggregate(Avg('score'))['score__avg']
@@ -91,11 +121,9 @@ class TravelDetailSerializer(serializers.ModelSerializer):
 
     def get_available_seats(self, obj):
         total_capacity = obj.vehicle.capacity
-        confirmed_reservations = Realize.objects.filter(
-            travel=obj,
-            status=Realize.STATUS_CONFIRMED
-        ).count()
-        return total_capacity - confirmed_reservations
+        # Confirmadas y con cupo apartado desde la lista de espera.
+        taken_seats = Realize.objects.filter(Realize.seat_taken(), travel=obj).count()
+        return total_capacity - taken_seats
 
     def to_representation(self, instance):
         """
@@ -111,14 +139,17 @@ class TravelDetailSerializer(serializers.ModelSerializer):
         # --- LÓGICA DE PERMISOS ---
         # Si el usuario NO es el conductor de este viaje específico (`instance`),
         # eliminamos el campo 'reservations' de la respuesta para ese viaje.
-        if user != instance.driver.user:
+        # En una respuesta compartida (caché por institución) nunca se incluyen:
+        # la vista las agrega después solo para el conductor.
+        if self.context.get('shared_response') or user.pk != instance.driver_id:
             ret.pop('reservations', None)
             
         return ret
-class DriverTravelWithReservationsSerializer(serializers.ModelSerializer):
+class DriverTravelWithReservationsSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para listar los viajes de un conductor, incluyendo
     una lista anidada de todas las reservaciones para cada viaje.
+    Admite `?fields=` y `?expand=` (ver `config.sparse_fields`).
     """
     # Usamos el RealizeInfoSerializer que ya teníamos para mostrar cada reserva.
     # `source='realize'` utiliza la relación inversa definida en el modelo Realize.
@@ -132,4 +163,71 @@ class DriverTravelWithReservationsSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'time', 'travel_state', 'price',
             'vehicle', 'route', 'reservations'
-        ]
\ No newline at end of file
+        ]
+
+    expandable_fields = ('vehicle', 'route')
+    field_requirements = {
+        'vehicle': {'select_related': ['vehicle']},
+        'route': {'select_related': ['route']},
+        'reservations': {'prefetch_related': ['realize__user']},
+    }
+
+
+class WeekdaysField(serializers.ListField):
+    """Días de la semana como lista (0 = lunes, ..., 6 = domingo), guardados como máscara de bits."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('child', serializers.IntegerField(min_value=0, max_value=6))
+        kwargs.setdefault('allow_empty', False)
+        super().__init__(**kwargs)
+
+    def to_representation(self, data):
+        return mask_to_weekdays(data)
+
+    def to_internal_value(self, data):
+        return weekdays_to_mask(super().to_internal_value(data))
+
+
+class TravelScheduleSerializer(serializers.ModelSerializer):
+    """
+    Serializador de las programaciones recurrentes de un conductor.
+    El vehículo y la ruta se reciben como IDs y su pertenencia al conductor
+    autenticado, junto con que el conductor esté aprobado, se valida con una
+    sola consulta.
+    """
+    vehicle = serializers.IntegerField(source='vehicle_id')
+    route = serializers.IntegerField(source='route_id')
+    weekdays = WeekdaysField()
+
+    class Meta:
+        model = TravelSchedule
+        fields = [
+            'id', 'vehicle', 'route', 'weekdays', 'departure_time',
+            'price', 'start_date', 'end_date', 'active'
+        ]
+
+    def validate_price(self, value):
+        if value < 0:
+            raise serializers.ValidationError("El precio no puede ser negativo.")
+        return value
+
+    def validate(self, data):
+        instance = self.instance
+        vehicle_id = data.get('vehicle_id', instance.vehicle_id if instance else None)
+        route_id = data.get('route_id', instance.route_id if instance else None)
+        start_date = data.get('start_date', instance.start_date if instance else None)
+        end_date = data.get('end_date', instance.end_date if instance else None)
+        if end_date and start_date and end_date < start_date:
+            raise serializers.ValidationError({"end_date": "La fecha final no puede ser anterior a la inicial."})
+
+        driver_id = self.context['request'].user.uid
+        ownership = Vehicle.objects.filter(id=vehicle_id, driver_id=driver_id).annotate(
+            route_ok=Exists(Route.objects.filter(id=route_id, driver_id=OuterRef('driver_id')))
+        ).values('route_ok', 'driver__validate_state').first()
+        if ownership is None:
+            raise serializers.ValidationError({"vehicle": "Este vehículo no pertenece al conductor."})
+        if ownership['driver__validate_state'] != 'approved':
+            raise serializers.ValidationError({"driver": "El conductor no está aprobado."})
+        if not ownership['route_ok']:
+            raise serializers.ValidationError({"route": "Esta ruta no pertenece al conductor."})
+        return data
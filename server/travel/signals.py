@@ -1,8 +1,45 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from .models import Travel
+from .models import Travel, TravelSchedule
+from .feed import publish_removed, touch_travels_on_commit
+from realize.models import Realize
+from users.models import Users
+from vehicle.models import Vehicle
+from assessment.models import Assessment
+from config.response_cache import bump_driver_institution_on_commit, bump_institution_generation_on_commit
+
+# Evento de dominio emitido por `travel.state_machine` cuando una transición se
+# confirma en la base de datos. Argumentos: travel_id, driver_id,
+# previous_state y new_state.
+travel_state_changed = Signal()
+
+
+def broadcast_travel_started(travel_id, institution_id):
+    """Avisa a los mapas de la institución que un viaje acaba de comenzar."""
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        f'institution_events_{institution_id}',
+        {
+            "type": "new_travel_started",
+            "travel_id": travel_id
+        }
+    )
+
+
+def broadcast_travel_ended(travel_id, state):
+    """Avisa a quienes siguen el viaje (conductor, pasajeros, mapas) que terminó."""
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        f'travel_{travel_id}',
+        {
+            "type": "travel_ended",
+            "travel_id": travel_id,
+            "travel_state": state
+        }
+    )
+
 
 @receiver(post_save, sender=Travel)
 def travel_status_changed(sender, instance, created, **kwargs):
@@ -12,17 +49,75 @@ def travel_status_changed(sender, instance, created, **kwargs):
     update_fields = kwargs.get('update_fields') or set()
     
     if instance.travel_state == 'in_progress' and 'travel_state' in update_fields:
-        channel_layer = get_channel_layer()
-        
         if instance.driver.user.institution:
             institution_id = instance.driver.user.institution.id_institution
+            broadcast_travel_started(instance.id, institution_id)
             institution_group_name = f'institution_events_{institution_id}'
+            print(f"SEÑAL: Viaje {instance.id} cambió a 'in_progress'. Notificando a {institution_group_name}")
+
+
+@receiver(travel_state_changed)
+def travel_started_by_state_machine(sender, travel_id, new_state, **kwargs):
+    """
+    Las transiciones de la máquina de estados usan UPDATE y no disparan
+    post_save, así que el aviso de viaje iniciado se envía desde aquí.
+    """
+    if new_state != 'in_progress':
+        return
+    institution_id = Travel.objects.filter(id=travel_id).values_list(
+        'driver__user__institution_id', flat=True
+    ).first()
+    if institution_id:
+        broadcast_travel_started(travel_id, institution_id)
+
+
+@receiver(travel_state_changed)
+def travel_ended_by_state_machine(sender, travel_id, new_state, **kwargs):
+    """Publica el fin del viaje cuando se completa o se cancela."""
+    if new_state in ('completed', 'cancelled'):
+        broadcast_travel_ended(travel_id, new_state)
+
+
+# --- Feed en vivo de viajes por institución (ver travel.feed) ---
+
+@receiver(post_save, sender=Travel)
+def travel_saved_feed(sender, instance, created, **kwargs):
+    """Un viaje nuevo se publica con su versión inicial; uno editado incrementa la versión."""
+    touch_travels_on_commit([instance.id], bump=not created)
+
+
+@receiver(post_delete, sender=Travel)
+def travel_deleted_feed(sender, instance, **kwargs):
+    institution_id = Users.objects.filter(uid=instance.driver_id).values_list('institution_id', flat=True).first()
+    publish_removed(instance.id, institution_id)
+
+
+@receiver(post_save, sender=Realize)
+@receiver(post_delete, sender=Realize)
+def realize_changed_feed(sender, instance, **kwargs):
+    """Crear, cancelar o eliminar una reserva cambia los cupos del viaje."""
+    touch_travels_on_commit([instance.travel_id])
+
+
+# Las transiciones de estado actualizan el feed desde `travel.state_machine`,
+# una vez por lote en lugar de una vez por viaje.
+
+
+# --- Caché de respuestas por institución (ver config.response_cache) ---
+# Los cambios de viajes y reservas invalidan la caché desde travel.feed; aquí
+# se cubren los demás datos que aparecen en los listados.
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_save, sender=Assessment)
+@receiver(post_delete, sender=Assessment)
+@receiver(post_save, sender=TravelSchedule)
+@receiver(post_delete, sender=TravelSchedule)
+def driver_data_changed_response_cache(sender, instance, **kwargs):
+    bump_driver_institution_on_commit(instance.driver_id)
+
 
-            async_to_sync(channel_layer.group_send)(
-                institution_group_name,
-                {
-                    "type": "new_travel_started", 
-                    "travel_id": instance.id
-                }
-            )
-            print(f"SEÑAL: Viaje {instance.id} cambió a 'in_progress'. Notificando a {institution_group_name}")
\ No newline at end of file
+@receiver(post_save, sender=Users)
+def user_changed_response_cache(sender, instance, **kwargs):
+    """Nombre, teléfono o estado de conductor aparecen en los listados."""
+    bump_institution_generation_on_commit(instance.institution_id)
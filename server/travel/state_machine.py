@@ -0,0 +1,148 @@
+# server/travel/state_machine.py
+
+"""
+Máquina de estados del ciclo de vida de un viaje.
+
+Cada transición es una sola sentencia UPDATE condicional (comparar y asignar):
+
+    UPDATE travel SET travel_state = 'in_progress'
+    WHERE id = ... AND driver = ... AND travel_state = 'scheduled'
+      AND <el conductor está aprobado>
+
+Si dos peticiones llegan a la vez, solo una cambia el estado. La base de datos
+solo se vuelve a consultar cuando el UPDATE no afecta ninguna fila, para
+explicar el motivo (viaje inexistente, ajeno, conductor no aprobado o estado
+incompatible).
+
+Los eventos de dominio (`travel_state_changed`) se emiten con
+`transaction.on_commit`, de modo que nadie se entera de un cambio que termina
+revirtiéndose. El feed en vivo (`travel.feed`) se actualiza también al
+confirmar, con una sola llamada por transición o por lote.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .feed import touch_travels_on_commit
+from .models import Travel
+from .signals import travel_state_changed
+
+STATE_SCHEDULED = 'scheduled'
+STATE_IN_PROGRESS = 'in_progress'
+STATE_COMPLETED = 'completed'
+STATE_CANCELLED = 'cancelled'
+
+ACTION_START = 'start'
+ACTION_COMPLETE = 'complete'
+ACTION_CANCEL = 'cancel'
+
+# Acción -> (estados de origen permitidos, estado de destino).
+TRANSITIONS = {
+    ACTION_START: ((STATE_SCHEDULED,), STATE_IN_PROGRESS),
+    ACTION_COMPLETE: ((STATE_IN_PROGRESS,), STATE_COMPLETED),
+    ACTION_CANCEL: ((STATE_SCHEDULED,), STATE_CANCELLED),
+}
+
+# Resultados posibles de una transición.
+OUTCOME_APPLIED = 'applied'
+OUTCOME_ALREADY_IN_STATE = 'already_in_state'
+OUTCOME_NOT_FOUND = 'not_found'
+OUTCOME_NOT_OWNER = 'not_owner'
+OUTCOME_NOT_APPROVED = 'not_approved'
+OUTCOME_CONFLICT = 'conflict'
+
+TransitionResult = namedtuple('TransitionResult', ['travel_id', 'action', 'outcome', 'state'])
+
+
+def transition_travel(action, travel_id, driver_id):
+    """
+    Aplica `action` al viaje `travel_id` en nombre del conductor `driver_id`.
+    Devuelve un `TransitionResult`; si el estado cambió, el evento
+    `travel_state_changed` se envía cuando la transacción se confirma.
+    """
+    sources, target = TRANSITIONS[action]
+    updated = Travel.objects.filter(
+        id=travel_id,
+        driver_id=driver_id,
+        driver__validate_state='approved',
+        travel_state__in=sources,
+    ).update(travel_state=target, updated_at=timezone.now())
+    if not updated:
+        return diagnose_transition(action, travel_id, driver_id)
+
+    # Con un solo estado de origen el estado anterior se conoce sin releer la fila.
+    previous = sources[0] if len(sources) == 1 else None
+    touch_travels_on_commit([travel_id])
+    transaction.on_commit(lambda: travel_state_changed.send(
+        sender=Travel,
+        travel_id=travel_id,
+        driver_id=driver_id,
+        previous_state=previous,
+        new_state=target,
+    ))
+    return TransitionResult(travel_id, action, OUTCOME_APPLIED, target)
+
+
+def diagnose_transition(action, travel_id, driver_id):
+    """Explica por qué una transición no actualizó el viaje (una consulta)."""
+    _, target = TRANSITIONS[action]
+    row = Travel.objects.filter(id=travel_id).values(
+        'driver_id', 'travel_state', 'driver__validate_state'
+    ).first()
+    if row is None:
+        return TransitionResult(travel_id, action, OUTCOME_NOT_FOUND, None)
+    if row['driver_id'] != driver_id:
+        return TransitionResult(travel_id, action, OUTCOME_NOT_OWNER, None)
+    if row['driver__validate_state'] != 'approved':
+        return TransitionResult(travel_id, action, OUTCOME_NOT_APPROVED, row['travel_state'])
+    if row['travel_state'] == target:
+        return TransitionResult(travel_id, action, OUTCOME_ALREADY_IN_STATE, row['travel_state'])
+    return TransitionResult(travel_id, action, OUTCOME_CONFLICT, row['travel_state'])
+
+
+def apply_batch_transition(action, rows):
+    """
+    Aplica `action` a un lote de viajes ya bloqueados por quien llama (por
+    ejemplo, con `select_for_update`). `rows` son tuplas (travel_id, driver_id)
+    de viajes en el estado de origen. Un único UPDATE para todo el lote; al
+    confirmar la transacción se emiten los eventos y el feed se actualiza una
+    sola vez para todo el lote. Devuelve cuántos cambiaron.
+    """
+    if not rows:
+        return 0
+    sources, target = TRANSITIONS[action]
+    updated = Travel.objects.filter(
+        id__in=[travel_id for travel_id, _ in rows],
+        travel_state__in=sources,
+    ).update(travel_state=target, updated_at=timezone.now())
+    previous = sources[0] if len(sources) == 1 else None
+    touch_travels_on_commit([travel_id for travel_id, _ in rows])
+
+    def send_events():
+        for travel_id, driver_id in rows:
+            travel_state_changed.send(
+                sender=Travel,
+                travel_id=travel_id,
+                driver_id=driver_id,
+                previous_state=previous,
+                new_state=target,
+            )
+    transaction.on_commit(send_events)
+    return updated
+
+
+def start_travel(travel_id, driver_id):
+    """Pasa un viaje programado a 'in_progress'."""
+    return transition_travel(ACTION_START, travel_id, driver_id)
+
+
+def complete_travel(travel_id, driver_id):
+    """Pasa un viaje en curso a 'completed'."""
+    return transition_travel(ACTION_COMPLETE, travel_id, driver_id)
+
+
+def cancel_travel(travel_id, driver_id):
+    """Cancela un viaje que aún no ha comenzado."""
+    return transition_travel(ACTION_CANCEL, travel_id, driver_id)
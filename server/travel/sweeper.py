@@ -0,0 +1,74 @@
+# server/travel/sweeper.py
+
+"""
+Barrido periódico de viajes "abandonados".
+
+Un viaje que sigue en 'scheduled' mucho después de su hora de salida nunca se
+inició, y uno que lleva demasiadas horas en 'in_progress' probablemente se
+olvidó de completar. Ambos inflan las consultas de viajes activos (mapas en
+vivo, búsquedas), así que el barrido los cancela o los completa.
+
+Los viajes se buscan con el índice (travel_state, time) y se procesan en lotes:
+cada lote se bloquea con `select_for_update(skip_locked=True)` (para no pelear
+con un conductor que cambia el estado en ese momento) y se actualiza con un
+único UPDATE a través de `travel.state_machine`, que publica los eventos de fin.
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import state_machine
+from .models import Travel
+
+SweepReport = namedtuple('SweepReport', ['cancelled', 'completed'])
+
+
+def sweep_batch(action, source_state, cutoff, batch_size):
+    """
+    Aplica `action` a un lote de hasta `batch_size` viajes en `source_state`
+    con hora anterior a `cutoff`. Devuelve cuántos viajes cambiaron.
+    """
+    with transaction.atomic():
+        rows = list(
+            Travel.objects.select_for_update(skip_locked=True)
+            .filter(travel_state=source_state, time__lt=cutoff)
+            .order_by('time')
+            .values_list('id', 'driver_id')[:batch_size]
+        )
+        return state_machine.apply_batch_transition(action, rows)
+
+
+def sweep_transition(action, source_state, cutoff, batch_size):
+    """Procesa lotes hasta que no queden viajes que cumplan la condición."""
+    total = 0
+    while True:
+        processed = sweep_batch(action, source_state, cutoff, batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def sweep_stale_travels(now=None, batch_size=None):
+    """
+    Cancela los viajes programados que no se iniciaron a tiempo y completa los
+    que llevan demasiado tiempo en curso. Devuelve un `SweepReport`.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.TRAVEL_SWEEP_BATCH_SIZE
+    cancelled = sweep_transition(
+        state_machine.ACTION_CANCEL,
+        state_machine.STATE_SCHEDULED,
+        now - timedelta(minutes=settings.TRAVEL_SWEEP_SCHEDULED_GRACE_MINUTES),
+        batch_size,
+    )
+    completed = sweep_transition(
+        state_machine.ACTION_COMPLETE,
+        state_machine.STATE_IN_PROGRESS,
+        now - timedelta(hours=settings.TRAVEL_SWEEP_IN_PROGRESS_MAX_HOURS),
+        batch_size,
+    )
+    return SweepReport(cancelled, completed)
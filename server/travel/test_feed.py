@@ -0,0 +1,98 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from realize.confirmation import confirm_reservation
+from realize.models import Realize
+from travel import state_machine
+from travel.consumers import InstitutionTravelFeedConsumer
+from travel.feed import feed_group_name
+from travel.models import Travel
+from travel.test_views import TravelSearchTestMixin
+
+
+class TravelFeedTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para los deltas del feed de viajes por institución.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.travel = self._travel(self.near_route, 1)
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(feed_group_name(self.institution.id_institution), self.channel)
+        self.addCleanup(async_to_sync(self.layer.flush))
+
+    def receive(self):
+        return async_to_sync(self.layer.receive)(self.channel)
+
+    def test_new_travel_is_published_with_initial_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            travel = self._travel(self.near_route, 2)
+        message = self.receive()
+        self.assertEqual(message['type'], 'travel_delta')
+        self.assertEqual(message['travels'][0]['travel_id'], travel.id)
+        self.assertEqual(message['travels'][0]['version'], 1)
+        self.assertEqual(message['travels'][0]['available_seats'], 4)
+
+    def test_confirmation_bumps_version_and_seats(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = Realize.objects.create(user=self.user, travel=self.travel, status=Realize.STATUS_PENDING)
+        self.assertEqual(self.receive()['travels'][0]['version'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            confirm_reservation(reservation.id, self.travel.id)
+        delta = self.receive()['travels'][0]
+        self.assertEqual(delta['version'], 3)
+        self.assertEqual(delta['available_seats'], 3)
+        self.assertEqual(Travel.objects.get(id=self.travel.id).version, 3)
+
+    def test_state_transition_is_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            state_machine.cancel_travel(self.travel.id, self.driver.pk)
+        delta = self.receive()['travels'][0]
+        self.assertEqual((delta['travel_state'], delta['version']), ('cancelled', 2))
+
+    def test_deleted_travel_is_removed(self):
+        travel_id = self.travel.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.travel.delete()
+        self.assertEqual(self.receive(), {'type': 'travel_removed', 'travel_id': travel_id})
+
+
+class InstitutionTravelFeedConsumerTest(SimpleTestCase):
+    """
+    Casos de prueba para el consumer del feed de viajes.
+    """
+
+    def communicator(self, **scope):
+        communicator = WebsocketCommunicator(InstitutionTravelFeedConsumer.as_asgi(), '/ws/institution/travel_feed/')
+        communicator.scope.update(scope)
+        return communicator
+
+    def test_forwards_deltas_of_the_institution(self):
+        async def scenario():
+            communicator = self.communicator(user_is_authenticated=True, user_institution_id=7)
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await get_channel_layer().group_send(feed_group_name(7), {
+                'type': 'travel_delta',
+                'travels': [{'travel_id': 1, 'version': 2, 'travel_state': 'scheduled', 'available_seats': 3}],
+            })
+            message = await communicator.receive_json_from()
+            self.assertEqual(message['event'], 'travel_delta')
+            self.assertEqual(message['travels'][0]['version'], 2)
+            await communicator.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_rejects_connections_without_institution(self):
+        async def scenario():
+            connected, code = await self.communicator(user_is_authenticated=True).connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4001)
+
+        async_to_sync(scenario)()
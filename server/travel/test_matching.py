@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from travel.matching import CandidateArrays, rank_candidates, score_candidates, top_k
+
+CAMPUS = (3.3750, -76.5330)
+TERMINAL = (3.4680, -76.5190)
+DEPARTURE = datetime(2026, 10, 19, 7, 0, tzinfo=dt_timezone.utc)
+
+
+def candidates(*rows):
+    """Filas (id, origen, destino, minutos respecto a la salida, cupos)."""
+    return CandidateArrays.from_rows(
+        (travel_id, *start, *end, DEPARTURE + timedelta(minutes=minutes), seats)
+        for travel_id, start, end, minutes, seats in rows
+    )
+
+
+class MatchingEngineTest(SimpleTestCase):
+    """
+    Casos de prueba para el puntaje vectorizado del emparejamiento.
+    """
+
+    def test_no_detour_when_passenger_shares_route(self):
+        """Si el pasajero va del mismo origen al mismo destino, el desvío es nulo."""
+        _, detour, _ = score_candidates(candidates((1, CAMPUS, TERMINAL, 0, 4)), CAMPUS, TERMINAL, DEPARTURE, 3600)
+        self.assertAlmostEqual(detour[0], 0.0, places=3)
+
+    def test_detour_formula(self):
+        """El desvío es d(S,P) + d(P,D) + d(D,E) - d(S,E)."""
+        start, end = (3.3700, -76.5400), (3.4700, -76.5100)
+        _, detour, _ = score_candidates(candidates((1, start, end, 0, 4)), CAMPUS, TERMINAL, DEPARTURE, 3600)
+        from route.geo import haversine_m
+        expected = (haversine_m(*start, *CAMPUS) + haversine_m(*CAMPUS, *TERMINAL)
+                    + haversine_m(*TERMINAL, *end) - haversine_m(*start, *end))
+        self.assertAlmostEqual(detour[0], expected, places=3)
+
+    def test_ineligible_candidates(self):
+        """Los viajes sin cupos, fuera de la ventana o con desvío excesivo quedan fuera."""
+        scores, _, _ = score_candidates(candidates(
+            (1, CAMPUS, TERMINAL, 0, 0),
+            (2, CAMPUS, TERMINAL, 120, 4),
+            (3, (4.6097, -74.0817), TERMINAL, 0, 4),
+            (4, CAMPUS, TERMINAL, 30, 2),
+        ), CAMPUS, TERMINAL, DEPARTURE, 3600, seats=2)
+        self.assertEqual(np.isfinite(scores).tolist(), [False, False, False, True])
+
+    def test_rank_prefers_smaller_detour_and_closer_time(self):
+        """El orden respeta el desvío y la cercanía a la hora pedida."""
+        results = rank_candidates(candidates(
+            (1, (3.3900, -76.5330), TERMINAL, 0, 4),
+            (2, CAMPUS, TERMINAL, 45, 4),
+            (3, CAMPUS, TERMINAL, 5, 4),
+        ), CAMPUS, TERMINAL, DEPARTURE, 3600, k=2)
+        self.assertEqual([result.travel_id for result in results], [3, 2])
+
+    def test_top_k(self):
+        """`top_k` devuelve los mejores puntajes finitos en orden."""
+        scores = np.array([0.5, np.inf, 0.1, 0.3, 0.9])
+        self.assertEqual(top_k(scores, 3).tolist(), [2, 3, 0])
+        self.assertEqual(top_k(scores, 10).tolist(), [2, 3, 0, 4])
+
+    def test_empty_candidates(self):
+        """Sin candidatos no hay resultados."""
+        self.assertEqual(rank_candidates(candidates(), CAMPUS, TERMINAL, DEPARTURE, 3600), [])
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from assessment.models import Assessment
+from assessment.projections import ASSESSMENT_PROJECTION
+from assessment.serializers import AssessmentReadSerializer
+from realize.models import Realize
+from realize.projections import REALIZE_PROJECTION
+from realize.serializers import RealizeSerializer
+from travel.models import Travel
+from travel.projections import DRIVER_TRAVEL_PROJECTION, TRAVEL_DETAIL_PROJECTION
+from travel.serializers import DriverTravelWithReservationsSerializer, TravelDetailSerializer
+from travel.test_views import TravelSearchTestMixin
+from users.models import Users
+
+
+class ProjectionSnapshotTest(TravelSearchTestMixin, APITestCase):
+    """
+    Las proyecciones deben producir exactamente el mismo JSON (valores y orden
+    de las claves) que los serializadores a los que reemplazan.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.passenger = Users.objects.create(
+            full_name="Passenger", user_type=Users.TYPE_STUDENT, institutional_mail="p@university.edu",
+            student_code="1", udocument="1", direction="x", uphone="+1", upassword="x",
+            institution=self.institution, user_state=Users.STATE_APPROVED
+        )
+        self.travels = [self._travel(self.near_route, 1), self._travel(self.far_route, 2), self._travel(self.near_route, 3)]
+        Realize.objects.create(user=self.passenger, travel=self.travels[0], status=Realize.STATUS_CONFIRMED)
+        Realize.objects.create(user=self.user, travel=self.travels[0], status=Realize.STATUS_PENDING)
+        Realize.objects.create(user=self.passenger, travel=self.travels[1], status=Realize.STATUS_PENDING)
+        Assessment.objects.create(travel=self.travels[0], driver=self.driver, user=self.passenger, score=4, comment="Bien")
+        Assessment.objects.create(travel=self.travels[1], driver=self.driver, user=self.passenger, score=5)
+
+    def context_for(self, user, **extra):
+        request = Request(APIRequestFactory().get('/'))
+        request.user = user
+        return {'request': request, **extra}
+
+    def assertSameJSON(self, projected, serialized):
+        self.assertEqual(JSONRenderer().render(projected), JSONRenderer().render(serialized))
+
+    def test_travel_detail(self):
+        queryset = Travel.objects.order_by('-time')
+        for context in (
+            self.context_for(self.user),
+            self.context_for(self.passenger),
+            self.context_for(self.user, shared_response=True),
+        ):
+            self.assertSameJSON(
+                TRAVEL_DETAIL_PROJECTION.render(queryset, context),
+                TravelDetailSerializer(queryset, many=True, context=context).data,
+            )
+
+    def test_driver_travels(self):
+        queryset = Travel.objects.filter(driver=self.driver)
+        self.assertSameJSON(
+            DRIVER_TRAVEL_PROJECTION.render(queryset),
+            DriverTravelWithReservationsSerializer(queryset, many=True).data,
+        )
+
+    def test_realize(self):
+        queryset = Realize.objects.filter(user=self.passenger)
+        self.assertSameJSON(REALIZE_PROJECTION.render(queryset), RealizeSerializer(queryset, many=True).data)
+
+    def test_assessment(self):
+        queryset = Assessment.objects.order_by('-id')
+        self.assertSameJSON(ASSESSMENT_PROJECTION.render(queryset), AssessmentReadSerializer(queryset, many=True).data)
+
+    def test_institution_list_queries_do_not_grow_with_rows(self):
+        # Autenticación, viajes, promedios, cupos confirmados y reservas propias.
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/travel/institution/')
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[-1]['available_seats'], 3)
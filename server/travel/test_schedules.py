@@ -0,0 +1,145 @@
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from rest_framework.test import APITestCase
+
+from realize.models import Realize
+from travel.models import Travel, TravelSchedule
+from travel.schedules import materialize_schedule, weekdays_to_mask
+from travel.test_views import TravelSearchTestMixin
+from users.models import Users
+
+# Lunes 19 de octubre de 2026 a medianoche (UTC).
+MONDAY = datetime(2026, 10, 19, tzinfo=dt_timezone.utc)
+
+
+class TravelScheduleMaterializeTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para la materialización de programaciones recurrentes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.schedule = TravelSchedule.objects.create(
+            driver=self.driver, vehicle=self.vehicle, route_id=self.near_route,
+            weekdays=weekdays_to_mask(range(5)), departure_time=time(7, 0),
+            price=5000, start_date=MONDAY.date()
+        )
+
+    def _travels(self):
+        return Travel.objects.filter(schedule=self.schedule).order_by('time')
+
+    def test_weekdays_over_horizon(self):
+        """Lunes a viernes durante dos semanas: diez viajes a las 7:00 hora de Colombia."""
+        with self.assertNumQueries(7):
+            report = materialize_schedule(self.schedule, now=MONDAY, horizon_days=14)
+        self.assertEqual(report.created, 10)
+        travels = list(self._travels())
+        self.assertEqual(len(travels), 10)
+        self.assertEqual(travels[0].time, datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc))
+        self.assertTrue(all(t.time.weekday() < 5 for t in travels))
+
+        # Materializar de nuevo no crea duplicados.
+        report = materialize_schedule(self.schedule, now=MONDAY, horizon_days=14)
+        self.assertEqual((report.created, report.updated, report.removed), (0, 0, 0))
+
+    def test_edit_only_touches_changed_instances(self):
+        materialize_schedule(self.schedule, now=MONDAY, horizon_days=7)
+        kept = {t.time: t.id for t in self._travels() if t.time.weekday() in (0, 2, 4)}
+        tuesday = self._travels().get(time__date=date(2026, 10, 20))
+        passenger = Users.objects.create(
+            full_name="Passenger", user_type=Users.TYPE_STUDENT, institutional_mail="p@university.edu",
+            student_code="1", udocument="1", direction="x", uphone="+1", upassword="x", institution=self.institution
+        )
+        Realize.objects.create(user=passenger, travel=tuesday, status=Realize.STATUS_PENDING)
+
+        self.schedule.weekdays = weekdays_to_mask([0, 2, 4])
+        self.schedule.price = 6000
+        report = materialize_schedule(self.schedule, now=MONDAY, horizon_days=7)
+
+        self.assertEqual((report.created, report.updated, report.removed), (0, 3, 2))
+        active = self._travels().exclude(travel_state='cancelled')
+        self.assertEqual({t.time: t.id for t in active}, kept)
+        self.assertTrue(all(t.price == 6000 for t in active))
+        # El martes tenía una reserva: se cancela en lugar de eliminarse.
+        tuesday.refresh_from_db()
+        self.assertEqual(tuesday.travel_state, 'cancelled')
+        self.assertFalse(self._travels().filter(time__date=date(2026, 10, 22)).exists())
+
+    def test_conflicting_travels_are_skipped(self):
+        # Viaje manual del conductor 15 minutos después de la salida del martes.
+        Travel.objects.create(
+            driver=self.driver, vehicle=self.vehicle, route_id=self.near_route,
+            time=datetime(2026, 10, 20, 12, 15, tzinfo=dt_timezone.utc), travel_state='scheduled', price=5000
+        )
+        report = materialize_schedule(self.schedule, now=MONDAY, horizon_days=7)
+        self.assertEqual((report.created, report.conflicts), (4, 1))
+        self.assertFalse(self._travels().filter(time__date=date(2026, 10, 20)).exists())
+
+    def test_travels_already_in_progress_are_not_counted(self):
+        """Una salida que ya está en curso choca con la restricción única y no cuenta como creada."""
+        Travel.objects.create(
+            driver=self.driver, vehicle=self.vehicle, route_id=self.near_route, schedule=self.schedule,
+            time=datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc), travel_state='in_progress', price=5000
+        )
+        report = materialize_schedule(self.schedule, now=MONDAY, horizon_days=7)
+        self.assertEqual(report.created, 4)
+        self.assertEqual(self._travels().filter(travel_state='scheduled').count(), 4)
+
+    def test_inactive_schedule_retires_future_travels(self):
+        materialize_schedule(self.schedule, now=MONDAY, horizon_days=7)
+        self.schedule.active = False
+        report = materialize_schedule(self.schedule, now=MONDAY, horizon_days=7)
+        self.assertEqual(report.removed, 5)
+        self.assertFalse(self._travels().exists())
+
+
+class TravelScheduleViewTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para los endpoints de programaciones recurrentes.
+    """
+
+    def payload(self, **overrides):
+        data = {
+            'vehicle': self.vehicle.id, 'route': self.near_route, 'weekdays': [0, 1, 2, 3, 4],
+            'departure_time': '07:00', 'price': 5000, 'start_date': '2020-01-01',
+        }
+        data.update(overrides)
+        return data
+
+    def test_create_materializes_travels(self):
+        response = self.client.post('/api/travel/schedules/', self.payload(), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['weekdays'], [0, 1, 2, 3, 4])
+        self.assertGreater(response.data['materialized']['created'], 0)
+        self.assertEqual(
+            Travel.objects.filter(schedule_id=response.data['id']).count(),
+            response.data['materialized']['created']
+        )
+
+    def test_foreign_vehicle_is_rejected(self):
+        response = self.client.post('/api/travel/schedules/', self.payload(vehicle=self.vehicle.id + 100), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('vehicle', response.data)
+
+    def test_unapproved_driver_is_rejected(self):
+        self.driver.validate_state = 'pending'
+        self.driver.save()
+        response = self.client.post('/api/travel/schedules/', self.payload(), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('driver', response.data)
+        self.assertFalse(TravelSchedule.objects.exists())
+
+    def test_invalid_weekday_is_rejected(self):
+        response = self.client.post('/api/travel/schedules/', self.payload(weekdays=[7]), format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_patch_regenerates_and_delete_retires(self):
+        created = self.client.post('/api/travel/schedules/', self.payload(), format='json').data
+        response = self.client.patch(f'/api/travel/schedules/{created["id"]}/', {'weekdays': [5, 6]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.data['materialized']['removed'], 0)
+
+        response = self.client.delete(f'/api/travel/schedules/{created["id"]}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(TravelSchedule.objects.exists())
+        self.assertFalse(Travel.objects.filter(travel_state='scheduled').exists())
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from assessment.models import Assessment
+from realize.models import Realize
+from travel.models import Travel
+from travel.serializers import TravelDetailSerializer
+from travel.test_views import TravelSearchTestMixin
+
+
+class SparseFieldsTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para `?fields=` y `?expand=` en los listados.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.travel = self._travel(self.near_route, 1)
+        self.reservation = Realize.objects.create(user=self.user, travel=self.travel, status=Realize.STATUS_PENDING)
+
+    def test_without_params_the_response_is_complete(self):
+        item = self.client.get('/api/travel/institution/').data[0]
+        self.assertEqual(item['vehicle']['capacity'], 4)
+        self.assertEqual(item['driver']['user']['uid'], self.user.uid)
+        self.assertEqual(len(item['reservations']), 1)
+
+    def test_nested_route_and_vehicle_omit_internal_columns(self):
+        item = self.client.get('/api/travel/institution/').data[0]
+        self.assertEqual(set(item['route']), {
+            'id', 'driver', 'startLocation', 'destination', 'startPointCoords', 'endPointCoords'
+        })
+        self.assertNotIn('updated_at', item['vehicle'])
+
+    def test_fields_limits_the_response(self):
+        response = self.client.get('/api/travel/institution/', {'fields': 'id,time,price,available_seats'})
+        self.assertEqual(set(response.data[0]), {'id', 'time', 'price', 'available_seats'})
+        self.assertEqual(response.data[0]['available_seats'], 4)
+
+    def test_expand_collapses_the_other_relations(self):
+        response = self.client.get('/api/travel/institution/', {'expand': 'route'})
+        item = response.data[0]
+        self.assertEqual(item['vehicle'], self.vehicle.id)
+        self.assertEqual(item['driver'], self.user.uid)
+        self.assertEqual(item['route']['id'], self.near_route)
+        # Las reservas del conductor se siguen agregando con el conductor reducido a su ID.
+        self.assertEqual(len(item['reservations']), 1)
+
+    def test_unrequested_relations_are_not_loaded(self):
+        for _ in range(3):
+            self._travel(self.near_route, 2)
+        # Autenticación, institución del conductor (ETag) y una sola consulta
+        # de viajes: nada de rutas, vehículos ni reservas.
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/travel/info/%d/' % self.user.uid, {'fields': 'id,time,price'})
+        self.assertEqual(len(response.data), 4)
+
+    def test_pruned_queryset_uses_only(self):
+        request = Request(APIRequestFactory().get('/', {'fields': 'id,price,vehicle', 'expand': ''}))
+        queryset = TravelDetailSerializer.prune_queryset(
+            Travel.objects.select_related('driver__user', 'vehicle', 'route'), request
+        )
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(queryset.query.deferred_loading, (frozenset({'id', 'price', 'vehicle'}), False))
+
+    def test_realize_list_supports_fields(self):
+        response = self.client.get('/api/realize/my-reservations/', {'fields': 'id,status'})
+        self.assertEqual(response.data, [{'id': self.reservation.id, 'status': Realize.STATUS_PENDING}])
+
+    def test_assessment_list_supports_expand(self):
+        Assessment.objects.create(travel=self.travel, driver=self.driver, user=self.user, score=5)
+        response = self.client.get('/api/assessment/assessments/', {'expand': 'driver'})
+        item = response.data[0]
+        self.assertEqual(item['user'], self.user.uid)
+        self.assertEqual(item['travel'], self.travel.id)
+        self.assertEqual(item['driver'], str(self.driver))
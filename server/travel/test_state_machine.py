@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+from rest_framework.test import APITestCase
+
+from driver.models import Driver
+from travel import state_machine
+from travel.models import Travel
+from travel.signals import travel_state_changed
+from travel.test_views import TravelSearchTestMixin
+from users.models import Users
+
+
+class TravelStateMachineTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para las transiciones de estado de los viajes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.travel = self._travel(self.near_route, 1)
+        self.events = []
+        handler = lambda sender, **kwargs: self.events.append(kwargs)
+        travel_state_changed.connect(handler)
+        self.addCleanup(travel_state_changed.disconnect, handler)
+
+    def _state(self):
+        return Travel.objects.values_list('travel_state', flat=True).get(id=self.travel.id)
+
+    def test_transition_is_a_single_update(self):
+        """Una transición válida es un único UPDATE condicional."""
+        with self.assertNumQueries(1):
+            result = state_machine.start_travel(self.travel.id, self.driver.pk)
+        self.assertEqual(result.outcome, state_machine.OUTCOME_APPLIED)
+        self.assertEqual(self._state(), 'in_progress')
+
+    def test_event_is_sent_after_commit(self):
+        """El evento de dominio solo se emite cuando la transacción se confirma."""
+        with patch('travel.signals.broadcast_travel_started') as broadcast:
+            with self.captureOnCommitCallbacks(execute=True):
+                state_machine.start_travel(self.travel.id, self.driver.pk)
+                self.assertEqual(self.events, [])
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0]['previous_state'], 'scheduled')
+        self.assertEqual(self.events[0]['new_state'], 'in_progress')
+        broadcast.assert_called_once_with(self.travel.id, self.institution.id_institution)
+
+    def test_full_lifecycle(self):
+        """Programado → en curso → completado; repetir una acción no emite eventos."""
+        with self.captureOnCommitCallbacks(execute=True):
+            state_machine.start_travel(self.travel.id, self.driver.pk)
+            state_machine.complete_travel(self.travel.id, self.driver.pk)
+            again = state_machine.complete_travel(self.travel.id, self.driver.pk)
+        self.assertEqual(again.outcome, state_machine.OUTCOME_ALREADY_IN_STATE)
+        self.assertEqual(self._state(), 'completed')
+        self.assertEqual([event['new_state'] for event in self.events], ['in_progress', 'completed'])
+
+    def test_conflicts_are_reported(self):
+        """Las transiciones desde un estado incompatible no modifican el viaje."""
+        result = state_machine.complete_travel(self.travel.id, self.driver.pk)
+        self.assertEqual(result.outcome, state_machine.OUTCOME_CONFLICT)
+        self.assertEqual(result.state, 'scheduled')
+
+        state_machine.start_travel(self.travel.id, self.driver.pk)
+        result = state_machine.cancel_travel(self.travel.id, self.driver.pk)
+        self.assertEqual(result.outcome, state_machine.OUTCOME_CONFLICT)
+        self.assertEqual(self._state(), 'in_progress')
+
+    def test_owner_and_approval_are_checked(self):
+        """Solo el conductor aprobado dueño del viaje puede cambiar su estado."""
+        other = Users.objects.create(
+            full_name="Other", user_type=Users.TYPE_DRIVER, institutional_mail="other@university.edu",
+            student_code="2023002", udocument="87654321", direction="x", uphone="+1", upassword="x",
+            institution=self.institution
+        )
+        Driver.objects.create(user=other, validate_state='approved')
+        result = state_machine.start_travel(self.travel.id, other.uid)
+        self.assertEqual(result.outcome, state_machine.OUTCOME_NOT_OWNER)
+
+        Driver.objects.filter(pk=self.driver.pk).update(validate_state='pending')
+        result = state_machine.start_travel(self.travel.id, self.driver.pk)
+        self.assertEqual(result.outcome, state_machine.OUTCOME_NOT_APPROVED)
+
+        result = state_machine.start_travel(self.travel.id + 100, self.driver.pk)
+        self.assertEqual(result.outcome, state_machine.OUTCOME_NOT_FOUND)
+        self.assertEqual(self._state(), 'scheduled')
+        self.assertEqual(self.events, [])
+
+
+class DriverTravelLifecycleViewTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para los endpoints de inicio, finalización y cancelación.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.travel = self._travel(self.near_route, 1)
+
+    def test_start_then_complete(self):
+        response = self.client.post(f'/api/driver/travel/{self.travel.id}/start/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['travel_state'], 'in_progress')
+
+        response = self.client.patch(f'/api/driver/travel/{self.travel.id}/complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('message', response.data)
+
+    def test_invalid_transition_returns_conflict(self):
+        response = self.client.patch(f'/api/driver/travel/{self.travel.id}/complete/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['outcome'], state_machine.OUTCOME_CONFLICT)
+
+    def test_cancel_scheduled_travel(self):
+        response = self.client.post(f'/api/driver/travel/{self.travel.id}/cancel/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(f'/api/driver/travel/{self.travel.id}/start/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_unknown_travel_returns_404(self):
+        response = self.client.post(f'/api/driver/travel/{self.travel.id + 100}/start/')
+        self.assertEqual(response.status_code, 404)
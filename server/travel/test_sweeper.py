@@ -0,0 +1,68 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from travel.models import Travel
+from travel.signals import travel_state_changed
+from travel.sweeper import sweep_stale_travels
+from travel.test_views import TravelSearchTestMixin
+
+
+class TravelSweeperTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para el barrido de viajes abandonados.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stale = [self._travel(self.near_route, -3), self._travel(self.near_route, -4)]
+        self.recent = self._travel(self.near_route, -0.5)
+        self.forgotten = self._travel(self.near_route, -10, state='in_progress')
+        self.ongoing = self._travel(self.near_route, -2, state='in_progress')
+        self.events = []
+        handler = lambda sender, **kwargs: self.events.append((kwargs['travel_id'], kwargs['new_state']))
+        travel_state_changed.connect(handler)
+        self.addCleanup(travel_state_changed.disconnect, handler)
+
+    def _state(self, travel):
+        return Travel.objects.values_list('travel_state', flat=True).get(id=travel.id)
+
+    def test_sweep_transitions_stale_travels_in_batches(self):
+        with patch('travel.signals.broadcast_travel_ended') as broadcast:
+            with self.captureOnCommitCallbacks(execute=True):
+                report = sweep_stale_travels(batch_size=1)
+        self.assertEqual((report.cancelled, report.completed), (2, 1))
+        self.assertEqual([self._state(t) for t in self.stale], ['cancelled', 'cancelled'])
+        self.assertEqual(self._state(self.recent), 'scheduled')
+        self.assertEqual(self._state(self.forgotten), 'completed')
+        self.assertEqual(self._state(self.ongoing), 'in_progress')
+        self.assertCountEqual(self.events, [
+            (self.stale[0].id, 'cancelled'), (self.stale[1].id, 'cancelled'), (self.forgotten.id, 'completed'),
+        ])
+        self.assertEqual(broadcast.call_count, 3)
+
+    def test_feed_is_touched_once_per_batch(self):
+        """El feed se actualiza con dos consultas por lote, sin importar cuántos viajes tenga."""
+        self.stale += [self._travel(self.near_route, -hours) for hours in range(5, 10)]
+        with self.captureOnCommitCallbacks() as callbacks:
+            report = sweep_stale_travels()
+        self.assertEqual((report.cancelled, report.completed), (7, 1))
+        with patch('travel.signals.broadcast_travel_ended'), patch('travel.feed.publish') as publish:
+            # Versión + estado de los viajes, para el lote cancelado y el completado.
+            with self.assertNumQueries(4):
+                for callback in callbacks:
+                    callback()
+        self.assertEqual(publish.call_count, 2)
+        self.assertEqual(len(publish.call_args_list[0].args[1]['travels']), 7)
+
+    def test_second_sweep_is_a_no_op(self):
+        sweep_stale_travels()
+        report = sweep_stale_travels()
+        self.assertEqual((report.cancelled, report.completed), (0, 0))
+
+    def test_command_reports_counts(self):
+        out = StringIO()
+        call_command('sweep_stale_travels', stdout=out)
+        self.assertIn('Viajes cancelados: 2. Viajes completados: 1.', out.getvalue())
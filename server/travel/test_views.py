@@ -316,4 +316,179 @@ class TravelViewsTest(APITestCase):
         response = self.client.get(f'/api/travel/info/{self.driver.user.uid}/')
         
         # Should return 403 (authentication failed)
-        self.assertEqual(response.status_code, 403) 
\ No newline at end of file
+        self.assertEqual(response.status_code, 403) 
+
+class TravelSearchTestMixin:
+    """Shared data for the travel search endpoints: one driver with two routes."""
+
+    def setUp(self):
+        from route.proximity import invalidate_route_index
+        from route.test_canonical import insert_route_row
+
+        invalidate_route_index()
+        self.addCleanup(invalidate_route_index)
+        self.institution = Institution.objects.create(official_name="Test University", email="test@university.edu")
+        self.user = Users.objects.create(
+            full_name="Test Driver",
+            user_type=Users.TYPE_DRIVER,
+            institutional_mail="driver@university.edu",
+            student_code="2023001",
+            udocument="12345678",
+            direction="123 Driver Street",
+            uphone="+1234567890",
+            upassword=make_password("driverpass123"),
+            institution=self.institution,
+            user_state=Users.STATE_APPROVED,
+            driver_state=Users.DRIVER_STATE_APPROVED
+        )
+        self.driver = Driver.objects.create(user=self.user, validate_state='approved')
+        self.vehicle = Vehicle.objects.create(
+            driver=self.driver,
+            plate="ABC123",
+            brand="Toyota",
+            model="Corolla",
+            vehicle_type="Sedan",
+            category="metropolitano",
+            soat=datetime.now().date() + timedelta(days=365),
+            tecnomechanical=datetime.now().date() + timedelta(days=365),
+            capacity=4
+        )
+        self.near_route = insert_route_row(self.driver, start=(3.3755, -76.5333), end=(3.4684, -76.5193))
+        self.far_route = insert_route_row(self.driver, start=(3.4500, -76.5330), end=(3.4684, -76.5193))
+        token = jwt.encode(
+            {'user_id': self.user.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _travel(self, route_id, hours, state='scheduled'):
+        return Travel.objects.create(
+            driver=self.driver, vehicle=self.vehicle, route_id=route_id,
+            time=timezone.now() + timedelta(hours=hours), travel_state=state, price=5000
+        )
+
+
+class NearbyTravelListViewTest(TravelSearchTestMixin, APITestCase):
+    """Test cases for the proximity search endpoint."""
+
+    def test_nearby_travels_in_time_window(self):
+        """Only scheduled travels of nearby routes inside the window are returned."""
+        later = self._travel(self.near_route, 3)
+        sooner = self._travel(self.near_route, 1)
+        self._travel(self.near_route, 48)
+        self._travel(self.near_route, 2, state='cancelled')
+        self._travel(self.far_route, 1)
+
+        response = self.client.get('/api/travel/nearby/', {
+            'origin': '3.3750,-76.5330', 'destination': '3.4680,-76.5190', 'radius_km': '1',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [sooner.id, later.id])
+        self.assertLess(response.data[0]['origin_distance_m'], 100)
+        self.assertLess(response.data[0]['destination_distance_m'], 100)
+
+    def test_nearby_requires_origin(self):
+        """The origin parameter is mandatory."""
+        response = self.client.get('/api/travel/nearby/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_nearby_rejects_large_radius(self):
+        """Radii over PROXIMITY_MAX_RADIUS_KM are rejected."""
+        response = self.client.get('/api/travel/nearby/', {'origin': '3.3750,-76.5330', 'radius_km': '1000'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_nearby_rejects_invalid_origin(self):
+        """Non-finite or out-of-range coordinates are a 400, not a crash in the spatial index."""
+        for origin in ('nan,-76.5', '1e300,1e300', '3.37,inf', '91,0'):
+            response = self.client.get('/api/travel/nearby/', {'origin': origin})
+            self.assertEqual(response.status_code, 400, origin)
+            self.assertIn('error', response.json())
+
+    def test_nearby_rejects_non_finite_radius(self):
+        """NaN and infinity fail every range comparison, so they are rejected explicitly."""
+        for radius in ('nan', 'inf', '-inf'):
+            response = self.client.get('/api/travel/nearby/', {'origin': '3.3750,-76.5330', 'radius_km': radius})
+            self.assertEqual(response.status_code, 400, radius)
+
+
+class TravelMatchViewTest(TravelSearchTestMixin, APITestCase):
+    """Test cases for the ride matching endpoint."""
+
+    def test_match_ranks_by_detour_and_time(self):
+        """The travel along the passenger's way comes first; full, distant and out-of-window travels are skipped."""
+        from realize.models import Realize
+        from route.test_canonical import insert_route_row
+
+        detour_route = insert_route_row(self.driver, start=(3.3850, -76.5330), end=(3.4684, -76.5193))
+        on_the_way = self._travel(self.near_route, 1)
+        detour = self._travel(detour_route, 1)
+        self._travel(self.far_route, 1)
+        self._travel(self.near_route, 5)
+        full = self._travel(self.near_route, 1)
+        self.vehicle.capacity = 1
+        self.vehicle.save()
+        Realize.objects.create(user=self.user, travel=full, status='confirmed')
+
+        response = self.client.get('/api/travel/match/', {
+            'origin': '3.3750,-76.5330', 'destination': '3.4680,-76.5190',
+            'time': (timezone.now() + timedelta(hours=1)).isoformat(), 'window_minutes': '60',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [on_the_way.id, detour.id])
+        self.assertLess(response.data[0]['detour_m'], response.data[1]['detour_m'])
+        self.assertEqual(response.data[0]['remaining_seats'], 1)
+
+    def test_match_requires_origin_and_destination(self):
+        """Both origin and destination are mandatory."""
+        response = self.client.get('/api/travel/match/', {'origin': '3.3750,-76.5330'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_match_rejects_non_finite_coordinates(self):
+        """NaN, infinite or out-of-range points would make every distance meaningless."""
+        for origin, destination in (('nan,1', '1,1'), ('3.3750,-76.5330', 'inf,-76.5190'), ('1e300,1e300', '1,1')):
+            response = self.client.get('/api/travel/match/', {'origin': origin, 'destination': destination})
+            self.assertEqual(response.status_code, 400, (origin, destination))
+            self.assertIn('error', response.json())
+
+
+class TravelBulkCreateViewTest(TravelSearchTestMixin, APITestCase):
+    """Test cases for the bulk travel creation endpoint."""
+
+    def rows(self, count):
+        departure = timezone.now() + timedelta(hours=2)
+        return [
+            {'vehicle': self.vehicle.id, 'route': self.near_route,
+             'time': (departure + timedelta(minutes=15 * i)).isoformat(), 'price': 2000}
+            for i in range(count)
+        ]
+
+    def test_bulk_create_uses_constant_queries(self):
+        """The whole batch is validated with one query per model and inserted at once."""
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/travel/bulk-create/', {'travels': self.rows(20)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 20)
+        self.assertEqual(Travel.objects.filter(driver=self.driver, travel_state='scheduled').count(), 20)
+
+    def test_invalid_rows_abort_the_batch(self):
+        """Any invalid row is reported by index and nothing is created."""
+        rows = self.rows(3)
+        rows[1]['vehicle'] = self.vehicle.id + 100
+        rows[2]['price'] = -5
+        response = self.client.post('/api/travel/bulk-create/', {'travels': rows}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('vehicle', response.data['errors'][0]['errors'])
+        self.assertIn('price', response.data['errors'][1]['errors'])
+        self.assertFalse(Travel.objects.exists())
+
+    def test_rejects_empty_or_oversized_batches(self):
+        """The batch must be a non-empty list within the configured limit."""
+        response = self.client.post('/api/travel/bulk-create/', {'travels': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+        with self.settings(TRAVEL_BULK_CREATE_MAX=2):
+            response = self.client.post('/api/travel/bulk-create/', {'travels': self.rows(3)}, format='json')
+        self.assertEqual(response.status_code, 400)
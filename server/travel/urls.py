@@ -4,13 +4,23 @@ from .views import (
     TravelCreateView,
     TravelDeleteView,
     InstitutionTravelListView,
-    TravelRouteView
+    TravelRouteView,
+    NearbyTravelListView,
+    TravelMatchView,
+    TravelScheduleListCreateView,
+    TravelScheduleDetailView,
+    TravelBulkCreateView
 )
 
 urlpatterns = [
     path('info/<int:driver_id>/', DriverTravelListView.as_view(), name='info'),
     path('create/', TravelCreateView.as_view(), name ='create-travel'),
+    path('bulk-create/', TravelBulkCreateView.as_view(), name='travel-bulk-create'),
     path('travel/delete/<int:id>/', TravelDeleteView.as_view(), name='travel-delete'),
     path('institution/', InstitutionTravelListView.as_view(), name='institution-travel-list'),
+    path('nearby/', NearbyTravelListView.as_view(), name='travel-nearby'),
+    path('match/', TravelMatchView.as_view(), name='travel-match'),
     path('route/<int:travel_id>/', TravelRouteView.as_view(), name='travel-route'),
+    path('schedules/', TravelScheduleListCreateView.as_view(), name='travel-schedule-list'),
+    path('schedules/<int:pk>/', TravelScheduleDetailView.as_view(), name='travel-schedule-detail'),
 ] 
\ No newline at end of file
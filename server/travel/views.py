@@ -3,13 +3,29 @@ from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Driver, Travel
-from .serializers import TravelSerializer,TravelInfoSerializer, TravelDetailSerializer, DriverTravelWithReservationsSerializer
+from .models import Driver, Travel, TravelSchedule
+from .serializers import TravelSerializer,TravelInfoSerializer, TravelDetailSerializer, DriverTravelWithReservationsSerializer, TravelScheduleSerializer
+from .schedules import materialize_schedule
+from .bulk import create_travels, validate_travel_rows
+from .projections import DRIVER_TRAVEL_PROJECTION, TRAVEL_DETAIL_PROJECTION, reservations_by_travel
 from users.permissions import IsAuthenticatedCustom
+from config.idempotency import IdempotentCreateMixin
+from config.etag import ConditionalGetMixin
+from config.response_cache import InstitutionResponseCacheMixin, driver_institution_id
+from config.projection import ProjectionListMixin
+from config.sparse_fields import SparseFieldsViewMixin
+from route.proximity import find_nearby_routes
+from .matching import find_matches
+from driver.offline_routing import parse_latlng
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
+import math
 
 
 
-class TravelCreateView(generics.CreateAPIView):
+class TravelCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     Endpoint para registrar un nuevo viaje.
 
@@ -25,13 +41,119 @@ class TravelCreateView(generics.CreateAPIView):
 
     Retorna:
     - 201 Created con los datos del viaje creado
+
+    Admite el encabezado `Idempotency-Key` para que los reintentos de la app
+    no creen viajes duplicados (ver `config.idempotency`).
     """
     permission_classes = [IsAuthenticatedCustom]
     serializer_class = TravelSerializer
     queryset = Travel.objects.all()
 
 
-class DriverTravelListView(generics.ListAPIView):
+class TravelBulkCreateView(generics.GenericAPIView):
+    """
+    Endpoint para publicar muchos viajes en una sola petición (por ejemplo,
+    todas las salidas del día de una ruta institucional).
+
+    POST /api/travel/bulk-create/
+    Body: {"travels": [{"vehicle": 1, "route": 2, "time": "...", "price": 0}, ...]}
+
+    Cada fila puede indicar `driver` (por defecto, el usuario autenticado) y
+    `travel_state` (por defecto 'scheduled'). Los conductores deben ser de la
+    institución del usuario y el vehículo y la ruta de cada fila, de su
+    conductor. El lote es todo o nada: si alguna fila es inválida se responde
+    400 con los errores por fila y no se crea ningún viaje.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+    serializer_class = TravelInfoSerializer
+
+    def post(self, request, *args, **kwargs):
+        rows = request.data.get('travels')
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "El campo 'travels' debe ser una lista no vacía."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.TRAVEL_BULK_CREATE_MAX:
+            return Response(
+                {"error": f"Se permiten como máximo {settings.TRAVEL_BULK_CREATE_MAX} viajes por lote."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        travels, errors = validate_travel_rows(rows, request.user)
+        if errors:
+            return Response(
+                {"error": "Ningún viaje fue creado: hay filas inválidas.", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        created = create_travels(travels)
+        return Response({
+            "created": len(created),
+            "travels": self.get_serializer(created, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
+
+class TravelScheduleListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    Endpoint para listar y crear las programaciones recurrentes del conductor
+    autenticado.
+
+    GET  /api/travel/schedules/
+    POST /api/travel/schedules/
+
+    Requiere (POST):
+    - vehicle (ID) y route (ID) del conductor
+    - weekdays (lista de días, 0 = lunes ... 6 = domingo)
+    - departure_time (HH:MM), price, start_date y opcionalmente end_date
+
+    Al crear la programación se generan de inmediato sus viajes dentro del
+    horizonte configurado; la respuesta incluye el resumen en `materialized`.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+    serializer_class = TravelScheduleSerializer
+
+    def get_queryset(self):
+        return TravelSchedule.objects.filter(driver_id=self.request.user.uid).order_by('id')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        schedule = serializer.save(driver_id=request.user.uid)
+        report = materialize_schedule(schedule)
+        return Response(
+            {**serializer.data, "materialized": report._asdict()},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class TravelScheduleDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    Endpoint para consultar, editar o eliminar una programación del conductor.
+
+    GET/PATCH/PUT/DELETE /api/travel/schedules/<id>/
+
+    Editar la programación regenera solo los viajes futuros que cambiaron.
+    Eliminarla retira sus viajes futuros (los que ya tienen reservas se
+    cancelan) y conserva el historial de los viajes pasados.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+    serializer_class = TravelScheduleSerializer
+
+    def get_queryset(self):
+        return TravelSchedule.objects.filter(driver_id=self.request.user.uid)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        schedule = serializer.save()
+        report = materialize_schedule(schedule)
+        return Response({**serializer.data, "materialized": report._asdict()}, status=status.HTTP_200_OK)
+
+    def perform_destroy(self, instance):
+        instance.active = False
+        materialize_schedule(instance)
+        instance.delete()
+
+
+class DriverTravelListView(ConditionalGetMixin, ProjectionListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     """
     Endpoint para listar todos los viajes de un conductor, incluyendo,
     para cada viaje, la lista de sus reservaciones.
@@ -39,6 +161,11 @@ class DriverTravelListView(generics.ListAPIView):
     permission_classes = [IsAuthenticatedCustom]
     # ¡CAMBIO CLAVE! Usamos el nuevo serializador.
     serializer_class = DriverTravelWithReservationsSerializer
+    projection = DRIVER_TRAVEL_PROJECTION
+
+    def get_etag_institution_id(self):
+        # Los viajes son del conductor de la URL, no del usuario autenticado.
+        return driver_institution_id(self.kwargs.get('driver_id'))
 
     def get_queryset(self):
         """
@@ -73,23 +200,52 @@ class TravelDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticatedCustom]
     queryset = Travel.objects.all()
     lookup_field = 'id'
-class InstitutionTravelListView(generics.ListAPIView):
+def driver_uid(item):
+    """UID del conductor de un viaje serializado, expandido o reducido a su ID."""
+    driver = item.get('driver')
+    if isinstance(driver, dict):
+        return driver['user']['uid']
+    return driver
+
+
+class InstitutionTravelListView(ConditionalGetMixin, InstitutionResponseCacheMixin, ProjectionListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     """
     Endpoint para listar todos los viajes de la institución del usuario autenticado,
     con información detallada de conductor, vehículo, RUTA y campos calculados.
     
     GET /api/travel/institution/
+
+    La respuesta se comparte en caché entre los miembros de la institución
+    (ver `config.response_cache`); las reservas de los viajes propios del
+    conductor se agregan por usuario.
     """
     permission_classes = [IsAuthenticatedCustom]
     serializer_class = TravelDetailSerializer
+    projection = TRAVEL_DETAIL_PROJECTION
+    response_cache_endpoint = 'travel-institution'
+
+    def personalize_response(self, data):
+        """Agrega el bloque `reservations` a los viajes que conduce el usuario."""
+        if 'reservations' not in self.serializer_class.requested_fields(self.request):
+            return data
+        uid = self.request.user.uid
+        # Con `?fields=` las reservas necesitan también `id` y `driver` para
+        # saber qué viajes son del usuario.
+        own = {item['id']: item for item in data if 'id' in item and driver_uid(item) == uid}
+        if not own:
+            return data
+        reservations = reservations_by_travel(list(own))
+        for travel_id, item in own.items():
+            item['reservations'] = reservations.get(travel_id, [])
+        return data
 
     def get_queryset(self):
         user = self.request.user
-        if not user.institution:
+        if not user.institution_id:
             return Travel.objects.none()
     
         queryset = Travel.objects.filter(
-            driver__user__institution=user.institution
+            driver__user__institution_id=user.institution_id
         ).select_related(
             'driver__user',
             'vehicle',
@@ -121,7 +277,7 @@ class TravelRouteView(generics.RetrieveAPIView):
         try:
             # Buscar el viaje y verificar que pertenezca a la institución del usuario
             travel = Travel.objects.select_related(
-                'route', 
+                'route__canonical', 
                 'driver__user'
             ).get(
                 id=travel_id,
@@ -135,6 +291,9 @@ class TravelRouteView(generics.RetrieveAPIView):
                 )
             
             route = travel.route
+            # La polilínea, distancia y duración se comparten a través de la ruta
+            # canónica, que se enriquece al crear la ruta (ver `route.canonical`).
+            canonical = route.canonical
             
             # Preparar los datos de la ruta usando la estructura correcta del modelo Route
             route_data = {
@@ -150,21 +309,194 @@ class TravelRouteView(generics.RetrieveAPIView):
                 },
                 "origin_address": route.startLocation,       # Campo de dirección de origen
                 "destination_address": route.destination,    # Campo de dirección de destino
-                "distance": None,  # Este modelo no tiene campo distance
-                "duration": None,  # Este modelo no tiene campo duration
+                "distance": canonical.distance_m if canonical else None,
+                "duration": canonical.duration_s if canonical else None,
                 "waypoints": [],   # Este modelo no tiene waypoints
-                "encoded_polyline": None  # Este modelo no tiene polilínea codificada
+                "encoded_polyline": canonical.encoded_polyline if canonical else None
             }
             
-            # El modelo Route actual no tiene waypoints ni polilínea codificada
-            # Estos campos están preparados para futuras extensiones del modelo
-            route_data["waypoints"] = []
-            route_data["encoded_polyline"] = None
-            
             return Response(route_data, status=status.HTTP_200_OK)
             
         except Travel.DoesNotExist:
             return Response(
                 {"error": "No se encontró el viaje o no tienes permisos para acceder a él."}, 
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+
+class TravelSearchParamsMixin:
+    """Lectura y validación de los parámetros comunes de las búsquedas de viajes."""
+
+    def _parse_radius(self, name, default):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        radius = float(value)
+        # float() acepta 'nan', que no cumple ninguna comparación y pasaría el rango.
+        if not math.isfinite(radius) or radius <= 0 or radius > settings.PROXIMITY_MAX_RADIUS_KM:
+            raise ValueError(f"'{name}' debe estar entre 0 y {settings.PROXIMITY_MAX_RADIUS_KM} km.")
+        return radius
+
+    def _parse_int(self, name, default, minimum, maximum):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        number = int(value)
+        if number < minimum or number > maximum:
+            raise ValueError(f"'{name}' debe estar entre {minimum} y {maximum}.")
+        return number
+
+    def _parse_time(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"'{name}' no es una fecha ISO 8601 válida.")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+
+class NearbyTravelListView(TravelSearchParamsMixin, generics.GenericAPIView):
+    """
+    Endpoint para buscar viajes programados cerca del pasajero.
+
+    GET /api/travel/nearby/?origin=lat,lng&destination=lat,lng&radius_km=1&time_from=...&time_to=...
+
+    Parámetros:
+    - origin (obligatorio): punto de partida del pasajero.
+    - destination (opcional): punto al que quiere llegar.
+    - radius_km (opcional, por defecto 1): radio de búsqueda alrededor del origen.
+    - destination_radius_km (opcional): radio alrededor del destino (por defecto, `radius_km`).
+    - time_from / time_to (opcional, ISO 8601): ventana de salida. Por defecto,
+      desde ahora hasta `PROXIMITY_DEFAULT_WINDOW_HOURS` horas después.
+
+    Retorna los viajes de la institución ordenados por cercanía, cada uno con
+    `origin_distance_m` y `destination_distance_m`.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+    serializer_class = TravelDetailSerializer
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        if not user.institution_id:
+            return Response([], status=status.HTTP_200_OK)
+
+        params = request.query_params
+        if not params.get('origin'):
+            return Response({"error": "El parámetro 'origin' es obligatorio."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            origin = parse_latlng(params['origin'])
+            destination = parse_latlng(params['destination']) if params.get('destination') else None
+            radius_km = self._parse_radius('radius_km', 1.0)
+            destination_radius_km = self._parse_radius('destination_radius_km', radius_km)
+            time_from = self._parse_time('time_from', timezone.now())
+            time_to = self._parse_time(
+                'time_to', time_from + timedelta(hours=settings.PROXIMITY_DEFAULT_WINDOW_HOURS)
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = find_nearby_routes(
+            user.institution_id,
+            origin,
+            radius_km * 1000,
+            end=destination,
+            end_radius_m=destination_radius_km * 1000,
+        )
+        distances = {match.route_id: match for match in matches}
+        if not distances:
+            return Response([], status=status.HTTP_200_OK)
+
+        travels = Travel.objects.filter(
+            route_id__in=distances.keys(),
+            travel_state='scheduled',
+            time__range=(time_from, time_to),
+            driver__user__institution_id=user.institution_id,
+        ).select_related(
+            'driver__user',
+            'vehicle',
+            'route'
+        ).prefetch_related(
+            'realize__user',
+            'driver__assessments'
+        )
+        travels = sorted(
+            travels,
+            key=lambda t: (distances[t.route_id].start_distance_m + (distances[t.route_id].end_distance_m or 0), t.time)
+        )
+
+        data = self.get_serializer(travels, many=True).data
+        for item, travel in zip(data, travels):
+            match = distances[travel.route_id]
+            item['origin_distance_m'] = round(match.start_distance_m)
+            item['destination_distance_m'] = round(match.end_distance_m) if match.end_distance_m is not None else None
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class TravelMatchView(TravelSearchParamsMixin, generics.GenericAPIView):
+    """
+    Endpoint que empareja a un pasajero con los viajes programados más convenientes.
+
+    GET /api/travel/match/?origin=lat,lng&destination=lat,lng&time=...&window_minutes=60&seats=1&k=10
+
+    Parámetros:
+    - origin, destination (obligatorios): dónde sube y dónde baja el pasajero.
+    - time (opcional, ISO 8601): hora deseada de salida (por defecto, ahora).
+    - window_minutes (opcional): tolerancia alrededor de la hora deseada.
+    - seats (opcional, por defecto 1): cupos que necesita el pasajero.
+    - k (opcional, por defecto 10): número de resultados.
+
+    Cada viaje se puntúa por el desvío que el conductor tendría que hacer, la
+    diferencia con la hora deseada y los cupos restantes (ver `travel.matching`).
+    Retorna los viajes ordenados de mejor a peor, con `match_score`,
+    `detour_m`, `time_offset_minutes` y `remaining_seats`.
+    """
+    permission_classes = [IsAuthenticatedCustom]
+    serializer_class = TravelDetailSerializer
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        if not user.institution_id:
+            return Response([], status=status.HTTP_200_OK)
+
+        params = request.query_params
+        if not params.get('origin') or not params.get('destination'):
+            return Response(
+                {"error": "Los parámetros 'origin' y 'destination' son obligatorios."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            origin = parse_latlng(params['origin'])
+            destination = parse_latlng(params['destination'])
+            departure = self._parse_time('time', timezone.now())
+            window_minutes = self._parse_int('window_minutes', settings.MATCHING_DEFAULT_WINDOW_MINUTES, 1, 24 * 60)
+            seats = self._parse_int('seats', 1, 1, 10)
+            k = self._parse_int('k', 10, 1, settings.MATCHING_MAX_RESULTS)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = find_matches(user.institution_id, origin, destination, departure, window_minutes * 60, seats, k)
+        if not matches:
+            return Response([], status=status.HTTP_200_OK)
+
+        travels = Travel.objects.filter(
+            id__in=[match.travel_id for match in matches]
+        ).select_related(
+            'driver__user',
+            'vehicle',
+            'route'
+        ).prefetch_related(
+            'realize__user',
+            'driver__assessments'
+        ).in_bulk()
+        ordered = [travels[match.travel_id] for match in matches]
+
+        data = self.get_serializer(ordered, many=True).data
+        for item, match in zip(data, matches):
+            item['match_score'] = round(match.score, 4)
+            item['detour_m'] = round(match.detour_m)
+            item['time_offset_minutes'] = round(match.time_offset_s / 60, 1)
+            item['remaining_seats'] = match.available_seats
+        return Response(data, status=status.HTTP_200_OK)
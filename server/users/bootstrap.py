@@ -0,0 +1,137 @@
+# server/users/bootstrap.py
+
+"""
+Arranque de la app móvil en una sola petición.
+
+Al abrir, la app pedía en serie el perfil, mis reservas, mis vehículos, mis
+rutas y el listado de viajes de la institución. Cada petición volvía a
+decodificar el token y a consultar el usuario. `/api/users/bootstrap/` arma
+esas secciones con el principal ya autenticado, ejecutando la lógica de las
+vistas originales en el mismo proceso. Así las respuestas son idénticas y el
+número de consultas no depende de cuántos datos tenga el usuario.
+
+Cada sección lleva su propia ETag, derivada de la misma generación que usa
+`config.etag`. El cliente envía en `If-None-Match` las ETags que ya tiene y
+las secciones vigentes se responden como `{"etag": ..., "status": 304}`, sin
+consultar la base de datos. Si no cambió ninguna, la respuesta es 304.
+"""
+
+from functools import partial
+
+from rest_framework import status
+
+from config.batch import BATCH_PRINCIPALS_ATTR
+from config.etag import ConditionalGetMixin, compute_etag, etag_matches
+from config.response_cache import canonical_query, institution_generation
+from config.sparse_fields import parse_field_list
+from realize.views import UserRealizeListView
+from route.views import RouteDetailView
+from travel.views import InstitutionTravelListView
+from vehicle.views import VehicleListByDriver
+
+from .serializers import UsersProfileSerializer
+
+SECTIONS_PARAM = 'sections'
+
+
+class ProfileSection:
+    """Mismo contenido que `/api/users/profile/<uid>/` para el usuario autenticado."""
+
+    def __init__(self, request):
+        self.request = request
+
+    def get_etag_version(self):
+        institution_id = self.request.user.institution_id
+        return institution_generation(institution_id) if institution_id else None
+
+    def build(self):
+        return status.HTTP_200_OK, UsersProfileSerializer(self.request.user).data
+
+
+class ViewSection:
+    """
+    Ejecuta una vista de la API con la petición ya autenticada: primero su
+    `initial` (permisos, throttles y negociación de contenido de la propia
+    vista) y luego su `get`.
+    """
+
+    def __init__(self, view_class, request):
+        self.request = request
+        self.view = view_class()
+        self.view.setup(request._request)
+        self.view.request = request
+        self.view.format_kwarg = None
+        self.view.headers = {}
+
+    def get_etag_version(self):
+        if isinstance(self.view, ConditionalGetMixin):
+            return self.view.get_etag_version()
+        return None
+
+    def build(self):
+        try:
+            self.view.initial(self.request)
+            response = self.view.get(self.request)
+        except Exception as exc:
+            # Los errores de una sección (p. ej. 403 si no es conductor) no
+            # impiden responder las demás.
+            response = self.view.handle_exception(exc)
+        return response.status_code, response.data
+
+
+SECTIONS = {
+    'profile': ProfileSection,
+    'reservations': partial(ViewSection, UserRealizeListView),
+    'vehicles': partial(ViewSection, VehicleListByDriver),
+    'routes': partial(ViewSection, RouteDetailView),
+    'institution_travels': partial(ViewSection, InstitutionTravelListView),
+}
+
+
+def requested_sections(request):
+    """Secciones pedidas con `?sections=a,b`; todas si el parámetro no viene."""
+    names = parse_field_list(request.query_params, SECTIONS_PARAM)
+    if names is None:
+        return list(SECTIONS)
+    return [name for name in SECTIONS if name in names]
+
+
+def section_etag(name, section, request):
+    version = section.get_etag_version()
+    if version is None:
+        return None
+    # `sections` no cambia el contenido de cada sección.
+    query_params = request.query_params.copy()
+    query_params.pop(SECTIONS_PARAM, None)
+    return compute_etag(version, 'bootstrap', name, canonical_query(query_params), request.user.pk)
+
+
+def build_bootstrap(request):
+    """
+    Devuelve `(secciones, etag)`. `etag` combina las de todas las secciones y
+    es None si alguna no tiene; `secciones` es None si ninguna cambió.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    # Los permisos de cada sección reutilizan el usuario ya cargado (ver
+    # `config.batch.shared_principal`) en lugar de consultarlo otra vez.
+    if getattr(request, BATCH_PRINCIPALS_ATTR, None) is None:
+        setattr(request._request, BATCH_PRINCIPALS_ATTR, {})
+    getattr(request, BATCH_PRINCIPALS_ATTR).setdefault((request.user._meta.label, request.user.pk), request.user)
+    sections = {name: SECTIONS[name](request) for name in requested_sections(request)}
+    etags = {name: section_etag(name, section, request) for name, section in sections.items()}
+    # La ETag de la respuesta depende además del formato negociado (JSON o MessagePack).
+    etag = compute_etag(*etags.values(), request.accepted_renderer.media_type) if etags and all(etags.values()) else None
+
+    if etag and (etag_matches(etag, if_none_match) or all(etag_matches(value, if_none_match) for value in etags.values())):
+        return None, etag
+
+    body = {}
+    for name, section in sections.items():
+        if etags[name] and etag_matches(etags[name], if_none_match):
+            body[name] = {'etag': etags[name], 'status': status.HTTP_304_NOT_MODIFIED}
+            continue
+        section_status, data = section.build()
+        # Los errores no se marcan como vigentes: el cliente los vuelve a pedir.
+        section_etag_value = etags[name] if section_status == status.HTTP_200_OK else None
+        body[name] = {'etag': section_etag_value, 'status': section_status, 'data': data}
+    return body, etag
@@ -8,6 +8,7 @@ logger = logging.getLogger(__name__)
 
 # ¡Importante! Asegúrate de que esta ruta sea correcta para tu modelo Users
 from users.models import Users
+from config.batch import shared_principal
 
 class IsAuthenticatedCustom(BasePermission):
     """
@@ -44,7 +45,8 @@ class IsAuthenticatedCustom(BasePermission):
                 logger.warning("Token payload missing 'user_id'.")
                 return False
 
-            request.user = Users.objects.get(uid=user_id)
+            # Dentro de un lote (/api/batch/) el usuario se carga una sola vez.
+            request.user = shared_principal(request, Users, user_id)
             return True
 
         except jwt.ExpiredSignatureError:
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.permissions import BasePermission
+from rest_framework.test import APITestCase
+
+from realize.models import Realize
+from route.views import RouteDetailView
+from travel.test_views import TravelSearchTestMixin
+from users.models import Users
+from users.permissions import IsAuthenticatedCustom
+
+BOOTSTRAP_URL = '/api/users/bootstrap/'
+
+
+class DenyAll(BasePermission):
+    def has_permission(self, request, view):
+        return False
+
+
+class UsersBootstrapViewTest(TravelSearchTestMixin, APITestCase):
+    """
+    Casos de prueba para el endpoint de arranque de la app móvil.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.travel = self._travel(self.near_route, 2)
+        Realize.objects.create(user=self.user, travel=self.travel, status=Realize.STATUS_CONFIRMED)
+
+    def _add_data(self, count):
+        for hours in range(3, 3 + count):
+            travel = self._travel(self.far_route, hours)
+            Realize.objects.create(user=self.user, travel=travel, status=Realize.STATUS_CONFIRMED)
+
+    def test_sections_match_individual_endpoints(self):
+        """Cada sección trae lo mismo que su endpoint individual, con su ETag."""
+        response = self.client.get(BOOTSTRAP_URL)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        for name, url in (
+            ('profile', f'/api/users/profile/{self.user.uid}/'),
+            ('reservations', '/api/realize/my-reservations/'),
+            ('vehicles', '/api/vehicle/my-vehicles/'),
+            ('routes', '/api/route/my-routes/'),
+            ('institution_travels', '/api/travel/institution/'),
+        ):
+            self.assertEqual(body[name]['status'], 200, name)
+            self.assertEqual(body[name]['data'], self.client.get(url).json(), name)
+            self.assertTrue(body[name]['etag'], name)
+
+    def test_query_budget_does_not_grow_with_data(self):
+        """El número de consultas no crece con la cantidad de reservas del usuario."""
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(BOOTSTRAP_URL)
+        cache.clear()
+        self._add_data(5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(BOOTSTRAP_URL)
+        self.assertEqual(len(response.json()['reservations']['data']), 6)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_unchanged_sections_are_skipped(self):
+        """Las secciones cuya ETag llega en If-None-Match se responden 304 sin consultarlas."""
+        first = self.client.get(BOOTSTRAP_URL).json()
+        etags = ', '.join(first[name]['etag'] for name in ('profile', 'routes'))
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(BOOTSTRAP_URL, {'sections': 'profile,routes,vehicles'}, HTTP_IF_NONE_MATCH=etags).json()
+        self.assertEqual(body['profile'], {'etag': first['profile']['etag'], 'status': 304})
+        self.assertEqual(body['routes']['status'], 304)
+        self.assertEqual(body['vehicles']['status'], 200)
+        self.assertEqual(set(body), {'profile', 'routes', 'vehicles'})
+        self.assertNotIn('route', ' '.join(query['sql'] for query in queries.captured_queries))
+
+    def test_not_modified_until_data_changes(self):
+        """Con todas las ETags vigentes la respuesta es 304, hasta que cambian los datos."""
+        response = self.client.get(BOOTSTRAP_URL)
+        etags = ', '.join(section['etag'] for section in response.json().values())
+        self.assertEqual(self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=etags).status_code, 304)
+        self.assertEqual(self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_data(1)
+        self.assertEqual(self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=etags).status_code, 200)
+
+    def test_driver_sections_fail_independently_for_passengers(self):
+        """Para un pasajero las secciones de conductor dan 403 sin afectar a las demás."""
+        passenger = Users.objects.create(
+            full_name="Test Passenger",
+            user_type=Users.TYPE_STUDENT,
+            institutional_mail="passenger@university.edu",
+            student_code="2023009",
+            udocument="87654321",
+            direction="456 Passenger Street",
+            uphone="+1987654321",
+            upassword=make_password("passengerpass123"),
+            institution=self.institution,
+            user_state=Users.STATE_APPROVED,
+        )
+        token = jwt.encode(
+            {'user_id': passenger.uid, 'exp': timezone.now() + timedelta(hours=1)},
+            settings.SECRET_KEY,
+            algorithm='HS256'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        body = self.client.get(BOOTSTRAP_URL).json()
+        self.assertEqual(body['profile']['data']['full_name'], "Test Passenger")
+        self.assertEqual(body['vehicles']['status'], 403)
+        self.assertEqual(body['routes']['status'], 403)
+        self.assertIsNone(body['routes']['etag'])
+        self.assertEqual(body['institution_travels']['status'], 200)
+
+    def test_section_permissions_are_checked(self):
+        """Una sección con permisos más estrictos que la vista externa responde 403."""
+        with patch.object(RouteDetailView, 'permission_classes', [IsAuthenticatedCustom, DenyAll]):
+            body = self.client.get(BOOTSTRAP_URL).json()
+        self.assertEqual(body['routes']['status'], 403)
+        self.assertIn('detail', body['routes']['data'])
+        self.assertEqual(body['vehicles']['status'], 200)
+
+    def test_requires_authentication(self):
+        """Sin token no se responde ninguna sección."""
+        self.client.credentials()
+        self.assertIn(self.client.get(BOOTSTRAP_URL).status_code, (401, 403))
@@ -5,11 +5,13 @@ from .views import (
     UsersDetailView,
     UsersProfileView,
     ApplyToBeDriverView,
+    UsersBootstrapView,
 )
 
 urlpatterns = [
     path('register/', UsersCreateView.as_view(), name='users-register'),
     path('login/', UsersLoginView.as_view(), name='user-login'),
     path('apply-to-driver/', ApplyToBeDriverView.as_view()),
-    path('profile/<int:uid>/', UsersProfileView.as_view(), name='profile')
+    path('profile/<int:uid>/', UsersProfileView.as_view(), name='profile'),
+    path('bootstrap/', UsersBootstrapView.as_view(), name='users-bootstrap'),
 ]    
\ No newline at end of file
@@ -18,6 +18,8 @@ import jwt
 from .permissions import IsAuthenticatedCustom
 from django.conf import settings
 import datetime
+from drf_yasg.utils import swagger_auto_schema
+from .bootstrap import build_bootstrap
 
 class UsersCreateView(generics.CreateAPIView):
     """ Vista para registrar un nuevo usuario. """
@@ -133,4 +135,28 @@ class UsersProfileView(generics.RetrieveAPIView):
             'institution_name': user.institution.official_name if user.institution else None,
             'driver_state': user.driver_state,
         }
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class UsersBootstrapView(APIView):
+    """
+    Todo lo que la app móvil necesita al abrir, en una sola petición.
+
+    GET /api/users/bootstrap/
+
+    Responde `profile`, `reservations`, `vehicles`, `routes` e
+    `institution_travels`, cada una como `{"etag", "status", "data"}` con el
+    mismo contenido del endpoint individual. `?sections=profile,routes` limita
+    las secciones. Las ETags recibidas en `If-None-Match` omiten las secciones
+    que no cambiaron (ver `users.bootstrap`).
+    """
+    permission_classes = [IsAuthenticatedCustom]
+
+    @swagger_auto_schema(operation_summary="Endpoint para cargar los datos iniciales de la app")
+    def get(self, request):
+        body, etag = build_bootstrap(request)
+        headers = {'ETag': etag} if etag else {}
+        headers['Vary'] = 'Accept'
+        if body is None:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(body, status=status.HTTP_200_OK, headers=headers)
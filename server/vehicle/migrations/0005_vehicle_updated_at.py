@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle', '0004_alter_vehicle_soat_alter_vehicle_tecnomechanical'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['driver', 'updated_at', 'id'], name='vehicle_driver_updated_idx'),
+        ),
+    ]
@@ -17,8 +17,13 @@ class Vehicle (models.Model):
     soat = models.DateField()
     tecnomechanical = models.DateField()
     capacity = models.IntegerField()
+    # Última modificación, para la sincronización incremental (ver `sync`).
+    updated_at = models.DateTimeField(auto_now=True)
     class Meta:
         db_table = 'vehicle'
+        indexes = [
+            models.Index(fields=['driver', 'updated_at', 'id'], name='vehicle_driver_updated_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(category__in=['intermunicipal', 'metropolitano', 'campus']),
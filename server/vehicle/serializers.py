@@ -5,6 +5,10 @@ from .models import Vehicle
 class VehicleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehicle
-        fields = '__all__'
+        # `updated_at` es interno de la sincronización (ver `sync`).
+        fields = [
+            'id', 'driver', 'plate', 'brand', 'model', 'vehicle_type',
+            'category', 'soat', 'tecnomechanical', 'capacity'
+        ]
         read_only_fields = ('driver',)
         ref_name = "VehicleBase"
\ No newline at end of file
@@ -7,10 +7,12 @@ from .serializers import VehicleSerializer
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import BasePermission
 from users.permissions import IsAuthenticatedCustom
+from config.etag import ConditionalGetMixin
+from config.idempotency import IdempotentCreateMixin
 from rest_framework.views import APIView
 
 
-class VehicleCreateView(generics.CreateAPIView):
+class VehicleCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """ Vista para crear un vehículo asociado a un conductor aprobado."""
 
     queryset = Vehicle.objects.all()
@@ -57,7 +59,7 @@ class VehicleCreateView(generics.CreateAPIView):
             )
 
 
-class VehicleListByDriver(APIView):
+class VehicleListByDriver(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticatedCustom]
 
     def get(self, request):